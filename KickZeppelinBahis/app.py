@@ -1,4 +1,5 @@
 import os
+import atexit
 import logging
 import json
 from flask import Flask, render_template, request, jsonify, redirect, url_for
@@ -10,6 +11,15 @@ from models import db, User, GameResult
 from database_manager import DatabaseManager
 from game_logic import ZeppelinGame
 from kick_api import KickAPI
+from result_journal import GameResultJournal, claim_journal_path
+from round_engine import RoundEngine
+from provably_fair import CrashPointChain, verify_round
+from broadcaster import ResultBroadcaster
+from shared_state import create_state_store, instance_id
+from startup import StartupTasks
+from bet_tracing import BetTracer
+from migrations import run_migrations
+from partitions import GameResultPartitions
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -28,26 +38,206 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 
 # Initialize database
 db.init_app(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+
+# Ağ ve veritabanı gerektiren açılış işleri import sırasında değil, sunucu
+# bağlantı kabul etmeye başladıktan sonra arka planda yapılır (/ready)
+startup = StartupTasks()
+# Çok worker'lı çalışmada yayınlar SOCKETIO_MESSAGE_QUEUE (ör. redis://) üzerinden
+# tüm worker'lara dağıtılır
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    message_queue=os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None)
+
+# Worker'lar arası tur durumu ve ayarlar (redis://, sqlite:///yol veya boş = tek süreç)
+shared_state = create_state_store(os.environ.get("SHARED_STATE_URL"))
+# Paylaşılan durum veya mesaj kuyruğu varsa başka worker'lar da aynı veritabanına yazar
+multi_worker = shared_state.shared or bool(os.environ.get("SOCKETIO_MESSAGE_QUEUE"))
 
 # Initialize game components
-db_manager = DatabaseManager()
+# Çok worker'lı çalışmada önbellekler worker'lar arası geçersiz kılınmaz:
+# kullanıcı önbelleği varsayılan olarak kapalıdır, istatistik özeti
+# birkaç saniyeden eskiyse veritabanından yenilenir
+db_manager = DatabaseManager(
+    user_cache_size=int(os.environ.get("USER_CACHE_SIZE", "0" if multi_worker else "10000")),
+    user_cache_ttl=float(os.environ.get("USER_CACHE_TTL", "60")),
+    # Çok worker'lı çalışmada diğer worker'ların oyunları tampona düşmez;
+    # varsayılan olarak son oyunlar tek JOIN sorgusuyla okunur
+    recent_games_size=int(os.environ.get("RECENT_GAMES_SIZE", "0" if multi_worker else "200")),
+    stats_shards=int(os.environ.get("STATS_SHARDS", "8")),
+    stats_max_age=float(os.environ.get("STATS_MAX_AGE_SECONDS", "5" if multi_worker else "0"))
+)
 zeppelin_game = ZeppelinGame()
 kick_api = KickAPI()
 
-# Initialize database tables
-with app.app_context():
-    db.create_all()
-    logger.info("Database tables created successfully")
+# Bahis hattı aşama süreleri ve bahis başına SQL sorgusu (/metrics, admin paneli)
+bet_tracer = BetTracer(enabled=os.environ.get("BET_TRACING_ENABLED", "1") == "1")
+if bet_tracer.enabled:
+    bet_tracer.install_query_counter()
+db_manager.attach_tracer(bet_tracer)
+
+# Provably-fair crash noktası zinciri (PROVABLY_FAIR_ENABLED=0 ile kapatılır)
+crash_chain = None
+if os.environ.get("PROVABLY_FAIR_ENABLED", "1") == "1":
+    crash_chain = CrashPointChain(
+        zeppelin_game,
+        client_seed=os.environ.get("PROVABLY_FAIR_CLIENT_SEED", "zeppelin"),
+        chain_length=int(os.environ.get("PROVABLY_FAIR_CHAIN_LENGTH", "10000")),
+        buffer_size=int(os.environ.get("PROVABLY_FAIR_BUFFER_SIZE", "256")),
+        store=db_manager,
+        app=app
+    )
+    zeppelin_game.crash_chain = crash_chain
+
+def create_tables():
+    """Initialize database tables"""
+    with app.app_context():
+        db.create_all()
+        logger.info("Database tables created successfully")
+        # Mevcut tablolara sonradan eklenen index'ler
+        applied = run_migrations(db.engine)
+        if applied:
+            logger.info(f"Migration'lar uygulandı: {', '.join(applied)}")
+
+startup.add('database', create_tables)
+
+if crash_chain:
+    # Seed ve konum veritabanında; worker'lar aynı zinciri sürdürür
+    startup.add('provably_fair', crash_chain.start)
+
+# game_results aylık bölümleri ve saklama süresi (0 = ham sonuçlar silinmez)
+game_result_partitions = GameResultPartitions(
+    retention_days=int(os.environ.get("GAME_RESULTS_RETENTION_DAYS", "0")),
+    months_ahead=int(os.environ.get("PARTITION_MONTHS_AHEAD", "2"))
+)
+
+def start_partitions():
+    """Gelecek ayların bölümlerini hazırla / eski ayları arşivle, sonra periyodik bakım"""
+    with app.app_context():
+        game_result_partitions.maintain(db.engine)
+        engine = db.engine
+    game_result_partitions.start(
+        app, engine,
+        interval=float(os.environ.get("PARTITION_MAINTENANCE_SECONDS", "3600"))
+    )
+
+startup.add('partitions', start_partitions, required=False)
+
+# Oyun sonuçları için write-behind journal (RESULT_JOURNAL_ENABLED=0 ile kapatılır)
+result_journal = None
+if os.environ.get("RESULT_JOURNAL_ENABLED", "1") == "1":
+    result_journal = GameResultJournal(
+        app,
+        writer=db_manager.write_game_results,
+        path=claim_journal_path(os.environ.get("RESULT_JOURNAL_PATH", "game_results.journal")),
+        flush_interval_ms=int(os.environ.get("RESULT_JOURNAL_FLUSH_MS", "200")),
+        batch_size=int(os.environ.get("RESULT_JOURNAL_BATCH_SIZE", "500")),
+        max_failures=int(os.environ.get("RESULT_JOURNAL_MAX_FAILURES", "3")),
+        fsync=os.environ.get("RESULT_JOURNAL_FSYNC", "1") == "1"
+    )
+    atexit.register(result_journal.stop)
+
+    def start_result_journal():
+        """Önceki çalışmanın yazılmamış sonuçlarını işle ve journal'ı devreye al"""
+        result_journal.replay()
+        result_journal.start()
+        db_manager.attach_journal(result_journal)
+
+    startup.add('result_journal', start_result_journal)
+
+def start_stats():
+    """İstatistik özeti - bir kez yüklenir, sonra artımlı güncellenir"""
+    with app.app_context():
+        db_manager.seed_stats()
+    db_manager.stats.start_reconciler(
+        app,
+        interval=float(os.environ.get("STATS_RECONCILE_SECONDS", "300")),
+        before=result_journal.flush_all if result_journal else None
+    )
+
+startup.add('stats', start_stats)
+
+def start_leaderboard():
+    """Canlı sıralama tablosu - bir kez yüklenir, bakiye değişiklikleriyle güncellenir"""
+    with app.app_context():
+        db_manager.seed_leaderboard(sleep=socketio.sleep)
+    # Tek süreçte tüm değişiklikler zaten buradan geçer; çok worker'lı çalışmada
+    # diğer worker'ların değişiklikleri artımlı eşitlemeyle gelir
+    if multi_worker:
+        db_manager.leaderboard.start_resync(
+            app,
+            interval=float(os.environ.get("LEADERBOARD_RESYNC_SECONDS", "60")),
+            full_every=int(os.environ.get("LEADERBOARD_FULL_RESYNC_EVERY", "10")),
+            sleep=socketio.sleep
+        )
+
+startup.add('leaderboard', start_leaderboard, required=False)
+
+def start_recent_games():
+    """Son oyunlar tamponu - bir kez yüklenir, sonuçlandırmalarla dolar"""
+    with app.app_context():
+        db_manager.seed_recent_games()
+
+startup.add('recent_games', start_recent_games, required=False)
+startup.add('kick_api', kick_api.warm_up, required=False)
 
 # Global game state
 current_game = None
 
+# Sonuçlar BROADCAST_TICK_MS aralıklarla tek game_results_batch frame'inde
+# yayınlanır; 0 ise her bahis için ayrı game_result gönderilir
+result_broadcaster = None
+if int(os.environ.get("BROADCAST_TICK_MS", "75")) > 0:
+    result_broadcaster = ResultBroadcaster(
+        socketio.emit,
+        tick_ms=int(os.environ.get("BROADCAST_TICK_MS", "75")),
+        max_rows=int(os.environ.get("BROADCAST_MAX_ROWS", "50")),
+        sleep=socketio.sleep
+    )
+    socketio.start_background_task(result_broadcaster.run)
+
+# Tur modu: ROUND_BETTING_SECONDS > 0 ise bahisler turlarda toplanır ve
+# tur sonunda toplu sonuçlandırılır; 0 ise her bahis anında oynanır
+round_engine = None
+if float(os.environ.get("ROUND_BETTING_SECONDS", "0")) > 0:
+    round_engine = RoundEngine(
+        app, zeppelin_game, db_manager, socketio.emit,
+        betting_seconds=float(os.environ["ROUND_BETTING_SECONDS"]),
+        cooldown_seconds=float(os.environ.get("ROUND_COOLDOWN_SECONDS", "3")),
+        sleep=socketio.sleep,
+        store=shared_state,
+        instance_id=instance_id()
+    )
+    startup.add('round_engine', lambda: socketio.start_background_task(round_engine.run), required=False)
+
+def apply_shared_settings(settings):
+    """Başka bir worker'da kaydedilen oyun ayarlarını uygula"""
+    zeppelin_game.update_settings(**settings)
+    logger.info(f'Paylaşılan oyun ayarları uygulandı: {settings}')
+
+def apply_shared_channel(channel):
+    """Başka bir worker'da ayarlanan Kick kanalını uygula"""
+    kick_api.current_channel = channel
+    if not kick_api.mock_mode:
+        kick_api.channel_cache.warm(channel)
+
+if shared_state.shared:
+    saved_settings = shared_state.get('game_settings')
+    if saved_settings:
+        zeppelin_game.update_settings(**saved_settings)
+    kick_api.current_channel = shared_state.get('kick_channel') or getattr(kick_api, 'current_channel', None)
+    shared_state.watch('game_settings', apply_shared_settings)
+    shared_state.watch('kick_channel', apply_shared_channel)
+
 @app.route('/')
 def index():
     """Ana oyun sayfası"""
     return render_template('index.html')
 
+@app.route('/ready')
+def ready():
+    """Hazır olma kontrolü - açılış görevleri bitene kadar 503"""
+    status = startup.get_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 @app.route('/admin')
 def admin():
     """Admin panel"""
@@ -116,6 +306,84 @@ def get_stats():
     stats = db_manager.get_game_stats()
     return jsonify(stats)
 
+@app.route('/api/stats/history')
+def get_stats_history():
+    """Özet tablolarından oyun geçmişi (?grain=hour|day&limit=30)"""
+    grain = request.args.get('grain', 'day')
+    if grain not in ('hour', 'day'):
+        return jsonify({'error': 'grain hour veya day olmalı'}), 400
+    try:
+        limit = min(int(request.args.get('limit', 24 if grain == 'hour' else 30)), 24 * 31)
+    except ValueError:
+        return jsonify({'error': 'Geçersiz limit'}), 400
+    return jsonify({'grain': grain, 'history': db_manager.get_stats_history(grain, limit)})
+
+@app.route('/api/leaderboard')
+def get_leaderboard():
+    """Sıralama tablosu (?limit=10, ?username=...&window=2 ile kullanıcının sırası ve çevresi)"""
+    try:
+        limit = min(int(request.args.get('limit', 10)), 100)
+        window = min(int(request.args.get('window', 2)), 25)
+    except ValueError:
+        return jsonify({'error': 'Geçersiz limit veya pencere'}), 400
+    
+    if not db_manager.leaderboard.seeded:
+        return jsonify({'error': 'Sıralama tablosu hazırlanıyor'}), 503
+    return jsonify(db_manager.get_leaderboard(limit, request.args.get('username'), window))
+
+@app.route('/api/win-probability')
+def get_win_probability():
+    """Hedef çarpanlar için kazanma olasılıkları (?targets=1.5,2,10)"""
+    try:
+        targets = [float(t) for t in request.args.get('targets', '2.0').split(',') if t.strip()]
+    except ValueError:
+        return jsonify({'error': 'Geçersiz hedef çarpan'}), 400
+    
+    probabilities = zeppelin_game.get_win_probabilities(targets)
+    return jsonify({
+        'probabilities': [
+            {'target_multiplier': target, 'win_probability': probability}
+            for target, probability in zip(targets, probabilities)
+        ]
+    })
+
+@app.route('/api/provably-fair')
+def get_provably_fair():
+    """Zincir taahhüdü ve açıklanan son turlar"""
+    if not crash_chain:
+        return jsonify({'enabled': False})
+    return jsonify(dict(crash_chain.get_public_info(), enabled=True))
+
+@app.route('/api/provably-fair/verify')
+def verify_provably_fair():
+    """Bir turun crash noktasını hash'inden yeniden hesapla"""
+    try:
+        round_hash = request.args['hash']
+        result = verify_round(
+            round_hash,
+            float(request.args.get('crash_point', 0)),
+            request.args.get('client_seed', crash_chain.client_seed if crash_chain else 'zeppelin'),
+            float(request.args.get('win_rate', zeppelin_game.win_rate)),
+            float(request.args.get('min_multiplier', zeppelin_game.min_multiplier)),
+            float(request.args.get('max_multiplier', zeppelin_game.max_multiplier)),
+            previous_hash=request.args.get('previous_hash')
+        )
+        return jsonify(result)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Geçersiz doğrulama parametresi: {e}'}), 400
+
+@app.route('/api/journal')
+def get_journal_metrics():
+    """Write-behind journal flush metriklerini getir"""
+    if not result_journal:
+        return jsonify({'enabled': False})
+    return jsonify(dict(result_journal.get_metrics(), enabled=True))
+
+@app.route('/api/kick-http')
+def get_kick_http_metrics():
+    """Kick API HTTP havuzu, devre kesici ve kanal önbelleği metrikleri"""
+    return jsonify(dict(kick_api.http.get_metrics(), channel_cache=kick_api.channel_cache.get_metrics()))
+
 @app.route('/api/simulate_follow', methods=['POST'])
 def simulate_follow():
     """Test için takip simülasyonu"""
@@ -142,19 +410,21 @@ def simulate_follow():
 def migrate_from_json():
     """JSON verilerini PostgreSQL'e migrate et"""
     try:
-        # Mevcut JSON dosyasını oku
-        import os
+        # Dosya akışla okunur, kullanıcılar parça parça toplu eklenir
         if os.path.exists('kullanicilar.json'):
-            with open('kullanicilar.json', 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
+            result = db_manager.migrate_from_json_file(
+                'kullanicilar.json',
+                chunk_size=int(os.environ.get("MIGRATION_CHUNK_SIZE", "1000")),
+                checkpoint_path='kullanicilar.json.migrate.ckpt'
+            )
             
-            # Migration işlemini gerçekleştir
-            success = db_manager.migrate_from_json(json_data)
-            
-            if success:
+            if result['success']:
                 return jsonify({
                     'success': True,
-                    'message': 'JSON verileri başarıyla PostgreSQL\'e aktarıldı!'
+                    'message': f'JSON verileri başarıyla PostgreSQL\'e aktarıldı! '
+                               f'{result["inserted"]} yeni kullanıcı, {result["existing"]} zaten kayıtlı '
+                               f'({result["rows_per_s"]:.0f} satır/sn)',
+                    'stats': result
                 })
             else:
                 return jsonify({
@@ -181,7 +451,9 @@ def handle_connect():
     join_room('game_room')
     
     # Mevcut oyun durumunu gönder
-    if current_game:
+    if round_engine:
+        emit('game_state', round_engine.get_state())
+    elif current_game:
         emit('game_state', current_game)
 
 @socketio.on('disconnect')
@@ -191,89 +463,151 @@ def handle_disconnect():
     leave_room('game_room')
 
 @socketio.on('place_bet')
+@bet_tracer.traced('bet')
 def handle_bet(data):
     """Bahis yerleştirme"""
+    username = data.get('username')
     try:
-        username = data.get('username')
         bet_amount = float(data.get('bet_amount', 0))
         target_multiplier = float(data.get('target_multiplier', 2.0))
-        
+    except (TypeError, ValueError):
+        emit('bet_error', {
+            'message': f'❌ {username}, bahis işlenirken hata oluştu!',
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+        return
+    process_bet(username, bet_amount, target_multiplier, emit, sid=request.sid)
+
+def process_bet(username, bet_amount, target_multiplier, reply, sid=None):
+    """
+    Bahsi doğrula, oyna ve sonuçlandır
+    
+    Socket.IO ``place_bet`` olayı ve Kick chat alım hattı ortak kullanır;
+    ``reply(olay, payload)`` hata/onay mesajlarını bahsi yapana iletir.
+    Aşamalar ``bet_tracer`` ile ölçülür.
+    """
+    def reject(payload):
+        bet_tracer.outcome('rejected')
+        reply('bet_error', payload)
+    
+    try:
         logger.info(f'Bahis: {username} - {bet_amount} - {target_multiplier}x')
         
-        # Kullanıcı kontrolü
-        user = db_manager.get_user(username)
-        if not user:
-            emit('bet_error', {
-                'message': f'❌ {username}, önce takip etmelisin!',
-                'timestamp': datetime.now().strftime('%H:%M:%S')
-            })
-            return
-        
-        # Bakiye kontrolü
-        if user['balance'] < bet_amount:
-            emit('bet_error', {
-                'message': f'❌ {username}, yeterli bakiyen yok! Mevcut: {user["balance"]:.0f}',
+        if not startup.is_ready():
+            reject({
+                'message': f'⏳ {username}, oyun hazırlanıyor, birkaç saniye sonra tekrar dene!',
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             })
             return
         
         # Bahis limitlerini kontrol et
         if bet_amount < 1:
-            emit('bet_error', {
+            reject({
                 'message': f'❌ {username}, minimum bahis miktarı 1 puandır!',
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             })
             return
         
         if target_multiplier < 1.0 or target_multiplier > 50.0:
-            emit('bet_error', {
+            reject({
                 'message': f'❌ {username}, çarpan 1.0x ile 50.0x arasında olmalı!',
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             })
             return
         
+        # Tur modunda bahis açık tura eklenir, sonuç tur sonunda toplu yayınlanır
+        if round_engine:
+            with bet_tracer.stage('round_place'):
+                placed = round_engine.place_bet(username, bet_amount, target_multiplier, sid=sid)
+            if placed['success']:
+                bet_tracer.outcome('queued')
+                reply('bet_accepted', {
+                    'round_id': placed['round_id'],
+                    'message': f'✅ {username}, {bet_amount:.0f} puan {target_multiplier}x bahsin tur #{placed["round_id"]} için alındı',
+                    'timestamp': datetime.now().strftime('%H:%M:%S')
+                })
+            else:
+                reject({
+                    'message': f'❌ {username}, bahisler kapandı! Sonraki turu bekle.',
+                    'timestamp': datetime.now().strftime('%H:%M:%S')
+                })
+            return
+        
         # Oyunu oyna
-        result = zeppelin_game.play_game(username, bet_amount, target_multiplier)
+        with bet_tracer.stage('play_game'):
+            result = zeppelin_game.play_game(username, bet_amount, target_multiplier)
+        
+        # Bakiye kontrolü, bakiye güncellemesi ve oyun kaydı tek transaction'da
+        with bet_tracer.stage('settle'):
+            settlement = db_manager.settle_bet(
+                username, bet_amount, target_multiplier,
+                result['actual_multiplier'], result['won'],
+                result.get('winnings', 0)
+            )
+        
+        if not settlement['success']:
+            if settlement['reason'] == 'user_not_found':
+                message = f'❌ {username}, önce takip etmelisin!'
+            elif settlement['reason'] == 'insufficient_balance':
+                message = f'❌ {username}, yeterli bakiyen yok! Mevcut: {settlement["balance"]:.0f}'
+            else:
+                message = f'❌ {username}, bahis işlenirken hata oluştu!'
+            reject({
+                'message': message,
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            })
+            return
+        
+        new_balance = settlement['balance']
+        bet_tracer.outcome('settled')
+        
+        # Toplu yayın açıksa sonuç sıradaki tick'in frame'ine eklenir
+        if result_broadcaster:
+            with bet_tracer.stage('broadcast'):
+                result_broadcaster.publish({
+                    'username': username,
+                    'bet_amount': bet_amount,
+                    'target_multiplier': target_multiplier,
+                    'actual_multiplier': result['actual_multiplier'],
+                    'won': result['won'],
+                    'winnings': result.get('winnings', 0),
+                    'new_balance': new_balance,
+                    'round_hash': result.get('round_hash')
+                })
+            return
         
-        # Kullanıcı bakiyesini güncelle ve oyun sonucunu kaydet
         if result['won']:
-            new_balance = db_manager.add_balance(username, result['winnings'])
             message = f'🎉 {username}, {result["actual_multiplier"]:.2f}x ile kazandın! +{result["winnings"]:.0f} puan. Yeni bakiye: {new_balance:.0f}'
+        elif result['actual_multiplier'] < target_multiplier:
+            message = f'💥 {username}, {result["actual_multiplier"]:.2f}x\'de patladı! Kaybettin. Yeni bakiye: {new_balance:.0f}'
         else:
-            new_balance = db_manager.subtract_balance(username, bet_amount)
-            if result['actual_multiplier'] < target_multiplier:
-                message = f'💥 {username}, {result["actual_multiplier"]:.2f}x\'de patladı! Kaybettin. Yeni bakiye: {new_balance:.0f}'
-            else:
-                message = f'💥 {username}, hiç havalanamadı. Kaybettin. Yeni bakiye: {new_balance:.0f}'
-        
-        # Oyun sonucunu veritabanına kaydet
-        db_manager.save_game_result(
-            username, bet_amount, target_multiplier, 
-            result['actual_multiplier'], result['won'], 
-            result.get('winnings', 0)
-        )
+            message = f'💥 {username}, hiç havalanamadı. Kaybettin. Yeni bakiye: {new_balance:.0f}'
         
         # Sonucu tüm istemcilere gönder
-        socketio.emit('game_result', {
-            'username': username,
-            'bet_amount': bet_amount,
-            'target_multiplier': target_multiplier,
-            'actual_multiplier': result['actual_multiplier'],
-            'won': result['won'],
-            'winnings': result.get('winnings', 0),
-            'new_balance': new_balance,
-            'message': message,
-            'timestamp': datetime.now().strftime('%H:%M:%S')
-        }, room='game_room')
+        with bet_tracer.stage('broadcast'):
+            socketio.emit('game_result', {
+                'username': username,
+                'bet_amount': bet_amount,
+                'target_multiplier': target_multiplier,
+                'actual_multiplier': result['actual_multiplier'],
+                'won': result['won'],
+                'winnings': result.get('winnings', 0),
+                'new_balance': new_balance,
+                'round_hash': result.get('round_hash'),
+                'message': message,
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            }, room='game_room')
         
     except Exception as e:
         logger.error(f'Bahis hatası: {e}')
-        emit('bet_error', {
+        bet_tracer.outcome('error')
+        reply('bet_error', {
             'message': f'❌ {username}, bahis işlenirken hata oluştu!',
             'timestamp': datetime.now().strftime('%H:%M:%S')
         })
 
 @socketio.on('chat_command')
+@bet_tracer.traced('chat_other')
 def handle_chat_command(data):
     """Chat komutlarını işle"""
     try:
@@ -282,6 +616,7 @@ def handle_chat_command(data):
         
         # Bahis komutu kontrolü (!bet miktar çarpan)
         if message.startswith('!bet') or message.startswith('!bahis'):
+            bet_tracer.set_command('chat_bet')
             parts = message.split()
             if len(parts) >= 3:
                 try:
@@ -307,6 +642,7 @@ def handle_chat_command(data):
         
         # Bakiye sorgulama
         elif message.startswith('!balance') or message.startswith('!bakiye'):
+            bet_tracer.set_command('chat_balance')
             user = db_manager.get_user(username)
             if user:
                 emit('chat_info', {
@@ -319,16 +655,98 @@ def handle_chat_command(data):
                     'timestamp': datetime.now().strftime('%H:%M:%S')
                 })
         
+        # Sıralama sorgulama
+        elif message.startswith('!rank') or message.startswith('!sira'):
+            bet_tracer.set_command('chat_rank')
+            reply_rank(username, emit)
+        
         # Yardım komutu
         elif message.startswith('!help') or message.startswith('!yardim'):
+            bet_tracer.set_command('chat_help')
             emit('chat_info', {
-                'message': f'ℹ️ Komutlar: !bet <miktar> <çarpan>, !bakiye, !yardim',
+                'message': f'ℹ️ Komutlar: !bet <miktar> <çarpan>, !bakiye, !sira, !yardim',
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             })
             
     except Exception as e:
         logger.error(f'Chat komutu hatası: {e}')
 
+def reply_rank(username, reply):
+    """Kullanıcının sıralamadaki yerini yanıtla"""
+    rank = db_manager.get_user_rank(username) if db_manager.leaderboard.seeded else None
+    if rank:
+        reply('chat_info', {
+            'message': f'🏆 {username}, sıran: {rank["rank"]}/{rank["total"]} ({rank["balance"]:.0f} puan)',
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+    elif db_manager.leaderboard.seeded:
+        reply('chat_error', {
+            'message': f'❌ {username}, önce takip etmelisin!',
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+    else:
+        reply('chat_info', {
+            'message': f'⏳ {username}, sıralama tablosu hazırlanıyor, birazdan tekrar dene.',
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+
+def process_chat_command(command):
+    """
+    Kick chat alım hattından gelen komutu işle
+    
+    Chat'ten gelen komutların Socket.IO bağlantısı olmadığından yanıtlar
+    oyun odasına yayınlanır.
+    """
+    def reply(event, payload):
+        socketio.emit(event, payload, room='game_room')
+    
+    username = command['username']
+    with app.app_context(), bet_tracer.trace(f"chat_{command['type']}"):
+        if command['type'] == 'bet':
+            process_bet(username, command['bet_amount'], command['target_multiplier'], reply)
+        elif command['type'] == 'balance':
+            user = db_manager.get_user(username)
+            if user:
+                reply('chat_info', {
+                    'message': f'💰 {username}, bakiyen: {user["balance"]:.0f} puan',
+                    'timestamp': datetime.now().strftime('%H:%M:%S')
+                })
+            else:
+                reply('chat_error', {
+                    'message': f'❌ {username}, önce takip etmelisin!',
+                    'timestamp': datetime.now().strftime('%H:%M:%S')
+                })
+        elif command['type'] == 'rank':
+            reply_rank(username, reply)
+        elif command['type'] == 'help':
+            reply('chat_info', {
+                'message': f'ℹ️ Komutlar: !bet <miktar> <çarpan>, !bakiye, !sira, !yardim',
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            })
+        elif command['type'] == 'error':
+            reply('chat_error', {
+                'message': f'❌ {username}, {command["message"]} Örnek: !bet 100 2.5',
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            })
+
+@app.route('/metrics')
+def get_metrics():
+    """Bahis hattı aşama histogramları (Prometheus metin biçimi)"""
+    return app.response_class(bet_tracer.render_prometheus(),
+                              mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/bet-metrics')
+def get_bet_metrics():
+    """Aşama başına adet, ortalama ve p50/p95/p99 (ms) - admin paneli"""
+    return jsonify(bet_tracer.get_summary())
+
+@app.route('/api/chat-ingest')
+def get_chat_ingest_metrics():
+    """Kick chat alım hattı metriklerini getir"""
+    if not chat_pipeline:
+        return jsonify({'enabled': False})
+    return jsonify(dict(chat_pipeline.get_metrics(), enabled=True))
+
 # Admin Panel Routes
 
 @app.route('/admin/set-channel', methods=['POST'])
@@ -345,6 +763,7 @@ def set_channel():
         success = kick_api.set_channel(username)
         
         if success:
+            shared_state.set('kick_channel', username)
             # Socket.IO ile güncelleme bildir
             socketio.emit('channel_updated', {'channel': username})
             return jsonify({'success': True, 'message': f'{username} kanalı başarıyla ayarlandı'})
@@ -366,7 +785,7 @@ def test_connection():
             return jsonify({'success': False, 'message': 'Kullanıcı adı gerekli'})
         
         # Kanal bilgilerini test et
-        channel_info = kick_api.get_channel_info(username)
+        channel_info = kick_api.get_channel_info(username, fresh=True)
         
         if channel_info:
             return jsonify({
@@ -404,11 +823,13 @@ def update_settings():
             return jsonify({'success': False, 'message': 'Min çarpan max çarpandan küçük olmalı'})
         
         # Oyun ayarlarını güncelle
-        zeppelin_game.update_settings(
-            win_rate=win_rate / 100,
-            min_multiplier=min_multiplier,
-            max_multiplier=max_multiplier
-        )
+        settings = {
+            'win_rate': win_rate / 100,
+            'min_multiplier': min_multiplier,
+            'max_multiplier': max_multiplier
+        }
+        zeppelin_game.update_settings(**settings)
+        shared_state.set('game_settings', settings)
         
         return jsonify({'success': True, 'message': 'Oyun ayarları güncellendi'})
         
@@ -416,6 +837,38 @@ def update_settings():
         logger.error(f"Update settings error: {e}")
         return jsonify({'success': False, 'message': f'Ayar güncellenirken hata: {str(e)}'})
 
+# Kick chat alımı (CHAT_INGEST_ENABLED=1 ile açılır)
+chat_pipeline = None
+if os.environ.get("CHAT_INGEST_ENABLED", "0") == "1":
+    def start_chat_ingest():
+        """Kick girişi (kanal/chat odası) gerektirdiği için ısınmada başlatılır"""
+        global chat_pipeline
+        chat_pipeline = kick_api.listen_to_chat(
+            process_chat_command,
+            queue_size=int(os.environ.get("CHAT_INGEST_QUEUE_SIZE", "1000")),
+            workers=int(os.environ.get("CHAT_INGEST_WORKERS", "4")),
+            drop_policy=os.environ.get("CHAT_INGEST_DROP_POLICY", "drop_oldest"),
+            autostart=not shared_state.shared
+        )
+        if chat_pipeline:
+            atexit.register(chat_pipeline.stop)
+            if shared_state.shared:
+                socketio.start_background_task(run_chat_ingest_leader)
+
+    def run_chat_ingest_leader():
+        """Çok worker'lı modda chat'i yalnızca kilidi tutan worker dinler"""
+        owner = instance_id()
+        while True:
+            if shared_state.acquire_lock('chat_ingest', owner, ttl=15):
+                chat_pipeline.start()
+            else:
+                chat_pipeline.stop()
+            socketio.sleep(5)
+
+    startup.add('chat_ingest', start_chat_ingest, required=False)
+
+startup.start(socketio.start_background_task)
+
 if __name__ == '__main__':
     logger.info('Zeppelin oyunu başlatılıyor...')
     socketio.run(app, host='0.0.0.0', port=5000, debug=True)
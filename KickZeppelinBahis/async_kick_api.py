@@ -0,0 +1,243 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from kick_api import KICK_AUTH_URL, mock_channel_info, channel_info_from_payload
+from http_client import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+KICK_CHAT_API_URL = 'https://api.kick.com/public/v1/chat'
+
+
+class AsyncKickAPI:
+    """
+    KickAPI'nin asyncio sürümü (aiohttp)
+
+    ``KickAPI`` ile aynı yüzeyi sunar ama hiçbir çağrı event loop'u
+    bloklamaz. Kurucu ağa çıkmaz; token ilk ihtiyaçta tek bir görevle
+    alınır ve süresi dolunca yenilenir. Kanal bilgisi token beklemez: token
+    henüz yoksa istek tokensız gider ve token arka planda alınır. Birçok kanal
+    ``get_channels_info`` ile eşzamanlı sorgulanabilir.
+
+    Yeniden deneme kuralı (``RetryPolicy``) ve devre kesici senkron
+    ``PooledHTTPClient`` ile ortaktır. Uygulama eventlet altında senkron
+    ``KickAPI``'yi kullanır; bu istemci asyncio tabanlı araçlar ve
+    hat dışı betikler içindir.
+
+    Kullanım:
+        async with AsyncKickAPI() as kick:
+            infos = await kick.get_channels_info(['kanal1', 'kanal2'])
+    """
+
+    def __init__(self, pool_size: int = 20, budget: float = 5.0, max_retries: int = 3,
+                 max_concurrency: int = 10, breaker: Optional[CircuitBreaker] = None,
+                 retry: Optional[RetryPolicy] = None):
+        """
+        Args:
+            pool_size: Açık tutulan en fazla bağlantı
+            budget: Yeniden denemeler dahil istek başına toplam süre (sn)
+            max_retries: İlk denemeden sonraki en fazla yeniden deneme
+            max_concurrency: ``get_channels_info`` için eşzamanlı istek sınırı
+            breaker: Devre kesici (varsayılan: 5 hata / 30 sn)
+            retry: Yeniden deneme kuralı (verilirse ``max_retries`` yok sayılır)
+        """
+        self.client_id = os.environ.get('KICK_CLIENT_ID', '01K0FSGZDGW771BFF7KDPZA3XY')
+        self.client_secret = os.environ.get('KICK_CLIENT_SECRET', 'aa11182885b6d1b25f6f8c105c4fd0ea32040a950de5e21a41a1913f190957aa')
+        self.channel_id = os.environ.get('KICK_CHANNEL_ID', 'test_channel')
+        self.current_channel = None
+        self.api_base_url = 'https://kick.com/api/v1'
+        self.chat_api_url = os.environ.get('KICK_CHAT_API_URL', KICK_CHAT_API_URL)
+        self.mock_mode = False
+
+        self.pool_size = pool_size
+        self.budget = budget
+        self.retry = retry or RetryPolicy(max_retries)
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+
+        self.access_token = None
+        self._token_expires_at = 0.0
+        self._token_task: Optional[asyncio.Task] = None
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            try:
+                import aiohttp
+            except ImportError as e:
+                raise ImportError('AsyncKickAPI için aiohttp paketi gerekli: pip install aiohttp') from e
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                headers={'Accept': 'application/json', 'User-Agent': 'ZeppelinBot/1.0'}
+            )
+        return self._session
+
+    async def close(self):
+        """Bağlantı havuzunu kapat"""
+        if self._token_task and not self._token_task.done():
+            self._token_task.cancel()
+        if self._session is not None:
+            await self._session.close()
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """
+        Bütçe, jitter'lı üstel yeniden deneme ve devre kesiciyle istek
+
+        Returns:
+            (durum kodu, JSON gövde veya None)
+        """
+        permit = self.breaker.allow()
+        if not permit:
+            raise CircuitOpenError(f'Kick API devresi açık: {url}')
+        try:
+            return await self._send(method, url, **kwargs)
+        finally:
+            # İptal (CancelledError) dahil her durumda deneme isteğini bırak
+            if permit == CircuitBreaker.HALF_OPEN:
+                self.breaker.end_trial()
+
+    async def _send(self, method: str, url: str, **kwargs):
+        """Yeniden denemeli gönderim (``_request`` devre kesici iznini aldıktan sonra)"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget
+        session = self._get_session()
+        last_error = None
+        status, body = None, None
+
+        for attempt in range(self.retry.max_retries + 1):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=remaining),
+                                           **kwargs) as response:
+                    status = response.status
+                    try:
+                        body = await response.json(content_type=None)
+                    except ValueError:
+                        body = None
+                if not self.retry.retryable(status):
+                    self.breaker.record_success()
+                    return status, body
+                last_error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+                status, body = None, None
+
+            delay = self.retry.next_delay(attempt, loop.time(), deadline)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        self.breaker.record_failure()
+        if status is not None:
+            return status, body
+        raise last_error or asyncio.TimeoutError(f'Kick API isteği {self.budget:.1f} sn bütçeyi aştı: {url}')
+
+    def _token_valid(self) -> bool:
+        return self.access_token is not None and time.monotonic() < self._token_expires_at
+
+    def _start_token_refresh(self) -> asyncio.Task:
+        """Token alımını başlat; zaten süren bir alım varsa onu döndür"""
+        if self._token_task is None or self._token_task.done():
+            self._token_task = asyncio.ensure_future(self._acquire_token())
+        return self._token_task
+
+    async def _acquire_token(self):
+        """Kick API access token al (OAuth2 client credentials)"""
+        try:
+            status, body = await self._request('POST', KICK_AUTH_URL, json={
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'grant_type': 'client_credentials'
+            })
+            token = (body or {}).get('access_token') if status == 200 else None
+            if token:
+                self.access_token = token
+                # Süreden biraz önce yenile
+                self._token_expires_at = time.monotonic() + max(60, int(body.get('expires_in', 3600)) - 60)
+                logger.info('Kick API access token başarıyla alındı')
+            else:
+                logger.warning(f'Kick API authentication başarısız: {status}, mock modda devam edilecek')
+                self.mock_mode = True
+        except Exception as e:
+            logger.error(f'Kick API bağlantı hatası: {e}')
+            logger.info('Mock modda devam edilecek')
+            self.mock_mode = True
+
+    async def get_access_token(self) -> Optional[str]:
+        """Geçerli token'ı getir; gerekirse alımı bekle (eşzamanlı çağrılar tek alımı paylaşır)"""
+        if not self._token_valid() and not self.mock_mode:
+            await asyncio.shield(self._start_token_refresh())
+        return self.access_token
+
+    async def get_channel_info(self, channel_slug: str = None) -> Dict[str, Any]:
+        """Kanal bilgilerini getir (token'ı beklemez)"""
+        if not self._token_valid() and not self.mock_mode:
+            self._start_token_refresh()
+        if self.mock_mode:
+            return mock_channel_info(self.channel_id)
+
+        channel = channel_slug or self.channel_id
+        headers = {}
+        if self._token_valid():
+            headers['Authorization'] = f'Bearer {self.access_token}'
+        try:
+            status, body = await self._request('GET', f'{self.api_base_url}/channels/{channel}', headers=headers)
+            if status == 200 and body:
+                return channel_info_from_payload(body, self.channel_id)
+            logger.warning(f'Kanal bilgisi alınamadı: {status}')
+        except Exception as e:
+            logger.error(f'Kick API hatası: {e}')
+        return self._fallback_channel_info()
+
+    async def get_channels_info(self, channel_slugs: List[str]) -> List[Dict[str, Any]]:
+        """Birden çok kanalı ``max_concurrency`` sınırıyla eşzamanlı sorgula"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def lookup(slug):
+            async with semaphore:
+                return await self.get_channel_info(slug)
+
+        return await asyncio.gather(*(lookup(slug) for slug in channel_slugs))
+
+    def _fallback_channel_info(self) -> Dict[str, Any]:
+        """Hata durumunda fallback bilgiler"""
+        return dict(mock_channel_info(self.channel_id), name='Zeppelin Oyunu')
+
+    async def get_follower_count(self) -> int:
+        """Takipçi sayısını getir"""
+        channel_info = await self.get_channel_info()
+        return channel_info.get('subscriber_count', 0) if channel_info else 0
+
+    async def send_message(self, message: str) -> bool:
+        """Chat'e bot mesajı gönder (token gerektirir)"""
+        token = await self.get_access_token()
+        if self.mock_mode or not token:
+            logger.info(f'Mock mesaj gönderildi: {message}')
+            return True
+
+        try:
+            status, _ = await self._request('POST', self.chat_api_url, json={
+                'content': message,
+                'type': 'bot'
+            }, headers={'Authorization': f'Bearer {token}'})
+            if status == 401:
+                # Token iptal edilmiş; sonraki çağrıda yeniden alınır
+                self._token_expires_at = 0.0
+            return status in (200, 201)
+        except Exception as e:
+            logger.error(f'Mesaj gönderme hatası: {e}')
+            return False
@@ -0,0 +1,241 @@
+import time
+import bisect
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Saniye cinsinden histogram sınırları (0.1 ms .. 5 sn)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 12, 20, 50)
+
+
+class Histogram:
+    """Sabit kovalı histogram (Prometheus ``le`` semantiği)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Kümülatif kova sayıları, toplam ve adet"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return {'buckets': cumulative, 'sum': total, 'count': count}
+
+    def quantile(self, q: float, snapshot: Optional[Dict[str, Any]] = None) -> float:
+        """Kova içinde doğrusal ara değerle yüzdelik tahmini"""
+        snapshot = snapshot or self.snapshot()
+        count = snapshot['count']
+        if not count:
+            return 0.0
+        rank = q * count
+        previous_bound, previous_count = 0.0, 0
+        for bound, cumulative in zip(self.buckets, snapshot['buckets']):
+            if cumulative >= rank:
+                in_bucket = cumulative - previous_count
+                fraction = (rank - previous_count) / in_bucket if in_bucket else 0.0
+                return previous_bound + (bound - previous_bound) * fraction
+            previous_bound, previous_count = bound, cumulative
+        return self.buckets[-1]
+
+
+class _Trace:
+    __slots__ = ('command', 'started', 'queries')
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started = time.perf_counter()
+        self.queries = 0
+
+
+class BetTracer:
+    """
+    Bahis hattının aşama bazlı gecikme ölçümü
+
+    ``trace`` bir bahsi (veya chat komutunu) kapsar; içindeki ``stage``
+    blokları aşama histogramlarına yazılır. İz açıkken çalışan her SQL
+    ifadesi ``count_query`` ile sayılır ve bahis başına sorgu histogramına
+    eklenir. İç içe ``trace`` çağrıları dıştaki ize katılır. Ölçüm başına
+    maliyet birkaç mikro saniyedir; üretimde açık bırakılabilir.
+    """
+
+    def __init__(self, enabled: bool = True, prefix: str = 'zeppelin'):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._totals: Dict[str, Histogram] = {}
+        self._queries: Dict[str, Histogram] = {}
+        self._outcomes: Dict[tuple, int] = {}
+
+    def _histogram(self, table: Dict[str, Histogram], name: str, buckets) -> Histogram:
+        histogram = table.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(name, Histogram(buckets))
+        return histogram
+
+    def _current(self) -> Optional[_Trace]:
+        return getattr(self._local, 'trace', None)
+
+    @contextmanager
+    def trace(self, command: str):
+        """Bir bahsi / chat komutunu baştan sona ölç"""
+        if not self.enabled:
+            yield
+            return
+        if self._current() is not None:
+            yield
+            return
+
+        current = self._local.trace = _Trace(command)
+        try:
+            yield
+        finally:
+            self._local.trace = None
+            elapsed = time.perf_counter() - current.started
+            self._histogram(self._totals, current.command, LATENCY_BUCKETS).observe(elapsed)
+            self._histogram(self._queries, current.command, QUERY_BUCKETS).observe(current.queries)
+
+    def traced(self, command: str):
+        """Fonksiyonu ``trace(command)`` içinde çalıştıran dekoratör"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.trace(command):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def stage(self, name: str):
+        """İz içindeki bir aşamayı ölç"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._histogram(self._stages, name, LATENCY_BUCKETS).observe(time.perf_counter() - started)
+
+    def set_command(self, command: str):
+        """Açık izin komut etiketini değiştir (ör. chat komutu bahis çıktı)"""
+        current = self._current()
+        if current is not None:
+            current.command = command
+
+    def outcome(self, outcome: str):
+        """Açık izin sonucunu say (accepted, rejected, error ...)"""
+        if not self.enabled:
+            return
+        current = self._current()
+        key = (current.command if current else 'unknown', outcome)
+        with self._lock:
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+
+    def count_query(self, *args, **kwargs):
+        """SQLAlchemy ``before_cursor_execute`` dinleyicisi"""
+        current = self._current()
+        if current is not None:
+            current.queries += 1
+
+    def install_query_counter(self):
+        """Tüm engine'lerde sorgu sayacını etkinleştir"""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        if not event.contains(Engine, 'before_cursor_execute', self.count_query):
+            event.listen(Engine, 'before_cursor_execute', self.count_query)
+
+    def _summarize(self, histogram: Histogram) -> Dict[str, Any]:
+        snapshot = histogram.snapshot()
+        count = snapshot['count']
+        return {
+            'count': count,
+            'mean': snapshot['sum'] / count if count else 0.0,
+            'p50': histogram.quantile(0.5, snapshot),
+            'p95': histogram.quantile(0.95, snapshot),
+            'p99': histogram.quantile(0.99, snapshot)
+        }
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Admin paneli için aşama başına adet, ortalama ve yüzdelikler (ms)"""
+        def in_ms(summary):
+            return dict(summary, **{key: round(summary[key] * 1000, 3) for key in ('mean', 'p50', 'p95', 'p99')})
+
+        with self._lock:
+            stages = dict(self._stages)
+            totals = dict(self._totals)
+            queries = dict(self._queries)
+            outcomes = dict(self._outcomes)
+
+        return {
+            'enabled': self.enabled,
+            'stages': {name: in_ms(self._summarize(h)) for name, h in sorted(stages.items())},
+            'commands': {name: in_ms(self._summarize(h)) for name, h in sorted(totals.items())},
+            'queries_per_command': {
+                name: {key: round(value, 2) for key, value in self._summarize(h).items()}
+                for name, h in sorted(queries.items())
+            },
+            'outcomes': [
+                {'command': command, 'outcome': outcome, 'count': count}
+                for (command, outcome), count in sorted(outcomes.items())
+            ]
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus metin biçimi (text/plain; version=0.0.4)"""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            totals = sorted(self._totals.items())
+            queries = sorted(self._queries.items())
+            outcomes = sorted(self._outcomes.items())
+
+        lines: List[str] = []
+        self._render_histograms(lines, f'{self.prefix}_bet_stage_seconds',
+                                'Bahis hattı aşama süresi', 'stage', stages)
+        self._render_histograms(lines, f'{self.prefix}_command_seconds',
+                                'Bahis / chat komutu toplam süresi', 'command', totals)
+        self._render_histograms(lines, f'{self.prefix}_command_db_queries',
+                                'Komut başına SQL sorgusu', 'command', queries)
+        name = f'{self.prefix}_commands_total'
+        lines.append(f'# HELP {name} Sonuca göre işlenen komutlar')
+        lines.append(f'# TYPE {name} counter')
+        for (command, outcome), count in outcomes:
+            lines.append(f'{name}{{command="{command}",outcome="{outcome}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, help_text: str, label: str, items):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for value, histogram in items:
+            snapshot = histogram.snapshot()
+            for bound, cumulative in zip(histogram.buckets, snapshot['buckets']):
+                lines.append(f'{name}_bucket{{{label}="{value}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{label}="{value}",le="+Inf"}} {snapshot["count"]}')
+            lines.append(f'{name}_sum{{{label}="{value}"}} {snapshot["sum"]:.6f}')
+            lines.append(f'{name}_count{{{label}="{value}"}} {snapshot["count"]}')
@@ -0,0 +1,105 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ResultBroadcaster:
+    """
+    Oyun sonuçlarını kısa tick'lerde toplayıp tek frame olarak yayınlar
+
+    Her bahis için ayrı ``game_result`` yerine, tick boyunca biriken sonuçlar
+    tek bir ``game_results_batch`` frame'inde gönderilir. Satırlar kompakt
+    dizilerdir: [username, bet_amount, target_multiplier, actual_multiplier,
+    won, winnings, new_balance, round_hash]. Bir tick'te ``max_rows``'dan fazla sonuç
+    varsa yalnızca en son satırlar gönderilir; atlananlar özet sayaçlarında
+    yer alır.
+    """
+
+    COLUMNS = ['username', 'bet_amount', 'target_multiplier', 'actual_multiplier',
+               'won', 'winnings', 'new_balance', 'round_hash']
+
+    def __init__(self, emit: Callable[..., Any], tick_ms: int = 75, max_rows: int = 50,
+                 sleep: Callable[[float], Any] = time.sleep):
+        """
+        Args:
+            emit: Socket.IO emit fonksiyonu
+            tick_ms: Toplama aralığı (ms)
+            max_rows: Frame başına en fazla satır
+            sleep: Uyku fonksiyonu (eventlet altında socketio.sleep)
+        """
+        self.emit = emit
+        self.tick = tick_ms / 1000.0
+        self.max_rows = max_rows
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._rows: List[list] = []
+        self._seq = 0
+        self._running = False
+        self.metrics = {'published': 0, 'frames': 0, 'dropped_rows': 0}
+
+    def publish(self, result: Dict[str, Any]):
+        """Sonuçlanan bir bahsi sıradaki frame'e ekle"""
+        row = [
+            result['username'],
+            result['bet_amount'],
+            result['target_multiplier'],
+            result['actual_multiplier'],
+            1 if result['won'] else 0,
+            result['winnings'],
+            result['new_balance'],
+            result.get('round_hash')
+        ]
+        with self._lock:
+            self._rows.append(row)
+            self.metrics['published'] += 1
+
+    def flush(self) -> bool:
+        """Biriken sonuçları tek frame olarak yayınla"""
+        with self._lock:
+            if not self._rows:
+                return False
+            rows = self._rows
+            self._rows = []
+            self._seq += 1
+            seq = self._seq
+
+        wins = sum(row[4] for row in rows)
+        summary = {
+            'count': len(rows),
+            'wins': wins,
+            'total_bets': sum(row[1] for row in rows),
+            'total_winnings': sum(row[5] for row in rows)
+        }
+        dropped = max(0, len(rows) - self.max_rows)
+        if dropped:
+            rows = rows[-self.max_rows:]
+            self.metrics['dropped_rows'] += dropped
+
+        self.emit('game_results_batch', {
+            'seq': seq,
+            't': time.time(),
+            'results': rows,
+            'dropped': dropped,
+            'summary': summary
+        }, room='game_room')
+        self.metrics['frames'] += 1
+        return True
+
+    def run(self):
+        """Tick döngüsü (arka plan görevi olarak çalışır)"""
+        self._running = True
+        logger.info(f'Sonuç yayıncısı başlatıldı - tick {self.tick * 1000:.0f} ms')
+        while self._running:
+            self.sleep(self.tick)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f'Sonuç yayını hatası: {e}')
+
+    def stop(self):
+        """Tick döngüsünü durdur"""
+        self._running = False
@@ -0,0 +1,145 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """Bir slug için devam eden tek upstream isteği"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ChannelInfoCache:
+    """
+    Kanal bilgisi için TTL + stale-while-revalidate önbellek
+
+    Kayıt ``ttl`` saniye taze sayılır. Sonraki ``stale_ttl`` saniye boyunca
+    bayat kayıt hemen döndürülür ve arka planda yenilenir; admin sayfası ve
+    takip olayları ağ yolunu beklemez. Aynı slug için eşzamanlı ıskalamalar
+    tek bir upstream isteğinde birleştirilir (single-flight). Yenileme
+    başarısız olursa bayat kayıt süresi dolana kadar kullanılmaya devam eder.
+    """
+
+    def __init__(self, fetch: Callable[[str], Dict[str, Any]], ttl: float = 30.0,
+                 stale_ttl: float = 600.0, refresh_workers: int = 2):
+        """
+        Args:
+            fetch: Slug için kanal bilgisini getiren (hata fırlatabilen) fonksiyon
+            ttl: Taze kalma süresi (saniye)
+            stale_ttl: TTL sonrası bayat kaydın sunulabileceği ek süre
+            refresh_workers: Arka plan yenileme thread sayısı
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='channel-refresh')
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self.metrics = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'fetches': 0,
+            'background_refreshes': 0,
+            'errors': 0
+        }
+
+    def get(self, slug: str, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Kanal bilgisini getir
+
+        Args:
+            slug: Kanal adı
+            fresh: Önbelleği atlayıp upstream'den getir (sonuç önbelleğe yazılır)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is not None and not fresh:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self.metrics['hits'] += 1
+                    return dict(entry[1])
+                if age < self.ttl + self.stale_ttl:
+                    self.metrics['stale_hits'] += 1
+                    if slug not in self._flights:
+                        flight = self._flights[slug] = _Flight()
+                        self.metrics['background_refreshes'] += 1
+                        self._executor.submit(self._load, slug, flight)
+                    return dict(entry[1])
+
+            flight = self._flights.get(slug)
+            leader = flight is None
+            if leader:
+                flight = self._flights[slug] = _Flight()
+                self.metrics['misses'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+
+        if leader:
+            self._load(slug, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return dict(flight.value)
+
+    def _load(self, slug: str, flight: _Flight):
+        """Upstream'den getir, önbelleğe yaz ve bekleyenleri uyandır"""
+        try:
+            with self._lock:
+                self.metrics['fetches'] += 1
+            value = self.fetch(slug)
+            with self._lock:
+                self._entries[slug] = (time.monotonic(), value)
+            flight.value = value
+        except Exception as e:
+            with self._lock:
+                self.metrics['errors'] += 1
+            logger.warning(f'Kanal bilgisi yenilenemedi ({slug}): {e}')
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(slug, None)
+            flight.done.set()
+
+    def peek(self, slug: str) -> Optional[Dict[str, Any]]:
+        """Upstream'e gitmeden önbellekteki kaydı (süresi dolmadıysa bayat da olsa) getir"""
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl + self.stale_ttl:
+                return None
+            return dict(entry[1])
+
+    def warm(self, slug: str):
+        """Kaydı arka planda önceden yükle"""
+        with self._lock:
+            if slug in self._flights:
+                return
+            flight = self._flights[slug] = _Flight()
+            self.metrics['background_refreshes'] += 1
+        self._executor.submit(self._load, slug, flight)
+
+    def invalidate(self, slug: str):
+        """Kaydı önbellekten çıkar"""
+        with self._lock:
+            self._entries.pop(slug, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Önbellek metrikleri"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['size'] = len(self._entries)
+        served = metrics['hits'] + metrics['stale_hits'] + metrics['misses'] + metrics['coalesced']
+        metrics['hit_rate'] = (metrics['hits'] + metrics['stale_hits']) / served if served else 0.0
+        return metrics
@@ -0,0 +1,247 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KICK_PUSHER_URL = ('wss://ws-us2.pusher.com/app/32cbd69e4b950bf97679'
+                   '?protocol=7&client=js&version=8.4.0-rc2&flash=false')
+CHAT_MESSAGE_EVENT = 'App\\Events\\ChatMessageEvent'
+
+
+def decode_pusher_frame(frame: str) -> Optional[Tuple[str, str]]:
+    """
+    Kick'in Pusher frame'inden (kullanıcı adı, mesaj) çıkar
+
+    Pusher ``data`` alanını JSON string olarak gönderir; chat mesajı dışındaki
+    olaylar için None döner.
+    """
+    envelope = json.loads(frame)
+    if envelope.get('event') != CHAT_MESSAGE_EVENT:
+        return None
+    data = envelope.get('data')
+    if isinstance(data, str):
+        data = json.loads(data)
+    username = (data.get('sender') or {}).get('username')
+    content = data.get('content')
+    if not username or content is None:
+        return None
+    return username, content
+
+
+class ChatIngestPipeline:
+    """
+    Kick chat'i için sınırlı kuyruklu alım hattı
+
+    Aşamalar:
+        1. WebSocket tüketicisi: Pusher frame'lerini çözer, ``!`` ile
+           başlamayan mesajları kuyruğa almadan eler
+        2. Sınırlı asyncio kuyruğu: doluysa ``drop_policy``'ye göre en eski
+           (``drop_oldest``) veya gelen (``drop_newest``) mesaj atılır, böylece
+           tüketici hiç bloklanmaz ve gecikme sınırlı kalır
+        3. Parse aşaması: ``parse_chat_message`` ile komut çıkarılır
+        4. Sonuçlandırma havuzu: ``workers`` adet görev, komutları bloklayan
+           ``handler``'a (veritabanı + yayın) thread havuzunda iletir
+
+    Hat kendi thread'inde kendi event loop'u ile çalışır.
+    """
+
+    def __init__(self, url: str, parser: Callable[[str, str], Optional[Dict[str, Any]]],
+                 handler: Callable[[Dict[str, Any]], Any], chatroom_id: Optional[str] = None,
+                 queue_size: int = 1000, workers: int = 4, drop_policy: str = 'drop_oldest',
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        """
+        Args:
+            url: Pusher WebSocket adresi
+            parser: ``(mesaj, kullanıcı adı) -> komut`` (KickAPI.parse_chat_message)
+            handler: Komutu sonuçlandıran bloklayan fonksiyon
+            chatroom_id: Abone olunacak chat odası (``chatrooms.<id>.v2``)
+            queue_size: Kuyruk kapasitesi (mesaj)
+            workers: Eşzamanlı sonuçlandırma görevi sayısı
+            drop_policy: Kuyruk doluyken ``drop_oldest`` veya ``drop_newest``
+            reconnect_delay: İlk yeniden bağlanma beklemesi (saniye)
+            max_reconnect_delay: En uzun yeniden bağlanma beklemesi
+        """
+        if drop_policy not in ('drop_oldest', 'drop_newest'):
+            raise ValueError(f'Geçersiz drop politikası: {drop_policy}')
+
+        self.url = url
+        self.parser = parser
+        self.handler = handler
+        self.chatroom_id = chatroom_id
+        self.queue_size = queue_size
+        self.workers = workers
+        self.drop_policy = drop_policy
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+        self._started_at = None
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'received': 0,
+            'ignored': 0,
+            'enqueued': 0,
+            'dropped': 0,
+            'parsed': 0,
+            'processed': 0,
+            'failed': 0,
+            'reconnects': 0,
+            'max_queue_depth': 0,
+            'max_lag_ms': 0.0,
+            'total_lag_ms': 0.0
+        }
+
+    def _count(self, key: str, value=1):
+        with self._metrics_lock:
+            self.metrics[key] += value
+
+    def start(self):
+        """Hattı arka plan thread'inde başlat"""
+        if self.is_running():
+            return
+        self._thread = threading.Thread(target=self._run_loop, name='chat-ingest', daemon=True)
+        self._thread.start()
+        logger.info(f'Chat alım hattı başlatıldı - {self.workers} worker, kuyruk {self.queue_size}')
+
+    def is_running(self) -> bool:
+        """Hat thread'i çalışıyor mu"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout: float = 5.0):
+        """Hattı durdur (kuyruktaki komutlar işlenir)"""
+        if not self.is_running():
+            return
+        if self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self.run())
+        finally:
+            self._loop.close()
+
+    async def run(self):
+        """Tüketici, parse ve worker görevlerini çalıştır"""
+        self._stopping = asyncio.Event()
+        self._started_at = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='chat-settle')
+
+        workers = [asyncio.create_task(self._worker(queue, executor)) for _ in range(self.workers)]
+        consumer = asyncio.create_task(self._consume(queue))
+
+        await self._stopping.wait()
+        consumer.cancel()
+        # Bağlantı kapanış el sıkışmasıyla kapansın; loop kapanmadan görev bitmeli
+        await asyncio.gather(consumer, return_exceptions=True)
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        executor.shutdown(wait=True)
+        logger.info('Chat alım hattı durduruldu')
+
+    def offer(self, queue: asyncio.Queue, username: str, content: str):
+        """
+        Mesajı kuyruğa ekle (hiç bloklamaz)
+
+        Kuyruk doluysa drop politikası uygulanır.
+        """
+        item = (time.perf_counter(), username, content)
+        if queue.full():
+            if self.drop_policy == 'drop_newest':
+                self._count('dropped')
+                return
+            try:
+                queue.get_nowait()
+                queue.task_done()
+                self._count('dropped')
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(item)
+        with self._metrics_lock:
+            self.metrics['enqueued'] += 1
+            self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], queue.qsize())
+
+    async def _consume(self, queue: asyncio.Queue):
+        """WebSocket'ten frame oku, yeniden bağlanmayı üstel beklemeyle yap"""
+        try:
+            import websockets
+        except ImportError as e:
+            raise ImportError('Chat alımı için websockets paketi gerekli: pip install websockets') from e
+
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.url) as socket:
+                    if self.chatroom_id:
+                        await socket.send(json.dumps({
+                            'event': 'pusher:subscribe',
+                            'data': {'auth': '', 'channel': f'chatrooms.{self.chatroom_id}.v2'}
+                        }))
+                    delay = self.reconnect_delay
+                    async for frame in socket:
+                        self._on_frame(queue, frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._count('reconnects')
+                logger.warning(f'Chat bağlantısı koptu ({e}), {delay:.1f} sn sonra yeniden denenecek')
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_frame(self, queue: asyncio.Queue, frame: str):
+        self._count('received')
+        try:
+            message = decode_pusher_frame(frame)
+        except (ValueError, AttributeError):
+            message = None
+        # Komut olmayan mesajlar kuyruğa hiç girmez
+        if message is None or not message[1].lstrip().startswith('!'):
+            self._count('ignored')
+            return
+        self.offer(queue, *message)
+
+    async def _worker(self, queue: asyncio.Queue, executor: ThreadPoolExecutor):
+        """Parse aşaması + bloklayan sonuçlandırma"""
+        loop = asyncio.get_running_loop()
+        while True:
+            enqueued_at, username, content = await queue.get()
+            try:
+                command = self.parser(content, username)
+                if command is None:
+                    self._count('ignored')
+                    continue
+                self._count('parsed')
+                await loop.run_in_executor(executor, self.handler, command)
+                lag_ms = (time.perf_counter() - enqueued_at) * 1000
+                with self._metrics_lock:
+                    self.metrics['processed'] += 1
+                    self.metrics['total_lag_ms'] += lag_ms
+                    self.metrics['max_lag_ms'] = max(self.metrics['max_lag_ms'], lag_ms)
+            except Exception as e:
+                self._count('failed')
+                logger.error(f'Chat komutu işlenemedi ({username}): {e}')
+            finally:
+                queue.task_done()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Alım hattı metrikleri"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        processed = metrics['processed']
+        metrics['avg_lag_ms'] = metrics.pop('total_lag_ms') / processed if processed else 0.0
+        metrics['processed_per_s'] = processed / elapsed if elapsed else 0.0
+        metrics['drop_policy'] = self.drop_policy
+        return metrics
@@ -1,18 +1,81 @@
+import random
 import logging
 from typing import Dict, Any, Optional, List
-from datetime import datetime, date
-from models import db, User, GameResult, GameStats, get_or_create_daily_stats
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, User, GameResult, GameStats, GameStatsHourly, ProvablyFairChain
+from stats_aggregator import StatsAggregator
+from user_cache import UserCache
+from leaderboard import Leaderboard
+from bet_tracing import BetTracer
+from recent_games import RecentGames
+from json_migrator import UserMigrator
+from partitions import delete_archived_user_rows
+from provably_fair import new_chain_record
 
 logger = logging.getLogger(__name__)
 
 
+# game_results sorguları; migrations.PLAN_CHECKS planlarını bunlarla doğrular
+def recent_games_statement(limit: int):
+    """Son oyunlar, kullanıcı adlarıyla (ix_game_results_game_date)"""
+    return (
+        select(GameResult.user_id, User.username, GameResult.bet_amount,
+               GameResult.target_multiplier, GameResult.actual_multiplier,
+               GameResult.won, GameResult.winnings, GameResult.game_date)
+        .join(User, GameResult.user_id == User.id)
+        .order_by(GameResult.game_date.desc())
+        .limit(limit)
+    )
+
+
+def user_results_delete_statement(user_id: int):
+    """Kullanıcının oyun sonuçlarını sil (ix_game_results_user_id_game_date)"""
+    return delete(GameResult).where(GameResult.user_id == user_id)
+
+
 class DatabaseManager:
     """Veritabanı yönetimi sınıfı - JSON UserManager'ın yerine geçer"""
     
-    def __init__(self):
-        """Database manager başlat"""
+    def __init__(self, user_cache_size: int = 10000, user_cache_ttl: float = 60.0,
+                 recent_games_size: int = 200, stats_shards: int = 8,
+                 stats_max_age: float = 0.0):
+        """
+        Database manager başlat
+        
+        Args:
+            user_cache_size: Kullanıcı önbelleğinin en fazla kayıt sayısı (0 = kapalı)
+            user_cache_ttl: Kullanıcı önbelleği kayıt ömrü (saniye)
+            recent_games_size: Bellekte tutulan son oyun sayısı (0 ise her
+                okuma veritabanından yapılır)
+            stats_shards: Dönem (gün/saat) başına istatistik sayaç satırı
+            stats_max_age: İstatistik özetinin okunurken yenileneceği yaş
+                (saniye, 0 = yalnızca uzlaştırmada)
+        """
+        self.result_journal = None
+        self.stats = StatsAggregator(self._load_stats_totals, max_age=stats_max_age)
+        self.user_cache = UserCache(user_cache_size, user_cache_ttl)
+        self.leaderboard = Leaderboard(self._load_leaderboard, self._leaderboard_changes)
+        self.tracer = BetTracer(enabled=False)
+        self.recent_games = RecentGames(recent_games_size)
+        self.stats_shards = max(stats_shards, 1)
         logger.info("Database manager başlatıldı")
     
+    def attach_journal(self, journal):
+        """
+        Oyun sonuçları için write-behind journal bağla
+
+        Bağlandıktan sonra GameResult satırları ve günlük istatistikler
+        journal üzerinden toplu olarak yazılır; bakiye güncellemesi
+        senkron kalır.
+        """
+        self.result_journal = journal
+    
+    def attach_tracer(self, tracer: BetTracer):
+        """Bahis sonuçlandırma aşamalarını ölçen tracer'ı bağla"""
+        self.tracer = tracer
+    
     def register_user(self, username: str, subscriber_count: int = 0) -> Dict[str, Any]:
         """
         Yeni kullanıcı kaydet veya mevcut kullanıcıyı döndür
@@ -50,7 +113,12 @@ class DatabaseManager:
             )
             
             db.session.add(new_user)
+            db.session.flush()
+            self._bump_active_users(1)
             db.session.commit()
+            self.stats.on_user_registered(initial_balance)
+            self.leaderboard.update(username, initial_balance)
+            self.user_cache.put(username, new_user.to_dict())
             
             if initial_balance > 0:
                 message = f'🎉 {username} 100+ abone ile katıldı! {initial_balance} puan verildi.'
@@ -77,6 +145,8 @@ class DatabaseManager:
     
     def get_total_users(self):
         """Toplam kullanıcı sayısını al"""
+        if self.stats.seeded:
+            return self.stats.snapshot()['total_users']
         try:
             return User.query.count()
         except Exception as e:
@@ -85,6 +155,8 @@ class DatabaseManager:
     
     def get_active_users(self):
         """Aktif kullanıcı sayısını al (bakiyesi > 0)"""
+        if self.stats.seeded:
+            return self.stats.snapshot()['active_users']
         try:
             return User.query.filter(User.balance > 0).count()
         except Exception as e:
@@ -93,47 +165,74 @@ class DatabaseManager:
     
     def get_total_games(self):
         """Toplam oyun sayısını al"""
+        if self.stats.seeded:
+            return self.stats.snapshot()['total_games']
         try:
-            return GameResult.query.count()
+            return db.session.query(func.coalesce(func.sum(GameStats.total_games), 0)).scalar()
         except Exception as e:
             logger.error(f"Get total games error: {e}")
             return 0
     
     def get_total_winnings(self):
         """Toplam kazancı al"""
+        if self.stats.seeded:
+            return self.stats.snapshot()['total_winnings']
         try:
-            result = db.session.query(db.func.sum(GameResult.winnings)).filter_by(won=True).scalar()
+            result = db.session.query(func.sum(GameStats.total_winnings)).scalar()
             return result if result else 0
         except Exception as e:
             logger.error(f"Get total winnings error: {e}")
             return 0
     
     def get_recent_activities(self, limit=20):
-        """Son aktiviteleri al"""
+        """Son aktiviteleri al (önce bellekteki tampondan)"""
         try:
-            results = GameResult.query.order_by(GameResult.game_date.desc()).limit(limit).all()
-            activities = []
-            
-            for result in results:
-                activities.append({
-                    'username': result.player.username if result.player else 'Unknown',
-                    'bet_amount': result.bet_amount,
-                    'multiplier': result.actual_multiplier,
-                    'result': 'win' if result.won else 'lose',
-                    'timestamp': result.game_date
-                })
-            
-            return activities
+            return [
+                {
+                    'username': game['username'] or 'Unknown',
+                    'bet_amount': game['bet_amount'],
+                    'multiplier': game['actual_multiplier'],
+                    'result': 'win' if game['won'] else 'lose',
+                    'timestamp': game['game_date']
+                }
+                for game in self._recent_games(limit)
+            ]
         except Exception as e:
             logger.error(f"Get recent activities error: {e}")
             return []
     
+    def _recent_games(self, limit: int) -> List[Dict[str, Any]]:
+        """Son oyunlar, kullanıcı adlarıyla (tampon yoksa tek JOIN sorgusu)"""
+        if self.recent_games.covers(limit):
+            return self.recent_games.latest(limit)
+        return self._query_recent_games(limit)
+    
+    def _query_recent_games(self, limit: int) -> List[Dict[str, Any]]:
+        """Son oyunları kullanıcı adlarıyla tek sorguda getir"""
+        rows = db.session.execute(recent_games_statement(limit)).all()
+        return [row._asdict() for row in rows]
+    
+    def seed_recent_games(self):
+        """Son oyun tamponunu veritabanından yükle"""
+        if not self.recent_games.enabled:
+            return
+        try:
+            self.recent_games.seed(self._query_recent_games(self.recent_games.capacity))
+        except Exception as e:
+            logger.error(f'Son oyunlar yüklenemedi: {e}')
+    
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
-        """Kullanıcı bilgilerini getir"""
+        """Kullanıcı bilgilerini getir (önce önbellekten)"""
         try:
             username = username.lower().strip()
+            cached = self.user_cache.get(username)
+            if cached is not UserCache.MISS:
+                return cached
+            
             user = User.query.filter_by(username=username).first()
-            return user.to_dict() if user else None
+            user_data = user.to_dict() if user else None
+            self.user_cache.put(username, user_data)
+            return user_data
         except Exception as e:
             logger.error(f'Kullanıcı getirme hatası: {e}')
             return None
@@ -155,6 +254,7 @@ class DatabaseManager:
             if user:
                 user.update_activity()
                 db.session.commit()
+                self.user_cache.update(username, last_activity=user.last_activity.isoformat())
                 return True
             return False
         except Exception as e:
@@ -169,10 +269,14 @@ class DatabaseManager:
             user = User.query.filter_by(username=username).first()
             
             if user:
+                old_balance = user.balance
                 user.balance += amount
                 user.total_winnings += amount
                 user.update_activity()
                 db.session.commit()
+                self.stats.on_balance_changed(old_balance, user.balance)
+                self.leaderboard.update(username, user.balance)
+                self.user_cache.put(username, user.to_dict())
                 logger.debug(f'{username} bakiyesine {amount} eklendi')
                 return user.balance
             return 0
@@ -188,11 +292,15 @@ class DatabaseManager:
             user = User.query.filter_by(username=username).first()
             
             if user:
+                old_balance = user.balance
                 user.balance -= amount
                 user.total_bets += amount
                 user.games_played += 1
                 user.update_activity()
                 db.session.commit()
+                self.stats.on_balance_changed(old_balance, user.balance)
+                self.leaderboard.update(username, user.balance)
+                self.user_cache.put(username, user.to_dict())
                 logger.debug(f'{username} bakiyesinden {amount} düşüldü')
                 return user.balance
             return 0
@@ -212,6 +320,9 @@ class DatabaseManager:
                 user.balance = amount
                 user.update_activity()
                 db.session.commit()
+                self.stats.on_balance_changed(old_balance, amount)
+                self.leaderboard.update(username, amount)
+                self.user_cache.invalidate(username)
                 logger.info(f'{username} bakiyesi {old_balance} -> {amount} olarak değiştirildi')
                 return amount
             return 0
@@ -230,14 +341,58 @@ class DatabaseManager:
             return {}
     
     def get_top_users(self, limit: int = 10) -> List[tuple]:
-        """En yüksek bakiyeli kullanıcıları getir"""
+        """En yüksek bakiyeli kullanıcıları getir (sıralama tablosu yüklüyse oradan)"""
         try:
+            if self.leaderboard.seeded:
+                top = [(entry['username'], self.get_user(entry['username']))
+                       for entry in self.leaderboard.top(limit)]
+                return [(username, user) for username, user in top if user]
             users = User.query.order_by(User.balance.desc()).limit(limit).all()
             return [(user.username, user.to_dict()) for user in users]
         except Exception as e:
             logger.error(f'Top kullanıcıları getirme hatası: {e}')
             return []
     
+    def _load_leaderboard(self, after: Optional[str], limit: int) -> List[tuple]:
+        """Sıralama tablosu için kullanıcı adına göre sıralı bir parça (kullanıcı adı, bakiye)"""
+        query = select(User.username, User.balance).order_by(User.username).limit(limit)
+        if after is not None:
+            query = query.where(User.username > after)
+        return db.session.execute(query).all()
+    
+    def _leaderboard_changes(self, since: datetime) -> List[tuple]:
+        """``since``'ten sonra bakiyesi değişen kullanıcılar (her bakiye yazımı last_activity'yi günceller)"""
+        return db.session.execute(
+            select(User.username, User.balance).where(User.last_activity >= since)
+        ).all()
+    
+    def seed_leaderboard(self, sleep=None):
+        """Sıralama tablosunu veritabanından yükle"""
+        try:
+            self.leaderboard.seed(sleep=sleep)
+        except Exception as e:
+            logger.error(f'Sıralama tablosu yüklenemedi: {e}')
+    
+    def get_leaderboard(self, limit: int = 10, username: Optional[str] = None,
+                        window: int = 2) -> Dict[str, Any]:
+        """
+        Sıralama tablosu: ilk ``limit`` kullanıcı ve istenirse bir kullanıcının
+        sırası ile çevresi
+        
+        Returns:
+            ``top``, ``total`` ve ``username`` verildiyse ``me`` / ``around``
+        """
+        result = {'top': self.leaderboard.top(limit), 'total': self.leaderboard.size()}
+        if username:
+            username = username.lower().strip()
+            result['me'] = self.leaderboard.rank(username)
+            result['around'] = self.leaderboard.around(username, window)
+        return result
+    
+    def get_user_rank(self, username: str) -> Optional[Dict[str, Any]]:
+        """Kullanıcının sıralamadaki yeri (yoksa None)"""
+        return self.leaderboard.rank(username.lower().strip())
+    
     def get_user_count(self) -> int:
         """Toplam kullanıcı sayısını getir"""
         try:
@@ -253,8 +408,18 @@ class DatabaseManager:
             user = User.query.filter_by(username=username).first()
             
             if user:
+                balance = user.balance
+                # İlişki cascade'i satırları tek tek yükleyip silmesin
+                db.session.execute(user_results_delete_statement(user.id))
+                delete_archived_user_rows(db.session.connection(), user.id)
                 db.session.delete(user)
+                db.session.flush()
+                self._bump_active_users(-1)
                 db.session.commit()
+                self.stats.on_user_deleted(balance)
+                self.leaderboard.remove(username)
+                self.recent_games.forget(username)
+                self.user_cache.invalidate(username)
                 logger.info(f'Kullanıcı silindi: {username}')
                 return True
             return False
@@ -273,21 +438,30 @@ class DatabaseManager:
                 logger.error(f'Oyun sonucu kaydı için kullanıcı bulunamadı: {username}')
                 return False
             
-            game_result = GameResult(
-                user_id=user.id,
-                bet_amount=bet_amount,
-                target_multiplier=target_multiplier,
-                actual_multiplier=actual_multiplier,
-                won=won,
-                winnings=winnings,
-                game_date=datetime.utcnow()
-            )
+            game_row = {
+                'user_id': user.id,
+                'bet_amount': bet_amount,
+                'target_multiplier': target_multiplier,
+                'actual_multiplier': actual_multiplier,
+                'won': won,
+                'winnings': winnings,
+                'game_date': datetime.utcnow()
+            }
+            
+            if self.result_journal is not None:
+                self.result_journal.append(game_row)
+                self.stats.on_bet_settled(bet_amount, winnings, 0, 0)
+                self.recent_games.extend([dict(game_row, username=user.username)])
+                return True
             
+            game_result = GameResult(**game_row)
             db.session.add(game_result)
             db.session.commit()
+            self.recent_games.extend([dict(game_row, username=user.username)])
             
             # Günlük istatistikleri güncelle
             self.update_daily_stats(bet_amount, winnings)
+            self.stats.on_bet_settled(bet_amount, winnings, 0, 0)
             
             logger.debug(f'Oyun sonucu kaydedildi: {username} - {bet_amount} -> {winnings}')
             return True
@@ -297,28 +471,513 @@ class DatabaseManager:
             logger.error(f'Oyun sonucu kaydetme hatası: {e}')
             return False
     
+    def settle_bet(self, username: str, bet_amount: float, target_multiplier: float,
+                   actual_multiplier: float, won: bool, winnings: float = 0) -> Dict[str, Any]:
+        """
+        Bahsi tek transaction içinde sonuçlandır
+
+        Bakiye kontrolü ve güncellemesi tek bir koşullu UPDATE ile yapılır
+        (``WHERE balance >= :bet RETURNING balance``), böylece kontrol ile
+        düşüm arasında çift harcama yarışı oluşmaz. Aynı transaction içinde
+        GameResult satırı eklenir ve günlük GameStats sayacı artırılır;
+        journal bağlıysa bu ikisi journal'ın toplu flush'ına bırakılır ve
+        kayıt bakiye commit'inden önce journal'a eklenir.
+
+        Args:
+            username: Kullanıcı adı
+            bet_amount: Bahis miktarı
+            target_multiplier: Hedef çarpan
+            actual_multiplier: Gerçekleşen çarpan
+            won: Kazanıldı mı
+            winnings: Kazanç (bahis dahil ödeme)
+
+        Returns:
+            İşlem sonucu - başarısızlıkta ``reason`` alanı
+            ``user_not_found`` veya ``insufficient_balance`` olur
+        """
+        username = username.lower().strip()
+        now = datetime.utcnow()
+
+        try:
+            with self.tracer.stage('settle.balance_update'):
+                row = db.session.execute(
+                    update(User)
+                    .where(User.username == username, User.balance >= bet_amount)
+                    .values(
+                        balance=User.balance - bet_amount + winnings,
+                        total_bets=User.total_bets + bet_amount,
+                        total_winnings=User.total_winnings + winnings,
+                        games_played=User.games_played + 1,
+                        last_activity=now
+                    )
+                    .returning(User.id, User.balance)
+                ).first()
+
+            if row is None:
+                db.session.rollback()
+                current_balance = db.session.execute(
+                    select(User.balance).where(User.username == username)
+                ).scalar()
+                return {
+                    'success': False,
+                    'reason': 'user_not_found' if current_balance is None else 'insufficient_balance',
+                    'balance': current_balance or 0
+                }
+
+            user_id, new_balance = row
+            game_row = {
+                'user_id': user_id,
+                'bet_amount': bet_amount,
+                'target_multiplier': target_multiplier,
+                'actual_multiplier': actual_multiplier,
+                'won': won,
+                'winnings': winnings,
+                'game_date': now
+            }
+
+            if self.result_journal is not None:
+                # Sonuç bakiye commit'inden önce journal'da; commit başarısızsa iptal edilir
+                with self.tracer.stage('settle.game_result'):
+                    seqs = self.result_journal.hold([game_row])
+                try:
+                    with self.tracer.stage('settle.commit'):
+                        db.session.commit()
+                except Exception:
+                    self.result_journal.discard(seqs)
+                    raise
+                self.result_journal.release(seqs)
+            else:
+                with self.tracer.stage('settle.game_result'):
+                    db.session.execute(insert(GameResult).values(**game_row))
+                with self.tracer.stage('settle.daily_stats'):
+                    self._bump_rollups(now, 1, bet_amount, winnings)
+                with self.tracer.stage('settle.commit'):
+                    db.session.commit()
+
+            self.stats.on_bet_settled(
+                bet_amount, winnings, new_balance + bet_amount - winnings, new_balance
+            )
+            self.leaderboard.update(username, new_balance)
+            self.recent_games.extend([dict(game_row, username=username)])
+            self.user_cache.update(
+                username,
+                balance=new_balance,
+                total_bets_delta=bet_amount,
+                total_winnings_delta=winnings,
+                games_played_delta=1,
+                last_activity=now.isoformat()
+            )
+            logger.debug(f'Bahis sonuçlandı: {username} - {bet_amount} -> {winnings}')
+
+            return {
+                'success': True,
+                'user_id': user_id,
+                'balance': new_balance
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'Bahis sonuçlandırma hatası: {e}')
+            return {
+                'success': False,
+                'reason': 'error',
+                'error': str(e)
+            }
+
+    def settle_round(self, bets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Bir turdaki tüm bahisleri tek transaction'da sonuçlandır
+
+        Turdaki kullanıcıların bakiyeleri tek sorguda (Postgres'te
+        ``FOR UPDATE`` ile) okunur, karşılanamayan bahisler bellekte elenir,
+        bakiye değişiklikleri kullanıcı başına toplanıp tek bir
+        ``UPDATE ... RETURNING id`` ile uygulanır ve GameResult satırları
+        toplu eklenir. Dönen kimlikler turdaki kullanıcılarla eşleşmezse
+        (bakiye arada değişti) bahisler tek tek sonuçlandırılır.
+
+        Args:
+            bets: ``username``, ``bet_amount``, ``target_multiplier``,
+                ``actual_multiplier``, ``won`` ve ``winnings`` alanlı bahisler
+
+        Returns:
+            Aynı bahisler; ``accepted``, ``new_balance`` ve reddedilenlerde
+            ``reason``/``balance`` alanları eklenmiş olarak
+        """
+        now = datetime.utcnow()
+        usernames = {bet['username'] for bet in bets}
+
+        try:
+            accounts = {
+                row.username: {'id': row.id, 'balance': row.balance, 'start': row.balance,
+                               'stake': 0.0, 'payout': 0.0, 'games': 0}
+                for row in db.session.execute(
+                    select(User.id, User.username, User.balance)
+                    .where(User.username.in_(usernames))
+                    .with_for_update()
+                )
+            }
+
+            game_rows = []
+            for bet in bets:
+                account = accounts.get(bet['username'])
+                if account is None:
+                    bet.update(accepted=False, reason='user_not_found', balance=0)
+                    continue
+                # Aynı turdaki kazançlar sonraki bahisleri karşılamaz
+                available = account['start'] - account['stake']
+                if available < bet['bet_amount']:
+                    bet.update(accepted=False, reason='insufficient_balance', balance=available)
+                    continue
+
+                account['balance'] += bet['winnings'] - bet['bet_amount']
+                account['stake'] += bet['bet_amount']
+                account['payout'] += bet['winnings']
+                account['games'] += 1
+                bet.update(accepted=True, new_balance=account['balance'])
+                game_rows.append({
+                    'user_id': account['id'],
+                    'bet_amount': bet['bet_amount'],
+                    'target_multiplier': bet['target_multiplier'],
+                    'actual_multiplier': bet['actual_multiplier'],
+                    'won': bet['won'],
+                    'winnings': bet['winnings'],
+                    'game_date': now
+                })
+
+            touched = [account for account in accounts.values() if account['games']]
+            if not touched:
+                db.session.rollback()
+                return bets
+
+            users = User.__table__
+
+            def per_user(field):
+                return case({a['id']: a[field] for a in touched}, value=users.c.id)
+
+            stake, payout = per_user('stake'), per_user('payout')
+            updated = set(db.session.execute(
+                update(users)
+                .where(users.c.id.in_([a['id'] for a in touched]), users.c.balance >= stake)
+                .values(
+                    balance=users.c.balance - stake + payout,
+                    total_bets=users.c.total_bets + stake,
+                    total_winnings=users.c.total_winnings + payout,
+                    games_played=users.c.games_played + per_user('games'),
+                    last_activity=now
+                )
+                .returning(users.c.id)
+            ).scalars())
+
+            if updated != {a['id'] for a in touched}:
+                # Okuma ile yazma arasında bakiye değişti - bahis bahis sonuçlandır
+                db.session.rollback()
+                logger.warning('Tur toplu sonuçlandırması çakıştı, tek tek sonuçlandırılıyor')
+                return self._settle_round_individually(bets)
+
+            if self.result_journal is not None:
+                seqs = self.result_journal.hold(game_rows)
+                try:
+                    db.session.commit()
+                except Exception:
+                    self.result_journal.discard(seqs)
+                    raise
+                self.result_journal.release(seqs)
+            else:
+                db.session.execute(insert(GameResult), game_rows)
+                self._bump_rollups(
+                    now, len(game_rows),
+                    sum(row['bet_amount'] for row in game_rows),
+                    sum(row['winnings'] for row in game_rows)
+                )
+                db.session.commit()
+
+            usernames_by_id = {account['id']: username for username, account in accounts.items()}
+            self.recent_games.extend(dict(row, username=usernames_by_id[row['user_id']]) for row in game_rows)
+
+            for username, account in accounts.items():
+                if not account['games']:
+                    continue
+                self.stats.on_bet_settled(
+                    account['stake'], account['payout'],
+                    account['start'], account['balance'], games=account['games']
+                )
+                self.leaderboard.update(username, account['balance'])
+                self.user_cache.update(
+                    username,
+                    balance=account['balance'],
+                    total_bets_delta=account['stake'],
+                    total_winnings_delta=account['payout'],
+                    games_played_delta=account['games'],
+                    last_activity=now.isoformat()
+                )
+
+            logger.debug(f'Tur sonuçlandı: {len(game_rows)} bahis, {len(touched)} kullanıcı')
+            return bets
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'Tur sonuçlandırma hatası: {e}')
+            for bet in bets:
+                if 'accepted' not in bet or bet['accepted']:
+                    bet.update(accepted=False, reason='error', balance=0)
+            return bets
+
+    def _settle_round_individually(self, bets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Toplu yol çakıştığında bahisleri settle_bet ile tek tek sonuçlandır"""
+        for bet in bets:
+            settlement = self.settle_bet(
+                bet['username'], bet['bet_amount'], bet['target_multiplier'],
+                bet['actual_multiplier'], bet['won'], bet['winnings']
+            )
+            if settlement['success']:
+                bet.update(accepted=True, new_balance=settlement['balance'])
+            else:
+                bet.update(accepted=False, reason=settlement['reason'],
+                           balance=settlement.get('balance', 0))
+        return bets
+
+    def write_game_results(self, rows: List[Dict[str, Any]]):
+        """
+        Oyun sonuçlarını toplu olarak yaz (journal flush yolu)
+
+        Tüm satırlar tek bir executemany INSERT ile eklenir ve özet
+        tabloları saat başına tek UPDATE ile artırılır. ``journal_id``'si
+        zaten yazılmış satırlar (checkpoint'ten önce çöken bir flush'ın
+        tekrarı) atlanır ve özetlere tekrar eklenmez.
+
+        Args:
+            rows: GameResult kolon değerleri (``journal_id`` ile)
+        """
+        try:
+            inserted = set(db.session.execute(self._journal_insert_statement(), rows).scalars())
+            rows = [row for row in rows if row['journal_id'] in inserted]
+
+            per_hour = {}
+            for row in rows:
+                hour = per_hour.setdefault(row['game_date'].replace(minute=0, second=0, microsecond=0),
+                                           [0, 0.0, 0.0])
+                hour[0] += 1
+                hour[1] += row['bet_amount']
+                hour[2] += row['winnings']
+
+            # Tek shard ve artan saat sırası: eşzamanlı yazarlar satırları aynı sırada kilitler
+            shard = self._stats_shard()
+            for stat_hour, (games, bets, winnings) in sorted(per_hour.items()):
+                self._bump_rollups(stat_hour, games, bets, winnings, shard=shard)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _journal_insert_statement(self):
+        """Lehçeye göre journal_id çakışmasında hiçbir şey yapmayan, eklenenleri döndüren INSERT"""
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return insert(GameResult).returning(GameResult.journal_id)
+        return (dialect_insert(GameResult)
+                .on_conflict_do_nothing(index_elements=['journal_id', 'game_date'])
+                .returning(GameResult.journal_id))
+
+    def _stats_shard(self) -> int:
+        """Bu yazımın artıracağı sayaç satırı"""
+        return random.randrange(self.stats_shards)
+
+    def _bump_rollups(self, moment: datetime, games: int, bets: float, winnings: float,
+                      shard: Optional[int] = None):
+        """Saatlik ve günlük özet sayaçlarını artır (commit etmez)"""
+        shard = self._stats_shard() if shard is None else shard
+        self._bump_row(
+            GameStatsHourly, GameStatsHourly.stat_hour,
+            moment.replace(minute=0, second=0, microsecond=0), shard,
+            total_games=GameStatsHourly.total_games + games,
+            total_bets=GameStatsHourly.total_bets + bets,
+            total_winnings=GameStatsHourly.total_winnings + winnings,
+            updated_at=datetime.utcnow()
+        )
+        self._bump_row(
+            GameStats, GameStats.stat_date, moment.date(), shard,
+            seed=self._active_users_seed,
+            total_games=GameStats.total_games + games,
+            total_bets=GameStats.total_bets + bets,
+            total_winnings=GameStats.total_winnings + winnings,
+            updated_at=datetime.utcnow()
+        )
+
+    def _bump_row(self, model, key_column, key, shard: int, seed=None, **values):
+        """
+        Dönemin ``shard`` sayaç satırını atomik UPDATE ile artır
+
+        Aynı dönemin farklı shard'larına yazan bahisler birbirini beklemez.
+        Dönemin ilk yazımında tüm shard satırları oluşturulur; ``seed``
+        verilirse döndürdüğü değerler 0. shard'a yazılır.
+        """
+        where = (key_column == key, model.shard == shard)
+        result = db.session.execute(update(model).where(*where).values(**values))
+        if result.rowcount:
+            return
+
+        # Dönemin ilk yazımı - satırları oluştur, eşzamanlı oluşturmada tekrar dene
+        fields = seed() if seed else {}
+        for index in range(self.stats_shards):
+            try:
+                with db.session.begin_nested():
+                    db.session.add(model(**{key_column.key: key, 'shard': index},
+                                         **(fields if index == 0 else {})))
+            except IntegrityError:
+                pass
+        db.session.execute(update(model).where(*where).values(**values))
+
+    def _active_users_seed(self, delta: int = 0) -> Dict[str, Any]:
+        """Günün ilk satırı için kullanıcı sayısı (gün başına bir kez sayılır)"""
+        count = db.session.execute(select(func.count(User.id))).scalar()
+        return {'active_users': count - delta}
+
+    def _bump_active_users(self, delta: int):
+        """
+        Bugünkü kullanıcı sayısını kayıt / silme olayıyla güncelle (commit etmez)
+
+        Değişiklik flush edildikten sonra çağrılır; günün satırları bu çağrıda
+        oluşturulursa sayım değişikliği zaten içerdiğinden ``delta`` düşülür.
+        """
+        self._bump_row(
+            GameStats, GameStats.stat_date, datetime.utcnow().date(), self._stats_shard(),
+            seed=lambda: self._active_users_seed(delta),
+            active_users=GameStats.active_users + delta,
+            updated_at=datetime.utcnow()
+        )
+
     def update_daily_stats(self, bet_amount: float, winnings: float):
-        """Günlük istatistikleri güncelle"""
+        """Günlük ve saatlik istatistikleri güncelle"""
         try:
-            stats = get_or_create_daily_stats()
-            
-            stats.total_games += 1
-            stats.total_bets += bet_amount
-            stats.total_winnings += winnings
-            stats.active_users = User.query.count()
-            stats.updated_at = datetime.utcnow()
-            
+            self._bump_rollups(datetime.utcnow(), 1, bet_amount, winnings)
             db.session.commit()
             
         except Exception as e:
             db.session.rollback()
             logger.error(f'Günlük istatistik güncelleme hatası: {e}')
     
+    def get_stats_history(self, grain: str = 'day', limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        Özet tablolarından oyun geçmişi (en yeniden eskiye)
+        
+        Args:
+            grain: ``hour`` (game_stats_hourly) veya ``day`` (game_stats)
+            limit: Dönem sayısı
+        """
+        model, key_column = (GameStatsHourly, GameStatsHourly.stat_hour) if grain == 'hour' \
+            else (GameStats, GameStats.stat_date)
+        columns = [
+            key_column,
+            func.sum(model.total_games).label('total_games'),
+            func.sum(model.total_bets).label('total_bets'),
+            func.sum(model.total_winnings).label('total_winnings'),
+            func.max(model.updated_at).label('updated_at')
+        ]
+        if model is GameStats:
+            columns.append(func.sum(GameStats.active_users).label('active_users'))
+        try:
+            rows = db.session.execute(
+                select(*columns).group_by(key_column).order_by(key_column.desc()).limit(limit)
+            ).all()
+            return [
+                dict(row._asdict(), **{
+                    key_column.key: row[0].isoformat(),
+                    'updated_at': row.updated_at.isoformat() if row.updated_at else None
+                })
+                for row in rows
+            ]
+        except Exception as e:
+            logger.error(f'İstatistik geçmişi getirme hatası: {e}')
+            return []
+    
+    def seed_stats(self):
+        """İstatistik özetini veritabanından yükle"""
+        try:
+            self.stats.seed()
+        except Exception as e:
+            logger.error(f'İstatistik özeti yüklenemedi: {e}')
+
+    def _load_stats_totals(self) -> Dict[str, Any]:
+        """
+        İstatistik özeti için gerçek toplamları hesapla
+
+        Journal'da bekleyen sonuçlar henüz özet tablolarında değildir;
+        flush durdurulup veritabanı toplamlarına kuyruktakiler eklenir.
+        """
+        if self.result_journal is None:
+            return self._query_stats_totals()
+        with self.result_journal.flush_paused():
+            totals = self._query_stats_totals()
+            pending = self.result_journal.pending_totals(datetime.utcnow().date())
+        for field, value in pending.items():
+            totals[field] += value
+        return totals
+
+    def _query_stats_totals(self) -> Dict[str, Any]:
+        """Kullanıcı tablosu ve özet tablolarındaki toplamlar"""
+        total_users, active_users, total_balance = db.session.execute(
+            select(
+                func.count(User.id),
+                func.count(User.id).filter(User.balance > 0),
+                func.coalesce(func.sum(User.balance), 0)
+            )
+        ).one()
+        # Ham game_results saklama süresiyle silinebilir; toplamlar özetlerden
+        total_games, total_bets, total_winnings = db.session.execute(
+            select(
+                func.coalesce(func.sum(GameStats.total_games), 0),
+                func.coalesce(func.sum(GameStats.total_bets), 0),
+                func.coalesce(func.sum(GameStats.total_winnings), 0)
+            )
+        ).one()
+        today = self._today_totals()
+
+        return {
+            'total_users': total_users,
+            'active_users': active_users,
+            'total_balance': float(total_balance),
+            'total_games': total_games,
+            'total_bets': float(total_bets),
+            'total_winnings': float(total_winnings),
+            'today_games': today['total_games'],
+            'today_bets': today['total_bets'],
+            'today_winnings': today['total_winnings']
+        }
+
+    def _today_totals(self) -> Dict[str, Any]:
+        """Bugünün shard satırlarının toplamı"""
+        games, bets, winnings = db.session.execute(
+            select(
+                func.coalesce(func.sum(GameStats.total_games), 0),
+                func.coalesce(func.sum(GameStats.total_bets), 0),
+                func.coalesce(func.sum(GameStats.total_winnings), 0)
+            ).where(GameStats.stat_date == datetime.utcnow().date())
+        ).one()
+        return {'total_games': int(games), 'total_bets': float(bets), 'total_winnings': float(winnings)}
+
     def get_game_stats(self) -> Dict[str, Any]:
         """Oyun istatistiklerini getir"""
+        if self.stats.seeded:
+            snapshot = self.stats.snapshot()
+            return {
+                'total_games': int(snapshot['total_games']),
+                'total_bets': float(snapshot['total_bets']),
+                'total_winnings': float(snapshot['total_winnings']),
+                'active_users': snapshot['total_users'],
+                'total_balance': float(snapshot['total_balance']),
+                'today_games': snapshot['today_games'],
+                'today_bets': snapshot['today_bets'],
+                'today_winnings': snapshot['today_winnings']
+            }
+        
         try:
             # Bugünkü istatistikler
-            today_stats = get_or_create_daily_stats()
+            today_stats = self._today_totals()
             
             # Tüm zamanların istatistikleri
             all_time_games = db.session.query(db.func.sum(GameStats.total_games)).scalar() or 0
@@ -334,9 +993,9 @@ class DatabaseManager:
                 'total_winnings': float(all_time_winnings),
                 'active_users': User.query.count(),
                 'total_balance': float(total_balance),
-                'today_games': today_stats.total_games,
-                'today_bets': today_stats.total_bets,
-                'today_winnings': today_stats.total_winnings
+                'today_games': today_stats['total_games'],
+                'today_bets': today_stats['total_bets'],
+                'today_winnings': today_stats['total_winnings']
             }
             
         except Exception as e:
@@ -353,48 +1012,116 @@ class DatabaseManager:
             }
     
     def get_recent_games(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Son oyunları getir"""
+        """Son oyunları getir (önce bellekteki tampondan; alanlar RecentGames.FIELDS)"""
         try:
-            results = GameResult.query.order_by(GameResult.game_date.desc()).limit(limit).all()
-            return [result.to_dict() for result in results]
+            return [dict(game, game_date=game['game_date'].isoformat()) for game in self._recent_games(limit)]
         except Exception as e:
             logger.error(f'Son oyunları getirme hatası: {e}')
             return []
     
+    def claim_chain_rounds(self, chain_length: int, count: int) -> Dict[str, Any]:
+        """
+        Güncel provably-fair zincirinden ``count`` tur ayır
+
+        Konum tek bir UPDATE ... RETURNING ile artırılır; eşzamanlı worker'lar
+        hiçbir zaman aynı turu almaz. Zincir yoksa veya bittiyse yeni seed ile
+        bir sonraki zincir eklenir (aynı anda ekleyen worker birincil anahtar
+        çakışmasında yeniden dener).
+
+        Args:
+            chain_length: Yeni zincir oluşturulursa tur sayısı
+            count: Ayrılacak tur sayısı (0 ise yalnızca güncel zincir döner)
+
+        Returns:
+            ``chain_id``, ``seed``, ``terminating_hash``, ``chain_length`` ve
+            ayrılan ``start``/``end`` konumları (turlar ``start+1..end``)
+        """
+        chains = ProvablyFairChain.__table__
+        latest = select(func.max(chains.c.id)).scalar_subquery()
+        while True:
+            try:
+                row = db.session.execute(
+                    update(chains)
+                    .where(chains.c.id == latest, chains.c.next_index < chains.c.chain_length)
+                    .values(next_index=chains.c.next_index + count)
+                    .returning(chains.c.id, chains.c.seed, chains.c.terminating_hash,
+                               chains.c.chain_length, chains.c.next_index)
+                ).one_or_none()
+                if row is not None:
+                    db.session.commit()
+                    end = min(row.next_index, row.chain_length)
+                    return {'chain_id': row.id, 'seed': row.seed, 'terminating_hash': row.terminating_hash,
+                            'chain_length': row.chain_length, 'start': row.next_index - count, 'end': end}
+
+                chain_id = (db.session.execute(select(latest)).scalar() or 0) + 1
+                record = new_chain_record(chain_id, chain_length)
+                db.session.add(ProvablyFairChain(
+                    id=chain_id, seed=record['seed'], terminating_hash=record['terminating_hash'],
+                    chain_length=chain_length, next_index=min(count, chain_length)
+                ))
+                db.session.commit()
+                return dict(record, start=0, end=min(count, chain_length))
+            except IntegrityError:
+                # Başka bir worker aynı zinciri ekledi; onun zincirinden ayır
+                db.session.rollback()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def chain_commitments(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Son provably-fair zincirlerinin yayınlanan bitiş hash'leri (yeniden eskiye)"""
+        rows = db.session.execute(
+            select(ProvablyFairChain.id, ProvablyFairChain.terminating_hash, ProvablyFairChain.chain_length)
+            .order_by(ProvablyFairChain.id.desc()).limit(limit)
+        ).all()
+        return [{'chain_id': row.id, 'terminating_hash': row.terminating_hash, 'chain_length': row.chain_length}
+                for row in rows]
+    
     def migrate_from_json(self, json_users: Dict[str, Any]) -> bool:
-        """JSON verilerini PostgreSQL'e migrate et"""
+        """JSON verilerini PostgreSQL'e migrate et (bellekteki dict için)"""
         try:
-            migrated_count = 0
-            
-            for username, user_data in json_users.items():
-                if username == "_metadata":
-                    continue
-                
-                # Kullanıcı zaten var mı kontrol et
-                existing_user = User.query.filter_by(username=username).first()
-                if existing_user:
-                    continue
-                
-                # JSON'dan kullanıcı oluştur
-                new_user = User(
-                    username=username,
-                    balance=user_data.get('balance', 0),
-                    total_bets=user_data.get('total_bets', 0),
-                    total_winnings=user_data.get('total_winnings', 0),
-                    games_played=user_data.get('games_played', 0),
-                    registration_date=datetime.fromisoformat(user_data.get('registration_date', datetime.utcnow().isoformat())),
-                    last_activity=datetime.fromisoformat(user_data.get('last_activity', datetime.utcnow().isoformat())),
-                    subscriber_count_at_registration=user_data.get('subscriber_count_at_registration', 0)
-                )
-                
-                db.session.add(new_user)
-                migrated_count += 1
-            
-            db.session.commit()
-            logger.info(f'{migrated_count} kullanıcı JSON\'dan PostgreSQL\'e migrate edildi')
+            result = UserMigrator().migrate(json_users.items())
+            self._after_migration(result)
             return True
             
         except Exception as e:
             db.session.rollback()
             logger.error(f'JSON migration hatası: {e}')
-            return False
\ No newline at end of file
+            return False
+    
+    def migrate_from_json_file(self, path: str, chunk_size: int = 1000,
+                               checkpoint_path: Optional[str] = None, progress=None) -> Dict[str, Any]:
+        """
+        JSON dosyasını akışla okuyup parça parça migrate et
+        
+        Dosya belleğe alınmaz; her parça tek sorgu + tek toplu INSERT'tir.
+        ``checkpoint_path`` verilirse yarıda kalan migrasyon kaldığı yerden sürer.
+        
+        Returns:
+            ``success`` ve migrasyon sayaçları (eklenen, mevcut, satır/sn)
+        """
+        try:
+            result = UserMigrator(chunk_size=chunk_size, checkpoint_path=checkpoint_path,
+                                  progress=progress).migrate_file(path)
+            self._after_migration(result)
+            return dict(result, success=True)
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'JSON migration hatası: {e}')
+            return {'success': False, 'error': str(e)}
+    
+    def _after_migration(self, result: Dict[str, Any]):
+        """Toplu eklenen kullanıcılar için önbelleği ve istatistikleri tazele"""
+        self.user_cache.clear()
+        if result['inserted']:
+            try:
+                self._bump_active_users(result['inserted'])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'Günlük kullanıcı sayısı güncellenemedi: {e}')
+        self.seed_stats()
+        self.seed_leaderboard()
+        logger.info(f'{result["inserted"]} kullanıcı JSON\'dan PostgreSQL\'e migrate edildi '
+                    f'({result["existing"]} zaten vardı, {result["rows_per_s"]:.0f} satır/sn)')
\ No newline at end of file
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - Sahte Kick Chat Sunucusu
+Kayıtlı (veya üretilmiş) chat mesajı izini Pusher protokolüyle belirli bir
+hızda yeniden oynatır. Chat alım hattının sürdürülebilir mesaj/sn değerini
+ölçmek için kullanılır.
+
+Örnekler:
+    # Yalnızca sunucu: uygulamayı KICK_CHAT_WS_URL=ws://127.0.0.1:8765 ile başlat
+    python fake_chat_server.py --rate 500
+
+    # Kayıtlı izi oynat (JSON satırları: {"username": ..., "content": ...})
+    python fake_chat_server.py --trace chat_trace.jsonl --rate 2000
+
+    # Ölçüm: sunucu + alım hattı aynı süreçte, uygulama geçici SQLite ile
+    python fake_chat_server.py --bench --app --rate 1000 --duration 20
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+from typing import Dict, Any, List
+
+from chat_ingest import CHAT_MESSAGE_EVENT
+
+
+def load_trace(path: str) -> List[Dict[str, str]]:
+    """JSON satırı biçimindeki chat izini oku"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_trace(users: int, command_ratio: float, seed: int, size: int = 10000) -> List[Dict[str, str]]:
+    """Gerçekçi karışımda (çoğu sohbet, bir kısmı komut) iz üret"""
+    rng = random.Random(seed)
+    chatter = ['selam', 'hadi hadi', 'KEKW', 'uçuyor 🚀', 'bu tur patlar', 'gg', 'ne oldu?']
+    trace = []
+    for _ in range(size):
+        username = f'chat_{rng.randrange(users):05d}'
+        if rng.random() < command_ratio:
+            if rng.random() < 0.2:
+                content = '!bakiye'
+            else:
+                content = f'!bet {rng.choice([1, 5, 10, 25])} {round(rng.uniform(1.1, 5.0), 2)}'
+        else:
+            content = rng.choice(chatter)
+        trace.append({'username': username, 'content': content})
+    return trace
+
+
+def pusher_frame(username: str, content: str, message_id: int) -> str:
+    """Kick'in gönderdiği biçimde chat mesajı frame'i"""
+    return json.dumps({
+        'event': CHAT_MESSAGE_EVENT,
+        'channel': 'chatrooms.0.v2',
+        'data': json.dumps({
+            'id': str(message_id),
+            'content': content,
+            'type': 'message',
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'sender': {'id': hash(username) & 0xFFFFFF, 'username': username, 'slug': username}
+        })
+    })
+
+
+class FakeChatServer:
+    """
+    İzi bağlanan her istemciye ``rate`` mesaj/sn ile gönderen sunucu
+
+    Hız bağlantı başınadır; ``sent`` tüm bağlantılarda gönderilen toplamdır.
+    """
+
+    def __init__(self, trace: List[Dict[str, str]], rate: float, host: str = '127.0.0.1', port: int = 8765):
+        self.trace = trace
+        self.rate = rate
+        self.host = host
+        self.port = port
+        self.sent = 0
+
+    async def _handle(self, socket):
+        from websockets.exceptions import ConnectionClosed
+
+        try:
+            await self._replay(socket)
+        except ConnectionClosed:
+            # İstemci ayrıldı; yalnızca bu bağlantının gönderimi biter
+            pass
+
+    async def _replay(self, socket):
+        await socket.send(json.dumps({
+            'event': 'pusher:connection_established',
+            'data': json.dumps({'socket_id': '0.0', 'activity_timeout': 120})
+        }))
+        # Zamanlamayı 10 ms'lik dilimlerle tut; yüksek hızlarda tek tek uyumak yetişmez
+        started = time.perf_counter()
+        index = 0
+        while True:
+            due = int((time.perf_counter() - started) * self.rate)
+            while index < due:
+                message = self.trace[index % len(self.trace)]
+                await socket.send(pusher_frame(message['username'], message['content'], index))
+                index += 1
+                self.sent += 1
+            await asyncio.sleep(0.01)
+
+    async def serve(self, ready: threading.Event = None):
+        import websockets
+
+        async with websockets.serve(self._handle, self.host, self.port):
+            if ready:
+                ready.set()
+            await asyncio.Future()
+
+
+def spawn_app_handler():
+    """Uygulamayı geçici SQLite ile yükle ve chat komut işleyicisini döndür"""
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{tempfile.mkdtemp()}/chat_bench.db')
+    os.environ.setdefault('RESULT_JOURNAL_PATH', os.path.join(tempfile.mkdtemp(), 'chat_bench.journal'))
+    from app import process_chat_command
+    return process_chat_command
+
+
+def register_chat_users(users: int):
+    """İzdeki kullanıcıları başlangıç puanıyla kaydet"""
+    from app import app, db_manager, startup
+    startup.wait(60)
+    with app.app_context():
+        for index in range(users):
+            db_manager.register_user(f'chat_{index:05d}', 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sahte Kick chat sunucusu')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--trace', help='JSON satırı chat izi (varsayılan: üretilmiş iz)')
+    parser.add_argument('--rate', type=float, default=200.0, help='Saniyede gönderilen mesaj')
+    parser.add_argument('--users', type=int, default=500, help='Üretilmiş izdeki kullanıcı sayısı')
+    parser.add_argument('--command-ratio', type=float, default=0.3, help='Üretilmiş izde komut oranı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bench', action='store_true', help='Alım hattını aynı süreçte çalıştırıp ölç')
+    parser.add_argument('--app', action='store_true', help='--bench: komutları gerçek uygulamayla sonuçlandır')
+    parser.add_argument('--handler-ms', type=float, default=2.0,
+                        help='--bench (--app olmadan): komut başına yapay işleme süresi')
+    parser.add_argument('--duration', type=float, default=15.0, help='--bench süresi (saniye)')
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--drop-policy', default='drop_oldest', choices=['drop_oldest', 'drop_newest'])
+    parser.add_argument('--json', action='store_true', help='Ölçüm sonucunu JSON olarak yazdır')
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.users, args.command_ratio, args.seed)
+    server = FakeChatServer(trace, args.rate, args.host, args.port)
+
+    if not args.bench:
+        print(f'🎙️ Sahte chat sunucusu ws://{args.host}:{args.port} - {args.rate:g} mesaj/sn')
+        asyncio.run(server.serve())
+        return
+
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(server.serve(ready)), daemon=True).start()
+    ready.wait()
+
+    if args.app:
+        handler = spawn_app_handler()
+        register_chat_users(args.users)
+        from app import kick_api
+    else:
+        handler = lambda command: time.sleep(args.handler_ms / 1000.0)
+        from kick_api import KickAPI
+        kick_api = KickAPI()
+
+    from chat_ingest import ChatIngestPipeline
+
+    pipeline = ChatIngestPipeline(
+        f'ws://{args.host}:{args.port}',
+        parser=kick_api.parse_chat_message,
+        handler=handler,
+        queue_size=args.queue_size,
+        workers=args.workers,
+        drop_policy=args.drop_policy
+    )
+    pipeline.start()
+    time.sleep(args.duration)
+    pipeline.stop()
+
+    metrics = pipeline.get_metrics()
+    commands = metrics['enqueued']
+    report = {
+        'offered_per_s': args.rate,
+        'received': metrics['received'],
+        'commands': commands,
+        'processed': metrics['processed'],
+        'dropped': metrics['dropped'],
+        'drop_rate': round(metrics['dropped'] / commands, 4) if commands else 0.0,
+        'processed_per_s': round(metrics['processed_per_s'], 2),
+        'avg_lag_ms': round(metrics['avg_lag_ms'], 2),
+        'max_lag_ms': round(metrics['max_lag_ms'], 2),
+        'max_queue_depth': metrics['max_queue_depth']
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print('🎙️ Chat alım hattı ölçümü')
+        print('=' * 50)
+        print(f"Gönderim: {report['offered_per_s']:g} mesaj/sn  Alınan: {report['received']}  "
+              f"Komut: {report['commands']}")
+        print(f"İşlenen: {report['processed']} ({report['processed_per_s']}/sn)  "
+              f"Atılan: {report['dropped']} (%{report['drop_rate'] * 100:.2f})")
+        print(f"Gecikme ort: {report['avg_lag_ms']} ms  max: {report['max_lag_ms']} ms  "
+              f"En derin kuyruk: {report['max_queue_depth']}")
+        # Atılan komut yoksa ve kuyruk dolmadıysa hız sürdürülebilir
+        sustainable = report['dropped'] == 0 and report['max_queue_depth'] < args.queue_size
+        print(f"Sürdürülebilir: {'evet' if sustainable else 'hayır'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,161 @@
+import math
 import random
 import logging
-from typing import Dict, Any
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+
+class WinProbabilityTable:
+    """
+    Uniform karışımının kesin hayatta kalma fonksiyonu tablosu
+
+    P(X >= x), bileşen uç noktalarında kırılan parçalı doğrusal bir
+    fonksiyondur. Kırılma noktaları ve her aralığın doğrusu bir kez
+    hesaplanır; sorgu bisect ile O(log n) yapılır. Çarpanlar 2 ondalığa
+    yuvarlandığı için hedef, yuvarlama sınırına (t - 0.005) çevrilir.
+    """
+
+    def __init__(self, components: List[Tuple[float, float, float]], decimals: int = 2):
+        total_weight = sum(weight for weight, _, _ in components)
+        self.components = [(weight / total_weight, low, high) for weight, low, high in components]
+        self.scale = 10 ** decimals
+        self.half_step = 0.5 / self.scale
+
+        self.breakpoints = sorted({point for _, low, high in self.components for point in (low, high)})
+        # Kırılma noktasındaki değer ve (b[j-1], b[j]) aralığının doğrusu
+        self.at_breakpoint = [self._survival(point) for point in self.breakpoints]
+        self.segments = []
+        for left, right in zip(self.breakpoints, self.breakpoints[1:]):
+            mid = (left + right) / 2
+            slope = -sum(
+                weight / (high - low)
+                for weight, low, high in self.components
+                if high > low and low <= left and high >= right
+            )
+            self.segments.append((mid, self._survival(mid), slope))
+
+    def _survival(self, x: float) -> float:
+        """P(X >= x) - doğrudan hesap (tablo kurulumu için)"""
+        total = 0.0
+        for weight, low, high in self.components:
+            if x <= low:
+                total += weight
+            elif x < high:
+                total += weight * (high - x) / (high - low)
+        return total
+
+    def lookup(self, target_multiplier: float) -> float:
+        """Yuvarlanmış çarpanın hedefe ulaşma olasılığı"""
+        # Hedefe eşit veya büyük ilk yuvarlanmış değer ve onun yuvarlama sınırı
+        grid = math.ceil(round(target_multiplier * self.scale, 6)) / self.scale
+        x = grid - self.half_step
+
+        j = bisect_left(self.breakpoints, x)
+        if j < len(self.breakpoints) and self.breakpoints[j] == x:
+            return self.at_breakpoint[j]
+        if j == 0:
+            return 1.0
+        if j == len(self.breakpoints):
+            return 0.0
+        mid, value, slope = self.segments[j - 1]
+        return min(1.0, max(0.0, value + slope * (x - mid)))
+
+
+def mixture_components(win_rate: float, min_multiplier: float,
+                       max_multiplier: float) -> List[Tuple[float, float, float]]:
+    """
+    Çarpan dağılımının bileşenleri
+
+    Ayarlardan uniform karışımı (ağırlık, alt, üst) olarak döndürür; sonuç
+    2 ondalığa yuvarlanır. ``win_rate`` yüksek çarpan dalının olasılığıdır;
+    bu daldaki bantlar [min_multiplier, max_multiplier] aralığına kırpılır
+    (aralık dışına düşen bant o sınırda sabit çarpan olur). Varsayılan
+    ayarlar %65 / 1-5x / 5-20x / 20-50x dağılımını verir.
+    """
+    components = [(1.0 - win_rate, 0.1, 2.0)]  # kayıp dalı - düşük çarpanlar
+
+    bands = (
+        (0.7, min_multiplier, 5.0),   # orta çarpanlar
+        (0.2, 5.0, 20.0),             # yüksek çarpanlar
+        (0.1, 20.0, max_multiplier)   # çok yüksek çarpanlar
+    )
+    for share, low, high in bands:
+        low = min(max(low, min_multiplier), max_multiplier)
+        high = min(max(high, min_multiplier), max_multiplier)
+        components.append((win_rate * share, low, max(low, high)))
+
+    return components
+
+
+class CompiledSampler:
+    """
+    Ayarlardan derlenmiş çarpan örnekleyici
+
+    Karışımın ters CDF'i bir kez tablolanır: tek bir uniform çekim önce
+    kümülatif ağırlıklarda bileşeni seçer, kalan kısım o bileşenin içinde
+    yeniden ölçeklenir. Aynı ayarların kazanma olasılığı tablosu da burada
+    tutulur; ayar değişiminde nesnenin tamamı tek atamayla değiştirilir.
+    Derlendiği ayarlar ``settings``'te durur, böylece bir çekimi yapan
+    örnekleyici ile kaydedilen ayarlar hiç ayrışmaz.
+    """
+
+    def __init__(self, components: List[Tuple[float, float, float]], decimals: int = 2,
+                 settings: Optional[Dict[str, float]] = None):
+        self.settings = dict(settings or {})
+        total_weight = sum(weight for weight, _, _ in components)
+        self.decimals = decimals
+        self.cumulative = []
+        self.starts = []
+        self.weights = []
+        self.lows = []
+        self.spans = []
+
+        running = 0.0
+        for weight, low, high in components:
+            weight /= total_weight
+            self.starts.append(running)
+            running += weight
+            self.cumulative.append(running)
+            self.weights.append(weight)
+            self.lows.append(low)
+            self.spans.append(high - low)
+        self.cumulative[-1] = 1.0
+
+        self.win_table = WinProbabilityTable(components, decimals)
+
+    @classmethod
+    def from_settings(cls, win_rate: float, min_multiplier: float, max_multiplier: float) -> 'CompiledSampler':
+        """Oyun ayarlarından örnekleyici derle"""
+        return cls(mixture_components(win_rate, min_multiplier, max_multiplier), settings={
+            'win_rate': win_rate,
+            'min_multiplier': min_multiplier,
+            'max_multiplier': max_multiplier
+        })
+
+    def sample(self, u: float) -> float:
+        """[0, 1) aralığındaki tek bir uniform değeri çarpana çevir"""
+        i = min(bisect_right(self.cumulative, u), len(self.cumulative) - 1)
+        v = (u - self.starts[i]) / self.weights[i]
+        return round(self.lows[i] + self.spans[i] * v, self.decimals)
+
+    def sample_many(self, u):
+        """``sample``'ın NumPy sürümü: uniform dizisini çarpan dizisine çevir"""
+        import numpy as np
+
+        i = np.minimum(np.searchsorted(self.cumulative, u, side='right'), len(self.cumulative) - 1)
+        v = (u - np.take(self.starts, i)) / np.take(self.weights, i)
+        return np.round(np.take(self.lows, i) + np.take(self.spans, i) * v, self.decimals)
+
+
 class ZeppelinGame:
     """Zeppelin oyun mantığı"""
     
     def __init__(self):
-        self.win_rate = 0.35  # %35 kazanma oranı
-        self.min_multiplier = 1.0
-        self.max_multiplier = 50.0
+        # %35 kazanma oranı, 1-50x
+        self._sampler = CompiledSampler.from_settings(0.35, 1.0, 50.0)
+        self.crash_chain = None  # provably-fair zincir (bağlıysa turlar oradan çekilir)
     
     def play_game(self, username: str, bet_amount: float, target_multiplier: float) -> Dict[str, Any]:
         """
@@ -25,8 +170,9 @@ class ZeppelinGame:
             Oyun sonucu dict'i
         """
         try:
-            # Rastgele bir çarpan üret
-            actual_multiplier = self._generate_multiplier()
+            # Turun çarpanını çek
+            round_info = self.draw_round()
+            actual_multiplier = round_info['crash_point']
             
             # Kazanma durumunu kontrol et
             won = self._check_win(target_multiplier, actual_multiplier)
@@ -36,7 +182,8 @@ class ZeppelinGame:
                 'bet_amount': bet_amount,
                 'target_multiplier': target_multiplier,
                 'actual_multiplier': actual_multiplier,
-                'won': won
+                'won': won,
+                'round_hash': round_info.get('hash')
             }
             
             if won:
@@ -62,29 +209,113 @@ class ZeppelinGame:
                 'error': str(e)
             }
     
+    def draw_round(self) -> Dict[str, Any]:
+        """
+        Bir turun crash noktasını çek
+        
+        Provably-fair zincir bağlıysa sıradaki tur zincirden alınır (``hash``
+        alanıyla birlikte), değilse derlenmiş örnekleyiciden çekilir.
+        """
+        if self.crash_chain is not None:
+            return self.crash_chain.next_round()
+        return {'crash_point': self._generate_multiplier()}
+    
     def _generate_multiplier(self) -> float:
         """
         Rastgele bir çarpan üret
         Dağılım: Düşük çarpanlar daha sık, yüksek çarpanlar daha nadir
+        
+        Ayarlardan derlenmiş örnekleyiciyi kullanır (tek RNG çekimi).
+        """
+        return self._sampler.sample(random.random())
+    
+    # Ayarlar örnekleyiciden okunur; ikisi tek atamayla birlikte değişir
+    @property
+    def win_rate(self) -> float:
+        return self._sampler.settings['win_rate']
+
+    @property
+    def min_multiplier(self) -> float:
+        return self._sampler.settings['min_multiplier']
+
+    @property
+    def max_multiplier(self) -> float:
+        return self._sampler.settings['max_multiplier']
+
+    def _mixture_components(self) -> List[Tuple[float, float, float]]:
+        """Mevcut ayarların karışım bileşenleri (bkz. ``mixture_components``)"""
+        return mixture_components(self.win_rate, self.min_multiplier, self.max_multiplier)
+    
+    def simulate(self, n: int, target_multipliers: Sequence[float] = (2.0,),
+                 chunk_size: int = 1_000_000, seed: Optional[int] = None) -> Dict[str, Any]:
         """
-        # %35 kazanma şansı için özel dağılım
-        rand = random.random()
+        Çarpan dağılımını NumPy ile toplu simüle et (Monte Carlo)
         
-        if rand < 0.65:  # %65 kayıp - düşük çarpanlar
-            # 0.1x ile 2.0x arası
-            multiplier = random.uniform(0.1, 2.0)
-        else:  # %35 kazanma şansı - yüksek çarpanlar
-            # Logaritmik dağılım ile yüksek çarpanlar
-            # Düşük çarpanlar daha sık, yüksek çarpanlar daha nadir
-            base = random.random()
-            if base < 0.7:  # %70 - orta çarpanlar (1-5x)
-                multiplier = random.uniform(1.0, 5.0)
-            elif base < 0.9:  # %20 - yüksek çarpanlar (5-20x)
-                multiplier = random.uniform(5.0, 20.0)
-            else:  # %10 - çok yüksek çarpanlar (20-50x)
-                multiplier = random.uniform(20.0, 50.0)
+        Örnekler canlı oyunla aynı ``CompiledSampler`` tablosundan
+        ``chunk_size``'lık parçalar halinde çekilir ve yalnızca toplamlar
+        tutulur; 10^8 örnekte bile bellek kullanımı sabit kalır.
+        
+        Args:
+            n: Toplam tur sayısı
+            target_multipliers: Değerlendirilecek hedef çarpanlar
+            chunk_size: Parça başına örnek sayısı
+            seed: Tekrarlanabilir sonuç için RNG seed'i
         
-        return round(multiplier, 2)
+        Returns:
+            Çarpan ortalaması/varyansı ve hedef başına isabet oranı,
+            beklenen getiri, house edge ve getiri varyansı
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError('simulate() için numpy gerekli: pip install numpy') from e
+        if n <= 0:
+            raise ValueError(f'Simülasyon tur sayısı pozitif olmalı: {n}')
+        if chunk_size <= 0:
+            raise ValueError(f'Parça boyutu pozitif olmalı: {chunk_size}')
+        
+        rng = np.random.default_rng(seed)
+        # Simülasyon sırasında ayar değişse de tek örnekleyiciyle devam et
+        sampler = self._sampler
+        targets = np.asarray(target_multipliers, dtype=float)
+        
+        hits = np.zeros(len(targets), dtype=np.int64)
+        total = 0.0
+        total_sq = 0.0
+        remaining = n
+        
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            remaining -= size
+            
+            multipliers = sampler.sample_many(rng.random(size))
+            
+            total += float(multipliers.sum())
+            total_sq += float(np.square(multipliers).sum())
+            for i, target in enumerate(targets):
+                hits[i] += np.count_nonzero(multipliers >= target)
+        
+        mean = total / n
+        results = []
+        for target, hit_count in zip(targets.tolist(), hits.tolist()):
+            hit_rate = hit_count / n
+            expected_return = target * hit_rate
+            results.append({
+                'target_multiplier': target,
+                'hit_rate': hit_rate,
+                'expected_return': expected_return,
+                'house_edge': 1.0 - expected_return,
+                # Birim bahis başına net getirinin varyansı
+                'variance': target * target * hit_rate * (1.0 - hit_rate)
+            })
+        
+        return {
+            'samples': n,
+            'mean_multiplier': mean,
+            'multiplier_variance': total_sq / n - mean * mean,
+            'house_edge': sum(r['house_edge'] for r in results) / len(results) if results else 0.0,
+            'targets': results
+        }
     
     def _check_win(self, target_multiplier: float, actual_multiplier: float) -> bool:
         """
@@ -95,25 +326,24 @@ class ZeppelinGame:
     
     def get_win_probability(self, target_multiplier: float) -> float:
         """
-        Belirli bir çarpan için kazanma olasılığını hesapla (yaklaşık)
+        Belirli bir çarpan için kesin kazanma olasılığı
+        
+        Mevcut ayarların dağılımından önceden hesaplanmış tablodan okunur.
         """
-        # Basit yaklaşım - gerçek dağılım daha karmaşık
-        if target_multiplier <= 1.0:
-            return 1.0
-        elif target_multiplier <= 2.0:
-            return 0.35
-        elif target_multiplier <= 5.0:
-            return 0.25
-        elif target_multiplier <= 10.0:
-            return 0.15
-        elif target_multiplier <= 20.0:
-            return 0.07
-        else:
-            return 0.035
+        return self._sampler.win_table.lookup(target_multiplier)
+    
+    def get_win_probabilities(self, target_multipliers: Sequence[float]) -> List[float]:
+        """Birden çok hedef çarpan için kazanma olasılıkları"""
+        table = self._sampler.win_table
+        return [table.lookup(target) for target in target_multipliers]
     
     def update_settings(self, win_rate: float, min_multiplier: float, max_multiplier: float):
-        """Oyun ayarlarını güncelle"""
-        self.win_rate = win_rate
-        self.min_multiplier = min_multiplier
-        self.max_multiplier = max_multiplier
+        """
+        Oyun ayarlarını güncelle
+        
+        Yeni örnekleyici bahis yolunu kilitlemeden önce derlenir, sonra tek
+        atamayla değiştirilir; ayarlar örnekleyicinin içinde olduğundan
+        eşzamanlı çekimler ya eski ya yeni ayarları tutarlı olarak görür.
+        """
+        self._sampler = CompiledSampler.from_settings(win_rate, min_multiplier, max_multiplier)
         logger.info(f'Oyun ayarları güncellendi - Win Rate: {win_rate:.2%}, Min: {min_multiplier}x, Max: {max_multiplier}x')
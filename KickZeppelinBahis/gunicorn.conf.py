@@ -0,0 +1,31 @@
+"""
+Zeppelin Betting Game - Gunicorn yapılandırması
+
+Çok worker'lı çalıştırma:
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0 \
+    SHARED_STATE_URL=redis://localhost:6379/1 \
+    gunicorn -c gunicorn.conf.py main:app
+
+Gunicorn worker'lar arasında yapışkan oturum (sticky session) sağlamaz;
+bu yüzden istemciler yalnızca WebSocket transport'u ile bağlanır ve her
+bağlantı baştan sona tek bir worker'da kalır. Worker'lar arası yayınlar
+mesaj kuyruğundan, tur durumu ve ayarlar paylaşılan store'dan geçer.
+"""
+
+import os
+import multiprocessing
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+worker_class = 'eventlet'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', '1000'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Mesaj kuyruğu ve paylaşılan store olmadan worker'lar birbirinin yayınlarını
+# ve turlarını göremez; bu durumda tek worker ile çalış
+if workers > 1 and not (os.environ.get('SOCKETIO_MESSAGE_QUEUE') and os.environ.get('SHARED_STATE_URL')):
+    print('⚠️ SOCKETIO_MESSAGE_QUEUE ve SHARED_STATE_URL ayarlanmadı - tek worker ile başlatılıyor')
+    workers = 1
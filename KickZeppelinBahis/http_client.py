@@ -0,0 +1,285 @@
+import time
+import random
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Devre açıkken istek hiç gönderilmeden reddedildi"""
+
+
+class LatencyBudgetExceeded(requests.exceptions.Timeout):
+    """İsteğin toplam süre bütçesi tükendi"""
+
+
+class CircuitBreaker:
+    """
+    Ardışık hatalara göre açılan devre kesici
+
+    ``failure_threshold`` ardışık hatadan sonra devre açılır ve istekler
+    ``reset_timeout`` saniye boyunca hemen reddedilir. Süre dolunca tek bir
+    deneme isteğine izin verilir (yarı açık); başarılıysa devre kapanır.
+    ``allow`` ``HALF_OPEN`` döndürdüyse istek sonucu ne olursa olsun
+    (beklenmeyen hata veya iptal dahil) ``end_trial`` çağrılmalıdır.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        İstek gönderilebilir mi
+
+        Returns:
+            False (devre açık) veya izin türü: ``CLOSED`` ya da deneme
+            isteği için ``HALF_OPEN``
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return self.CLOSED
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Yarı açık: aynı anda yalnızca bir deneme isteği
+            if self._trial_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+            return self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def end_trial(self):
+        """
+        Sonucu kaydedilmemiş deneme isteğini bırak
+
+        ``record_success``/``record_failure`` çağrıldıysa etkisi yoktur;
+        aksi halde (beklenmeyen hata, iptal) bir sonraki ``allow`` yeni bir
+        deneme isteğine izin verir.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f'Kick API devresi açıldı ({self._failures} ardışık hata)')
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Süre bütçeli, tam jitter'lı üstel yeniden deneme kuralı
+
+    ``PooledHTTPClient`` ve ``async_kick_api.AsyncKickAPI`` aynı kuralı
+    kullanır: 429 ve 5xx yanıtları ile bağlantı hataları/zaman aşımları
+    yeniden denenir, bekleme bütçeyi aşacaksa denemeler kesilir.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.2, backoff_max: float = 2.0):
+        """
+        Args:
+            max_retries: İlk denemeden sonraki en fazla yeniden deneme
+            backoff_base: Üstel beklemenin taban süresi
+            backoff_max: Tek beklemenin üst sınırı
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def retryable(self, status: int) -> bool:
+        """Bu durum kodu yeniden denenmeli mi"""
+        return status in self.RETRY_STATUSES
+
+    def backoff(self, attempt: int) -> float:
+        """Tam jitter'lı üstel bekleme"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def next_delay(self, attempt: int, now: float, deadline: float) -> Optional[float]:
+        """
+        ``attempt`` numaralı denemeden sonraki bekleme
+
+        Returns:
+            Bekleme süresi; deneme hakkı bittiyse veya bekleme bütçeyi
+            aşacaksa None
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt)
+        if now + delay >= deadline:
+            return None
+        return delay
+
+
+class PooledHTTPClient:
+    """
+    Keep-alive bağlantı havuzlu HTTP istemcisi
+
+    Tüm istekler tek bir ``requests.Session`` üzerinden gider, böylece TCP ve
+    TLS kurulumu her çağrıda tekrarlanmaz. Her isteğin toplam süre bütçesi
+    vardır; bağlantı hataları, zaman aşımları, 429 ve 5xx yanıtları bütçe
+    içinde jitter'lı üstel beklemeyle yeniden denenir. Ardışık hatalarda
+    devre kesici açılır ve yavaş bir uç nokta worker thread'lerini bağlamaz.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = 10,
+                 budget: float = 5.0, connect_timeout: float = 2.0, read_timeout: float = 3.0,
+                 max_retries: int = 3, backoff_base: float = 0.2, backoff_max: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None, retry: Optional[RetryPolicy] = None):
+        """
+        Args:
+            headers: Her isteğe eklenen başlıklar
+            pool_size: Host başına açık tutulan bağlantı sayısı
+            budget: Yeniden denemeler dahil bir isteğin toplam süre bütçesi (sn)
+            connect_timeout: Deneme başına bağlantı zaman aşımı
+            read_timeout: Deneme başına okuma zaman aşımı
+            max_retries: İlk denemeden sonraki en fazla yeniden deneme
+            backoff_base: Üstel beklemenin taban süresi
+            backoff_max: Tek beklemenin üst sınırı
+            breaker: Devre kesici (varsayılan: 5 hata / 30 sn)
+            retry: Yeniden deneme kuralı (verilirse ``max_retries`` ve
+                ``backoff_*`` yok sayılır)
+        """
+        self.budget = budget
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry = retry or RetryPolicy(max_retries, backoff_base, backoff_max)
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'failures': 0,
+            'short_circuited': 0,
+            'budget_exceeded': 0
+        }
+
+    def _count(self, key: str):
+        with self._metrics_lock:
+            self.metrics[key] += 1
+
+    def request(self, method: str, url: str, budget: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Bütçe, yeniden deneme ve devre kesici ile istek gönder
+
+        Raises:
+            CircuitOpenError: Devre açık
+            LatencyBudgetExceeded: Yanıt alınamadan bütçe tükendi
+            requests.exceptions.RequestException: Yeniden denemeler tükendi
+        """
+        self._count('requests')
+        permit = self.breaker.allow()
+        if not permit:
+            self._count('short_circuited')
+            raise CircuitOpenError(f'Kick API devresi açık: {url}')
+        try:
+            return self._send(method, url, budget, **kwargs)
+        finally:
+            if permit == CircuitBreaker.HALF_OPEN:
+                self.breaker.end_trial()
+
+    def _send(self, method: str, url: str, budget: Optional[float], **kwargs) -> requests.Response:
+        """Yeniden denemeli gönderim (``request`` devre kesici iznini aldıktan sonra)"""
+        deadline = time.monotonic() + (budget if budget is not None else self.budget)
+        last_error = None
+        response = None
+
+        for attempt in range(self.retry.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            self._count('attempts')
+            if attempt:
+                self._count('retries')
+            try:
+                response = self.session.request(
+                    method, url,
+                    timeout=(min(self.connect_timeout, remaining), min(self.read_timeout, remaining)),
+                    **kwargs
+                )
+                if not self.retry.retryable(response.status_code):
+                    self.breaker.record_success()
+                    return response
+                last_error = None
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+                response = None
+
+            delay = self.retry.next_delay(attempt, time.monotonic(), deadline)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        self.breaker.record_failure()
+        self._count('failures')
+        if response is not None:
+            # Yeniden denenebilir durum kodu; son yanıtı çağırana bırak
+            return response
+        if last_error is not None and time.monotonic() < deadline:
+            raise last_error
+        self._count('budget_exceeded')
+        raise LatencyBudgetExceeded(f'Kick API isteği {self.budget:.1f} sn bütçeyi aştı: {url}') from last_error
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def connections_opened(self) -> int:
+        """Havuzun şimdiye kadar açtığı bağlantı sayısı (yeniden kullanımı doğrulamak için)"""
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """İstemci ve devre kesici metrikleri"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        metrics['connections_opened'] = self.connections_opened()
+        metrics['circuit'] = self.breaker.state
+        return metrics
+
+    def close(self):
+        self.session.close()
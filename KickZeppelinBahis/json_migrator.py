@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - Akışlı JSON → Veritabanı Migrasyonu
+``kullanicilar.json`` dosyasını belleğe almadan kullanıcı kullanıcı okur,
+mevcut kullanıcı adlarını parça parça sorgular ve parçaları
+``ON CONFLICT DO NOTHING`` ile toplu ekler. Her parçadan sonra checkpoint
+yazılır; yarıda kalan migrasyon kaldığı yerden devam eder.
+
+Örnek:
+    python json_migrator.py kullanicilar.json --chunk-size 5000
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, Any, Iterator, Iterable, Tuple, Optional, Callable
+
+from sqlalchemy import insert, select
+
+from models import db, User
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_object(fp, read_size: int = 65536) -> Iterator[Tuple[str, Any]]:
+    """
+    Üst düzey JSON nesnesini (anahtar, değer) çiftleri olarak akışla oku
+
+    Bellekte yalnızca okunmamış tampon ve o anki değer tutulur; dosya
+    boyutundan bağımsızdır.
+    """
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = fp.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    def expect(chars: str) -> str:
+        nonlocal position
+        skip_whitespace()
+        if position >= len(buffer) or buffer[position] not in chars:
+            found = buffer[position] if position < len(buffer) else 'EOF'
+            raise ValueError(f'JSON ayrıştırma hatası: {chars!r} bekleniyordu, {found!r} bulundu')
+        position += 1
+        return buffer[position - 1]
+
+    def decode():
+        nonlocal position
+        skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+                # Sayı tamponun sonunda bitiyorsa devamı gelebilir
+                if end < len(buffer) or eof:
+                    position = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            if not fill():
+                value, end = _decoder.raw_decode(buffer, position)
+                position = end
+                return value
+
+    expect('{')
+    skip_whitespace()
+    if position < len(buffer) and buffer[position] == '}':
+        return
+    while True:
+        key = decode()
+        expect(':')
+        yield key, decode()
+        if expect(',}') == '}':
+            return
+
+
+def _parse_datetime(value: Optional[str], default: datetime) -> datetime:
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return default
+
+
+def user_row(username: str, user_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """JSON kullanıcı kaydını users tablosu satırına çevir"""
+    return {
+        'username': username,
+        'balance': float(user_data.get('balance', 0)),
+        'total_bets': float(user_data.get('total_bets', 0)),
+        'total_winnings': float(user_data.get('total_winnings', 0)),
+        'games_played': int(user_data.get('games_played', 0)),
+        'registration_date': _parse_datetime(user_data.get('registration_date'), now),
+        'last_activity': _parse_datetime(user_data.get('last_activity'), now),
+        'subscriber_count_at_registration': int(user_data.get('subscriber_count_at_registration', 0))
+    }
+
+
+class UserMigrator:
+    """
+    Kullanıcıları parça parça toplu aktaran migrator
+
+    Her parça için mevcut kullanıcı adları tek ``IN`` sorgusuyla çekilir,
+    kalanlar tek bir ``INSERT ... ON CONFLICT DO NOTHING`` ile eklenir ve
+    parça commit edilir. Eşzamanlı kayıtlarla yarışta çakışan satırlar
+    sessizce atlanır.
+    """
+
+    def __init__(self, chunk_size: int = 1000, checkpoint_path: Optional[str] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        """
+        Args:
+            chunk_size: Parça başına kullanıcı
+            checkpoint_path: Checkpoint dosyası (None ise devam desteği yok)
+            progress: Her parçadan sonra ilerleme dict'i ile çağrılır
+        """
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+
+    def _insert_statement(self):
+        """Lehçeye göre çakışmada hiçbir şey yapmayan INSERT"""
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return insert(User)
+        return dialect_insert(User).on_conflict_do_nothing(index_elements=['username'])
+
+    def _read_checkpoint(self, source: str) -> Dict[str, Any]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('source') != source:
+            logger.warning('Checkpoint başka bir kaynağa ait, baştan başlanıyor')
+            return {}
+        return checkpoint
+
+    def _write_checkpoint(self, state: Dict[str, Any]):
+        if not self.checkpoint_path:
+            return
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def migrate(self, users: Iterable[Tuple[str, Any]], source: str = '') -> Dict[str, Any]:
+        """
+        (kullanıcı adı, veri) çiftlerini aktar
+
+        Args:
+            users: Kullanıcı çiftleri (``_metadata`` ve geçersiz kayıtlar atlanır)
+            source: Checkpoint'in ait olduğu kaynak (dosya yolu)
+
+        Returns:
+            Sayaçlar, süre ve satır/sn
+        """
+        checkpoint = self._read_checkpoint(source)
+        resume_from = checkpoint.get('entries_done', 0)
+        state = {
+            'source': source,
+            'entries_done': resume_from,
+            'inserted': checkpoint.get('inserted', 0),
+            'existing': checkpoint.get('existing', 0),
+            'invalid': checkpoint.get('invalid', 0)
+        }
+        if resume_from:
+            logger.info(f'Migrasyon checkpoint\'ten devam ediyor: {resume_from} kayıt atlanacak')
+
+        statement = self._insert_statement()
+        started = time.perf_counter()
+        processed = 0
+        entries = 0
+        chunk: Dict[str, Dict[str, Any]] = {}
+        now = datetime.utcnow()
+
+        def flush_chunk():
+            nonlocal processed
+            names = list(chunk)
+            existing = set(db.session.execute(
+                select(User.username).where(User.username.in_(names))
+            ).scalars())
+            rows = [row for name, row in chunk.items() if name not in existing]
+            inserted = 0
+            if rows:
+                # Core yürütme: ORM toplu yolu rowcount döndürmez
+                result = db.session.connection().execute(statement, rows)
+                inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+            db.session.commit()
+
+            processed += len(chunk)
+            state['entries_done'] = entries
+            state['inserted'] += inserted
+            state['existing'] += len(chunk) - inserted
+            self._write_checkpoint(state)
+            chunk.clear()
+
+            if self.progress:
+                elapsed = time.perf_counter() - started
+                self.progress(dict(state, elapsed_s=elapsed,
+                                   rows_per_s=processed / elapsed if elapsed else 0.0))
+
+        try:
+            for username, user_data in users:
+                entries += 1
+                if entries <= resume_from:
+                    continue
+                if username == '_metadata':
+                    continue
+                if not isinstance(user_data, dict) or not isinstance(username, str) or not username.strip():
+                    state['invalid'] += 1
+                    continue
+                try:
+                    chunk[username.lower().strip()] = user_row(username.lower().strip(), user_data, now)
+                except (TypeError, ValueError):
+                    state['invalid'] += 1
+                    continue
+                if len(chunk) >= self.chunk_size:
+                    flush_chunk()
+            if chunk:
+                flush_chunk()
+            state['entries_done'] = entries
+        except Exception:
+            db.session.rollback()
+            raise
+
+        elapsed = time.perf_counter() - started
+        # Tamamlanan migrasyonun checkpoint'i silinir; tekrar çalıştırma güvenlidir
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        return dict(state, elapsed_s=round(elapsed, 3),
+                    rows_per_s=round(processed / elapsed, 2) if elapsed else 0.0)
+
+    def migrate_file(self, path: str, read_size: int = 65536) -> Dict[str, Any]:
+        """JSON dosyasını akışla oku ve aktar"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.migrate(iter_json_object(f, read_size), source=os.path.abspath(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='kullanicilar.json → veritabanı akışlı migrasyon')
+    parser.add_argument('path', nargs='?', default='kullanicilar.json')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Parça başına kullanıcı')
+    parser.add_argument('--checkpoint', help='Checkpoint dosyası (varsayılan: <path>.migrate.ckpt)')
+    parser.add_argument('--restart', action='store_true', help='Checkpoint\'i yok say, baştan başla')
+    args = parser.parse_args()
+
+    from app import app, db_manager, startup
+
+    startup.wait()
+    checkpoint = args.checkpoint or f'{args.path}.migrate.ckpt'
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    def report(progress):
+        print(f"  {progress['entries_done']} kayıt  +{progress['inserted']} eklendi  "
+              f"{progress['existing']} mevcut  {progress['rows_per_s']:.0f} satır/sn", flush=True)
+
+    with app.app_context():
+        result = db_manager.migrate_from_json_file(args.path, chunk_size=args.chunk_size,
+                                                   checkpoint_path=checkpoint, progress=report)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
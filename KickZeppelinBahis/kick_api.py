@@ -2,11 +2,40 @@ import os
 import logging
 import requests
 import json
+import threading
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from http_client import PooledHTTPClient, CircuitBreaker
+from channel_cache import ChannelInfoCache
+
 logger = logging.getLogger(__name__)
 
+KICK_AUTH_URL = 'https://kick.com/api/v1/authentication/login'
+
+def mock_channel_info(channel_id: str) -> Dict[str, Any]:
+    """Mock modda dönen kanal bilgisi"""
+    return {
+        'channel_id': channel_id,
+        'name': 'Test Kanalı',
+        'subscriber_count': 150,  # Test için 100+ abone
+        'is_live': True,
+        'viewer_count': 45,
+        'last_updated': datetime.now().isoformat()
+    }
+
+def channel_info_from_payload(data: Dict[str, Any], channel_id: str) -> Dict[str, Any]:
+    """Kick /channels yanıtını uygulamanın kanal bilgisi biçimine çevir"""
+    return {
+        'channel_id': data.get('id', channel_id),
+        'name': data.get('user', {}).get('username', 'Bilinmeyen'),
+        'subscriber_count': data.get('followers_count', 0),
+        'is_live': data.get('livestream') is not None,
+        'viewer_count': data.get('livestream', {}).get('viewer_count', 0) if data.get('livestream') else 0,
+        'chatroom_id': (data.get('chatroom') or {}).get('id'),
+        'last_updated': datetime.now().isoformat()
+    }
+
 class KickAPI:
     """Kick API entegrasyonu (MVP için mock implementasyon)"""
     
@@ -18,25 +47,64 @@ class KickAPI:
         self.access_token = None
         self.api_base_url = 'https://kick.com/api/v1'
         
+        # Tüm Kick çağrıları tek keep-alive havuzundan, süre bütçesi ve devre kesiciyle
+        self.http = PooledHTTPClient(
+            headers={'Accept': 'application/json', 'User-Agent': 'ZeppelinBot/1.0'},
+            pool_size=int(os.environ.get('KICK_HTTP_POOL_SIZE', '10')),
+            budget=float(os.environ.get('KICK_HTTP_BUDGET_SECONDS', '5')),
+            max_retries=int(os.environ.get('KICK_HTTP_MAX_RETRIES', '3')),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.environ.get('KICK_HTTP_BREAKER_FAILURES', '5')),
+                reset_timeout=float(os.environ.get('KICK_HTTP_BREAKER_RESET_SECONDS', '30'))
+            )
+        )
+        
+        # Kanal bilgisi ve takipçi sayısı önbelleği (admin sayfası, takip olayları)
+        self.channel_cache = ChannelInfoCache(
+            self._fetch_channel_info,
+            ttl=float(os.environ.get('KICK_CHANNEL_CACHE_TTL', '30')),
+            stale_ttl=float(os.environ.get('KICK_CHANNEL_CACHE_STALE_SECONDS', '600'))
+        )
+        
         # Gerçek Kick API kullanımı için
         self.mock_mode = False
         
-        logger.info('Kick API entegrasyonu başlatıldı - Gerçek API kullanılacak')
+        # Access token import sırasında değil açılış görevinde (``warm_up``) veya
+        # arka planda alınır; istek yolu token'ı hiç beklemez
+        self._auth_lock = threading.Lock()
+        self._authenticated = False
+        self._auth_thread = None
+        self._auth_thread_lock = threading.Lock()
         
-        # Access token al
-        self._get_access_token()
+        logger.info('Kick API entegrasyonu başlatıldı - kimlik doğrulama arka planda yapılacak')
+    
+    def ensure_authenticated(self):
+        """Access token'ı bir kez al; eşzamanlı çağıranlar ilk denemeyi bekler"""
+        if self._authenticated:
+            return
+        with self._auth_lock:
+            if not self._authenticated:
+                self._get_access_token()
+                self._authenticated = True
+    
+    def authenticate_in_background(self):
+        """Token henüz alınmadıysa arka plan thread'inde al (beklemeden döner)"""
+        if self._authenticated:
+            return
+        with self._auth_thread_lock:
+            if self._auth_thread is None or not self._auth_thread.is_alive():
+                self._auth_thread = threading.Thread(target=self.warm_up, name='kick-auth', daemon=True)
+                self._auth_thread.start()
+    
+    def warm_up(self):
+        """Açılış görevi: token'ı al ve güncel kanalın bilgisini önbelleğe yükle"""
+        self.ensure_authenticated()
+        if not self.mock_mode:
+            self.channel_cache.warm(self.current_channel or self.channel_id)
     
     def _get_access_token(self):
         """Kick API access token al"""
         try:
-            auth_url = 'https://kick.com/api/v1/authentication/login'
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json',
-                'User-Agent': 'ZeppelinBot/1.0'
-            }
-            
             # OAuth2 Client Credentials flow
             data = {
                 'client_id': self.client_id,
@@ -44,7 +112,7 @@ class KickAPI:
                 'grant_type': 'client_credentials'
             }
             
-            response = requests.post(auth_url, json=data, headers=headers, timeout=10)
+            response = self.http.post(KICK_AUTH_URL, json=data)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -67,51 +135,45 @@ class KickAPI:
             logger.error(f'Kick API authentication hatası: {e}')
             self.mock_mode = True
     
-    def get_channel_info(self, channel_slug: str = None) -> Dict[str, Any]:
-        """Kanal bilgilerini getir"""
+    def get_channel_info(self, channel_slug: str = None, fresh: bool = False) -> Dict[str, Any]:
+        """
+        Kanal bilgilerini getir
+        
+        Sonuçlar ``channel_cache`` üzerinden sunulur (TTL + stale-while-revalidate);
+        ``fresh`` önbelleği atlayıp Kick'e gider (admin bağlantı testi, token
+        yoksa alınmasını bekler). Token henüz alınmadıysa istek beklemez:
+        alma işi arka planda başlatılır ve önbellekteki kayıt ya da mock
+        bilgi döner.
+        """
+        channel = channel_slug or self.channel_id
+        if fresh:
+            self.ensure_authenticated()
+        elif not self._authenticated:
+            self.authenticate_in_background()
+            return self.channel_cache.peek(channel) or mock_channel_info(self.channel_id)
         if self.mock_mode:
-            return {
-                'channel_id': self.channel_id,
-                'name': 'Test Kanalı',
-                'subscriber_count': 150,  # Test için 100+ abone
-                'is_live': True,
-                'viewer_count': 45,
-                'last_updated': datetime.now().isoformat()
-            }
+            return mock_channel_info(self.channel_id)
         
-        # Gerçek API implementasyonu
         try:
-            channel = channel_slug or self.channel_id
-            url = f'{self.api_base_url}/channels/{channel}'
-            
-            headers = {
-                'Accept': 'application/json',
-                'User-Agent': 'ZeppelinBot/1.0'
-            }
-            
-            if self.access_token:
-                headers['Authorization'] = f'Bearer {self.access_token}'
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'channel_id': data.get('id', self.channel_id),
-                    'name': data.get('user', {}).get('username', 'Bilinmeyen'),
-                    'subscriber_count': data.get('followers_count', 0),
-                    'is_live': data.get('livestream') is not None,
-                    'viewer_count': data.get('livestream', {}).get('viewer_count', 0) if data.get('livestream') else 0,
-                    'last_updated': datetime.now().isoformat()
-                }
-            else:
-                logger.warning(f'Kanal bilgisi alınamadı: {response.status_code}')
-                return self._fallback_channel_info()
-                
+            return self.channel_cache.get(channel, fresh=fresh)
         except Exception as e:
             logger.error(f'Kick API hatası: {e}')
             return self._fallback_channel_info()
     
+    def _fetch_channel_info(self, channel: str) -> Dict[str, Any]:
+        """Kanal bilgisini Kick'ten getir (önbellek dolumu; hata durumunda fırlatır)"""
+        url = f'{self.api_base_url}/channels/{channel}'
+        
+        headers = {}
+        if self.access_token:
+            headers['Authorization'] = f'Bearer {self.access_token}'
+        
+        response = self.http.get(url, headers=headers)
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f'Kanal bilgisi alınamadı: {response.status_code}')
+        
+        return channel_info_from_payload(response.json(), self.channel_id)
+    
     def _fallback_channel_info(self) -> Dict[str, Any]:
         """Hata durumunda fallback bilgiler"""
         return {
@@ -124,28 +186,55 @@ class KickAPI:
         }
     
     def get_follower_count(self) -> int:
-        """Takipçi sayısını getir"""
+        """Takipçi sayısını getir (önbellekten; raid sırasında tek upstream isteği)"""
         channel_info = self.get_channel_info()
         return channel_info.get('subscriber_count', 0) if channel_info else 0
     
-    def listen_to_chat(self, callback_function):
+    def listen_to_chat(self, callback_function, queue_size: int = 1000, workers: int = 4,
+                       drop_policy: str = 'drop_oldest', autostart: bool = True):
         """
         Chat mesajlarını dinle
-        Gerçek implementasyonda WebSocket bağlantısı kurulacak
+        
+        Kanalın Pusher chat odasına bağlanan alım hattını başlatır; her komut
+        ``parse_chat_message`` ile çözülüp ``callback_function``'a verilir.
+        ``KICK_CHAT_WS_URL`` ile başka bir sunucu (ör. fake_chat_server.py)
+        kullanılabilir; mock modda yalnızca bu durumda dinlenir.
+        
+        Returns:
+            ChatIngestPipeline (``autostart`` ise çalışır durumda) veya None
         """
-        if self.mock_mode:
-            logger.info('Mock modda chat dinlenmesi simüle ediliyor')
-            # Test için örnek mesajlar gönderilebilir
-            return
+        from chat_ingest import ChatIngestPipeline, KICK_PUSHER_URL
+        
+        self.ensure_authenticated()
+        url = os.environ.get('KICK_CHAT_WS_URL')
+        if self.mock_mode and not url:
+            logger.info('Mock modda chat dinlenmiyor (KICK_CHAT_WS_URL ayarlanmadı)')
+            return None
         
         try:
-            # TODO: Gerçek Kick chat WebSocket bağlantısı
-            pass
+            chatroom_id = os.environ.get('KICK_CHATROOM_ID')
+            if not chatroom_id and not self.mock_mode:
+                chatroom_id = self.get_channel_info(self.current_channel).get('chatroom_id')
+            
+            pipeline = ChatIngestPipeline(
+                url or KICK_PUSHER_URL,
+                parser=self.parse_chat_message,
+                handler=callback_function,
+                chatroom_id=chatroom_id,
+                queue_size=queue_size,
+                workers=workers,
+                drop_policy=drop_policy
+            )
+            if autostart:
+                pipeline.start()
+            return pipeline
         except Exception as e:
             logger.error(f'Chat dinleme hatası: {e}')
+            return None
     
     def send_message(self, message: str) -> bool:
         """Chat'e mesaj gönder"""
+        self.ensure_authenticated()
         if self.mock_mode:
             logger.info(f'Mock mesaj gönderildi: {message}')
             return True
@@ -243,6 +332,12 @@ class KickAPI:
                     'username': username
                 }
             
+            elif command in ['!rank', '!sira']:
+                return {
+                    'type': 'rank',
+                    'username': username
+                }
+            
             elif command in ['!help', '!yardim']:
                 return {
                     'type': 'help',
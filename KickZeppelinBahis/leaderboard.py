@@ -0,0 +1,336 @@
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next: List[Optional['_Node']] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """
+    Sıralı anahtarlar için indekslenebilir skiplist
+
+    Her bağlantı atladığı eleman sayısını (genişlik) tutar; ekleme, silme,
+    sıra bulma ve indeksle erişim beklenen O(log n) sürer.
+    """
+
+    MAX_LEVEL = 32
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < IndexableSkipList.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        """Anahtarı ekle (anahtarlar benzersiz olmalı)"""
+        update = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        position = 0
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            steps[i] = position
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                update[i] = self._head
+                steps[i] = 0
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            prev = update[i]
+            new.next[i] = prev.next[i]
+            prev.next[i] = new
+            # prev → new arası ve new → eski komşu arası genişlikler
+            new.width[i] = prev.width[i] - (position - steps[i])
+            prev.width[i] = position - steps[i] + 1
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        """Anahtarı sil; yoksa False"""
+        update = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+
+        target = node.next[0]
+        if target is None or target.key != key:
+            return False
+
+        for i in range(self._level):
+            if update[i].next[i] is target:
+                update[i].width[i] += target.width[i] - 1
+                update[i].next[i] = target.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def index(self, key) -> int:
+        """Anahtarın 0 tabanlı sırası; yoksa -1"""
+        node = self._head
+        position = 0
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key <= key:
+                position += node.width[i]
+                node = node.next[i]
+            if node.key == key:
+                return position - 1
+        return -1
+
+    def slice(self, start: int, stop: int) -> List[Any]:
+        """``start``..``stop`` (hariç) aralığındaki anahtarlar"""
+        start = max(start, 0)
+        stop = min(stop, self._size)
+        if start >= stop:
+            return []
+
+        node = self._head
+        position = -1
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and position + node.width[i] <= start:
+                position += node.width[i]
+                node = node.next[i]
+
+        keys = []
+        while node is not None and len(keys) < stop - start:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """
+    Bakiyeye göre canlı sıralama
+
+    Kullanıcılar ``(-bakiye, kullanıcı adı)`` anahtarıyla bir skiplist'te
+    tutulur; her bakiye değişikliği O(log n) günceller. İlk N, bir
+    kullanıcının sırası ve çevresindeki pencere veritabanına gitmeden
+    okunur.
+
+    ``seed`` tabloyu veritabanından parça parça yeniden kurar; parçalar
+    arasında ``sleep(0)`` ile event loop'a yol verir ve kurulum sürerken
+    gelen ``update``/``remove`` çağrılarını kaydedip yeni tabloya uygular.
+    Çok worker'lı çalışmada ``start_resync`` diğer worker'ların
+    değişikliklerini ``changes`` ile artımlı olarak alır.
+    """
+
+    def __init__(self, loader: Optional[Callable[[Optional[str], int], Iterable[Tuple[str, float]]]] = None,
+                 changes: Optional[Callable[[datetime], Iterable[Tuple[str, float]]]] = None,
+                 chunk_size: int = 5000):
+        """
+        Args:
+            loader: ``loader(after, limit)`` - kullanıcı adına göre sıralı,
+                ``after``'dan sonraki en fazla ``limit`` (kullanıcı adı, bakiye) çifti
+            changes: ``changes(since)`` - ``since``'ten sonra bakiyesi değişen çiftler
+            chunk_size: Yeniden kurulumda parça başına kullanıcı
+        """
+        self.loader = loader
+        self.changes = changes
+        self.chunk_size = chunk_size
+        self.seeded = False
+        self._lock = threading.Lock()
+        self._seed_lock = threading.Lock()
+        self._index = IndexableSkipList()
+        self._balances: Dict[str, float] = {}
+        # Yeniden kurulum sırasındaki değişiklikler (kullanıcı adı -> bakiye, silme için None)
+        self._building: Optional[Dict[str, Optional[float]]] = None
+        self._synced_at: Optional[datetime] = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _chunks(self) -> Iterable[List[Tuple[str, float]]]:
+        after = None
+        while True:
+            rows = list(self.loader(after, self.chunk_size))
+            if rows:
+                yield rows
+            if len(rows) < self.chunk_size:
+                return
+            after = rows[-1][0]
+
+    def seed(self, entries: Optional[Iterable[Tuple[str, float]]] = None,
+             sleep: Optional[Callable[[float], Any]] = None):
+        """
+        Sıralamayı verilen çiftlerden veya ``loader``'dan yeniden kur
+
+        Args:
+            entries: (kullanıcı adı, bakiye) çiftleri (verilmezse ``loader``)
+            sleep: Parçalar arasında çağrılır (ör. ``socketio.sleep``)
+        """
+        with self._seed_lock:
+            started = datetime.utcnow()
+            with self._lock:
+                self._building = {}
+            try:
+                index = IndexableSkipList()
+                balances = {}
+                for chunk in (self._chunks() if entries is None else [entries]):
+                    for username, balance in chunk:
+                        balance = float(balance)
+                        balances[username] = balance
+                        index.insert((-balance, username))
+                    if sleep:
+                        sleep(0)
+
+                with self._lock:
+                    for username, balance in self._building.items():
+                        old = balances.pop(username, None)
+                        if old is not None:
+                            index.remove((-old, username))
+                        if balance is not None:
+                            balances[username] = balance
+                            index.insert((-balance, username))
+                    self._index = index
+                    self._balances = balances
+                    self._synced_at = started
+                    self.seeded = True
+            finally:
+                with self._lock:
+                    self._building = None
+        logger.info(f'Sıralama tablosu yüklendi: {len(balances)} kullanıcı')
+
+    def sync_changes(self, slack: float = 5.0) -> int:
+        """
+        Son eşitlemeden beri veritabanında değişen bakiyeleri uygula
+
+        Args:
+            slack: Worker saatleri arasındaki fark için geriye pay (saniye)
+
+        Returns:
+            Uygulanan değişiklik sayısı
+        """
+        if not self.changes or self._synced_at is None:
+            return 0
+        started = datetime.utcnow()
+        rows = list(self.changes(self._synced_at - timedelta(seconds=slack)))
+        for username, balance in rows:
+            self.update(username, balance)
+        self._synced_at = started
+        return len(rows)
+
+    def update(self, username: str, balance: float):
+        """Kullanıcının bakiyesini güncelle (yoksa ekle)"""
+        balance = float(balance)
+        with self._lock:
+            if self._building is not None:
+                self._building[username] = balance
+            old = self._balances.get(username)
+            if old == balance:
+                return
+            if old is not None:
+                self._index.remove((-old, username))
+            self._balances[username] = balance
+            self._index.insert((-balance, username))
+
+    def remove(self, username: str):
+        """Kullanıcıyı sıralamadan çıkar"""
+        with self._lock:
+            if self._building is not None:
+                self._building[username] = None
+            old = self._balances.pop(username, None)
+            if old is not None:
+                self._index.remove((-old, username))
+    def _entries(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        return [
+            {'rank': start + offset + 1, 'username': username, 'balance': -negative}
+            for offset, (negative, username) in enumerate(self._index.slice(start, stop))
+        ]
+
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """İlk ``limit`` kullanıcı (sıra, kullanıcı adı, bakiye)"""
+        with self._lock:
+            return self._entries(0, limit)
+
+    def rank(self, username: str) -> Optional[Dict[str, Any]]:
+        """Kullanıcının 1 tabanlı sırası; sıralamada yoksa None"""
+        with self._lock:
+            balance = self._balances.get(username)
+            if balance is None:
+                return None
+            return {
+                'rank': self._index.index((-balance, username)) + 1,
+                'username': username,
+                'balance': balance,
+                'total': len(self._index)
+            }
+
+    def around(self, username: str, window: int = 2) -> List[Dict[str, Any]]:
+        """Kullanıcı ve üstündeki/altındaki ``window`` kişi"""
+        with self._lock:
+            balance = self._balances.get(username)
+            if balance is None:
+                return []
+            position = self._index.index((-balance, username))
+            return self._entries(max(position - window, 0), position + window + 1)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def start_resync(self, app, interval: float = 60.0, full_every: int = 10,
+                     sleep: Optional[Callable[[float], Any]] = None):
+        """
+        Periyodik eşitleme thread'ini başlat (yalnızca çok worker'lı çalışmada gerekir)
+
+        Args:
+            app: Flask uygulaması (app context için)
+            interval: Artımlı eşitleme aralığı (saniye)
+            full_every: Kaç eşitlemede bir tam yeniden kurulum yapılacağı
+                (diğer worker'larda silinen kullanıcılar için; 0 = hiç)
+            sleep: Tam kurulumda parçalar arasında çağrılır
+        """
+        if self._thread is not None or not self.loader:
+            return
+
+        def run():
+            rounds = 0
+            while not self._stopped.wait(interval):
+                rounds += 1
+                try:
+                    with app.app_context():
+                        if full_every and rounds % full_every == 0:
+                            self.seed(sleep=sleep)
+                        else:
+                            self.sync_changes()
+                except Exception as e:
+                    logger.error(f'Sıralama tablosu eşitleme hatası: {e}')
+
+        self._thread = threading.Thread(target=run, name='leaderboard-resync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Yenileme thread'ini durdur"""
+        self._stopped.set()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - Yük Testi
+N adet Socket.IO istemcisiyle place_bet / chat_command yükü üretir ve
+bahisten sonuç yayınına kadar geçen uçtan uca gecikmeyi ölçer.
+
+Örnekler:
+    # Uygulamayı bu süreçte geçici SQLite ile başlat ve test et
+    python load_test.py --spawn --clients 50 --rate 2 --duration 30
+
+    # Çalışan bir sunucuya (ör. yerel Postgres ile) yük ver
+    python load_test.py --url http://127.0.0.1:5000 --clients 100 --json
+
+    # Çok worker'lı gunicorn'a yük ver (worker sayısıyla ölçeklenmeyi karşılaştır)
+    python load_test.py --url http://127.0.0.1:5000 --clients 200 --transports websocket
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Sıralı olmayan listeden yüzdelik (en yakın sıra yöntemi)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def free_port() -> int:
+    """Boş bir TCP portu bul"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class CommitCounter:
+    """SQLAlchemy engine commit sayacı (yalnızca --spawn modunda)"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+
+def spawn_app(port: int, database_url: Optional[str]) -> CommitCounter:
+    """Uygulamayı bu süreçte başlat ve commit sayacını bağla"""
+    if not database_url:
+        database_url = f'sqlite:///{tempfile.mkdtemp()}/load_test.db'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('RESULT_JOURNAL_PATH', os.path.join(tempfile.mkdtemp(), 'load_test.journal'))
+
+    from sqlalchemy import event
+    from app import app, socketio, db, startup
+
+    counter = CommitCounter()
+    with app.app_context():
+        event.listen(db.engine, 'commit', counter)
+
+    thread = threading.Thread(
+        target=lambda: socketio.run(app, host='127.0.0.1', port=port, debug=False,
+                                    use_reloader=False, log_output=False,
+                                    allow_unsafe_werkzeug=True),
+        daemon=True
+    )
+    thread.start()
+    startup.wait(60)
+    time.sleep(0.5)
+    return counter
+
+
+class SimulatedViewer:
+    """Tek bir izleyiciyi simüle eden Socket.IO istemcisi"""
+
+    def __init__(self, index: int, url: str, args, stats: Dict[str, Any], lock: threading.Lock):
+        import socketio as socketio_client
+
+        self.username = f'{args.user_prefix}{index:05d}'
+        self.url = url
+        self.args = args
+        self.stats = stats
+        self.lock = lock
+        self.rng = random.Random(args.seed * 100003 + index)
+        self.pending = deque()
+        self.client = socketio_client.Client(reconnection=False)
+
+        self.client.on('game_result', self._on_game_result)
+        self.client.on('game_results_batch', self._on_results_batch)
+        self.client.on('round_result', self._on_round_result)
+        self.client.on('bet_error', self._on_error)
+        self.client.on('chat_error', self._on_error)
+        self.client.on('chat_info', self._on_chat_info)
+
+    def _complete(self, ok: bool = True):
+        if not self.pending:
+            return
+        sent_at = self.pending.popleft()
+        with self.lock:
+            if ok:
+                self.stats['latencies'].append(time.perf_counter() - sent_at)
+                self.stats['completed'] += 1
+            else:
+                self.stats['errors'] += 1
+
+    def _on_game_result(self, data):
+        if data.get('username') == self.username:
+            self._complete()
+
+    def _on_results_batch(self, data):
+        for row in data.get('results', []):
+            if row[0] == self.username:
+                self._complete()
+
+    def _on_round_result(self, data):
+        for row in data.get('results', []):
+            if row['username'] == self.username:
+                self._complete()
+
+    def _on_error(self, data):
+        if self.username in data.get('message', ''):
+            self._complete(ok=False)
+
+    def _on_chat_info(self, data):
+        if self.username in data.get('message', ''):
+            self._complete()
+
+    def connect(self):
+        self.client.connect(self.url, transports=self.args.transports.split(','))
+
+    def run(self, deadline: float):
+        """Poisson varışlarla bahis / chat komutu gönder"""
+        while True:
+            delay = self.rng.expovariate(self.args.rate) if self.args.rate > 0 else 1.0
+            if time.perf_counter() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+            target = round(self.rng.uniform(self.args.min_target, self.args.max_target), 2)
+            self.pending.append(time.perf_counter())
+            with self.lock:
+                self.stats['sent'] += 1
+
+            if self.rng.random() < self.args.chat_ratio:
+                if self.rng.random() < self.args.balance_ratio:
+                    message = '!bakiye'
+                else:
+                    message = f'!bet {self.args.bet_amount:g} {target}'
+                self.client.emit('chat_command', {'username': self.username, 'message': message})
+            else:
+                self.client.emit('place_bet', {
+                    'username': self.username,
+                    'bet_amount': self.args.bet_amount,
+                    'target_multiplier': target
+                })
+
+    def close(self):
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+
+
+def register_users(url: str, count: int, prefix: str):
+    """Test kullanıcılarını 1000 başlangıç puanıyla kaydet"""
+    import requests
+
+    session = requests.Session()
+    for index in range(count):
+        session.post(f'{url}/api/simulate_follow', json={
+            'username': f'{prefix}{index:05d}',
+            'subscriber_count': 100
+        }, timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zeppelin Socket.IO yük testi')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Sunucu adresi')
+    parser.add_argument('--spawn', action='store_true', help='Uygulamayı bu süreçte başlat')
+    parser.add_argument('--database-url', help='--spawn için veritabanı (varsayılan: geçici SQLite)')
+    parser.add_argument('--clients', type=int, default=20, help='Simüle edilen izleyici sayısı')
+    parser.add_argument('--rate', type=float, default=1.0, help='İstemci başına saniyede komut')
+    parser.add_argument('--duration', type=float, default=20.0, help='Test süresi (saniye)')
+    parser.add_argument('--chat-ratio', type=float, default=0.5, help='chat_command oranı (kalanı place_bet)')
+    parser.add_argument('--balance-ratio', type=float, default=0.2, help='Chat komutlarında !bakiye oranı')
+    parser.add_argument('--bet-amount', type=float, default=1.0)
+    parser.add_argument('--min-target', type=float, default=1.1)
+    parser.add_argument('--max-target', type=float, default=5.0)
+    parser.add_argument('--drain', type=float, default=5.0, help='Test sonrası sonuç bekleme süresi')
+    parser.add_argument('--seed', type=int, default=42, help='Tekrarlanabilir yük için seed')
+    parser.add_argument('--user-prefix', default='loadtest_')
+    parser.add_argument('--transports', default='websocket,polling',
+                        help="Socket.IO transport'ları (çok worker'lı gunicorn için: websocket)")
+    parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yazdır')
+    args = parser.parse_args()
+
+    counter = None
+    url = args.url
+    if args.spawn:
+        port = free_port()
+        url = f'http://127.0.0.1:{port}'
+        counter = spawn_app(port, args.database_url)
+
+    register_users(url, args.clients, args.user_prefix)
+
+    stats = {'sent': 0, 'completed': 0, 'errors': 0, 'latencies': []}
+    lock = threading.Lock()
+    viewers = [SimulatedViewer(i, url, args, stats, lock) for i in range(args.clients)]
+    for viewer in viewers:
+        viewer.connect()
+
+    commits_before = counter.count if counter else 0
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=viewer.run, args=(deadline,), daemon=True) for viewer in viewers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Yoldaki sonuçları bekle
+    drain_deadline = time.perf_counter() + args.drain
+    while time.perf_counter() < drain_deadline and any(viewer.pending for viewer in viewers):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    for viewer in viewers:
+        viewer.close()
+
+    latencies_ms = [latency * 1000 for latency in stats['latencies']]
+    report = {
+        'clients': args.clients,
+        'duration_s': round(elapsed, 2),
+        'seed': args.seed,
+        'sent': stats['sent'],
+        'completed': stats['completed'],
+        'errors': stats['errors'],
+        'lost': stats['sent'] - stats['completed'] - stats['errors'],
+        'bets_per_s': round(stats['completed'] / elapsed, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies_ms, 50), 2),
+            'p95': round(percentile(latencies_ms, 95), 2),
+            'p99': round(percentile(latencies_ms, 99), 2),
+            'max': round(max(latencies_ms), 2) if latencies_ms else 0.0
+        },
+        'db_commits_per_s': round((counter.count - commits_before) / elapsed, 2) if counter else None
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print('🚀 Zeppelin yük testi sonucu')
+        print('=' * 50)
+        print(f"İstemci: {report['clients']}  Süre: {report['duration_s']} sn  Seed: {report['seed']}")
+        print(f"Gönderilen: {report['sent']}  Tamamlanan: {report['completed']}  "
+              f"Hata: {report['errors']}  Kayıp: {report['lost']}")
+        print(f"Bahis/sn: {report['bets_per_s']}")
+        print(f"Gecikme (ms) p50: {report['latency_ms']['p50']}  p95: {report['latency_ms']['p95']}  "
+              f"p99: {report['latency_ms']['p99']}  max: {report['latency_ms']['max']}")
+        if report['db_commits_per_s'] is not None:
+            print(f"DB commit/sn: {report['db_commits_per_s']}")
+        else:
+            print('DB commit/sn: ölçülmedi (yalnızca --spawn modunda)')
+
+
+if __name__ == '__main__':
+    main()
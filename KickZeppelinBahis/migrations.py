@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - Şema Migration'ları
+``db.create_all`` yalnızca eksik tabloları oluşturur; mevcut tablolara
+sonradan eklenen index'ler buradaki sıralı migration'larla uygulanır.
+Uygulananlar ``schema_migrations`` tablosuna yazılır, her migration
+idempotent'tir (çok worker'lı açılışta aynı anda çalışabilir).
+
+PostgreSQL'de ``game_results``'ın aylık RANGE bölümlü tabloya dönüşümü
+açılışta çalışmaz: tablo kilidi aldığı için ``--partition-game-results`` ile
+bir kez elle (yoğun olmayan bir saatte) çalıştırılır. Mevcut tablo
+``game_results_legacy`` bölümü olarak eklenir (bkz. partitions.py).
+
+``check_query_plans`` sık kullanılan game_results sorgularının EXPLAIN
+çıktısında beklenen index'in kullanıldığını doğrular (SQLite ve PostgreSQL);
+``tests/test_query_plans.py`` ile test olarak çalışır.
+
+Örnek:
+    python migrations.py            # bekleyen migration'ları uygula
+    python migrations.py --check    # ardından sorgu planlarını doğrula (hata → çıkış kodu 1)
+    python migrations.py --partition-game-results --lock-timeout 5s
+"""
+
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Callable, Set
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from models import GameResult, GameStats, GameStatsHourly
+from database_manager import recent_games_statement, user_results_delete_statement
+from partitions import TABLE, name_partition_indexes, next_period, period_start
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(128), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+class QueryPlanError(RuntimeError):
+    """Bir sorgu beklenen index'i kullanmıyor"""
+
+
+def _create_index(conn, index):
+    """Index'i yoksa oluştur; PostgreSQL'de tabloyu kilitlemeden (CONCURRENTLY)"""
+    if conn.dialect.name == 'postgresql':
+        ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+        conn.exec_driver_sql(ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1))
+    else:
+        index.create(conn, checkfirst=True)
+
+
+def _drop_index(conn, name: str):
+    if conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    else:
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+
+
+def _game_results_indexes(engine):
+    """game_results erişim yolları için index'ler"""
+    indexes = {index.name: index for index in GameResult.__table__.indexes}
+    with engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            # CONCURRENTLY transaction içinde çalışamaz
+            conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        for name in ('ix_game_results_game_date', 'ix_game_results_user_id_game_date'):
+            _create_index(conn, indexes[name])
+        # (user_id, game_date) index'i tek kolonlu user_id index'inin yerini tutar
+        _drop_index(conn, 'ix_game_results_user_id')
+        conn.exec_driver_sql('ANALYZE game_results')
+        conn.commit()
+
+
+def _game_stats_hourly_backfill(engine):
+    """Saatlik özet tablosunu mevcut oyun sonuçlarından doldur"""
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(GameStatsHourly.__table__)).scalar():
+            return
+        if conn.dialect.name == 'postgresql':
+            hour = func.date_trunc('hour', GameResult.game_date)
+        else:
+            hour = func.strftime('%Y-%m-%d %H:00:00.000000', GameResult.game_date)
+        conn.execute(insert(GameStatsHourly).from_select(
+            ['stat_hour', 'total_games', 'total_bets', 'total_winnings', 'updated_at'],
+            select(hour, func.count(GameResult.id), func.sum(GameResult.bet_amount),
+                   func.sum(GameResult.winnings), func.max(GameResult.game_date))
+            .group_by(hour)
+        ))
+
+
+def _is_partitioned(conn) -> bool:
+    return conn.execute(text('SELECT relkind FROM pg_class WHERE oid = CAST(:table AS regclass)'),
+                        {'table': TABLE}).scalar() == 'p'
+
+
+def _partition_game_results(engine, lock_timeout: str = '5s'):
+    """
+    game_results'ı aylık bölümlü tabloya dönüştür (yalnızca PostgreSQL)
+
+    Mevcut satırlar taşınmaz: eski tablo bu ayın sonuna kadarki aralığın
+    bölümü olur. Birincil anahtar bölüm anahtarını içermek zorunda
+    olduğundan (id, game_date) olur; sonraki ayların bölümlerini
+    partitions.GameResultPartitions oluşturur.
+
+    Bölüm sınırına uyan CHECK kısıtı önce ``NOT VALID`` eklenip yazmaları
+    durdurmadan doğrulanır; böylece ATTACH PARTITION tabloyu özel kilit
+    altında taramaz. Kilitler ``lock_timeout`` içinde alınamazsa dönüşüm
+    LockNotAvailable ile başarısız olur; tablo değişmez ve geçici CHECK
+    kısıtı kaldırılır.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+
+    now = datetime.utcnow()
+    bound = next_period(period_start(now))
+    if bound - now < timedelta(days=1):
+        # Doğrulama ile ATTACH arasında ay dönerse yeni satırlar kısıtı ihlal eder
+        bound = next_period(bound)
+    check = f'{TABLE}_legacy_bound'
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+        if _is_partitioned(conn):
+            return
+        conn.exec_driver_sql(f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {check}')
+        conn.exec_driver_sql(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {check} "
+            f"CHECK (game_date IS NOT NULL AND game_date < '{bound:%Y-%m-%d}') NOT VALID"
+        )
+    try:
+        with engine.begin() as conn:
+            # SHARE UPDATE EXCLUSIVE: tarama sırasında okuma ve yazmalar sürer
+            conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+            conn.exec_driver_sql(f'ALTER TABLE {TABLE} VALIDATE CONSTRAINT {check}')
+
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+            conn.exec_driver_sql(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+            if _is_partitioned(conn):
+                # Başka bir çalıştırma dönüştürdü
+                return
+
+            # Sonraki migration'ların eklediği kolonlara ait index'ler burada kurulmaz
+            existing = {column['name'] for column in inspect(conn).get_columns(TABLE)}
+            indexes = [index for index in GameResult.__table__.indexes
+                       if all(column.name in existing for column in index.columns)]
+
+            legacy = f'{TABLE}_legacy'
+            conn.exec_driver_sql(f'ALTER TABLE {TABLE} RENAME TO {legacy}')
+            conn.exec_driver_sql(f'ALTER TABLE {legacy} DROP CONSTRAINT {TABLE}_pkey')
+            for index in indexes:
+                conn.exec_driver_sql(f'ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_legacy')
+
+            conn.exec_driver_sql(
+                f'CREATE TABLE {TABLE} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (game_date)'
+            )
+            conn.exec_driver_sql(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, game_date)')
+            conn.exec_driver_sql(
+                f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_user_id_fkey '
+                f'FOREIGN KEY (user_id) REFERENCES users (id)'
+            )
+            for index in indexes:
+                index.create(conn)
+
+            # id dizisi eski tablo silinince (saklama süresi) gitmesin
+            sequence = conn.execute(text('SELECT pg_get_serial_sequence(:table, :column)'),
+                                    {'table': legacy, 'column': 'id'}).scalar()
+            if sequence:
+                conn.exec_driver_sql(f'ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id')
+
+            conn.exec_driver_sql(
+                f"ALTER TABLE {TABLE} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{bound:%Y-%m-%d}')"
+            )
+            conn.exec_driver_sql(f'ALTER TABLE {legacy} DROP CONSTRAINT {check}')
+            name_partition_indexes(conn, legacy, 'legacy')
+    except Exception:
+        # Kısıt kalırsa ay dönünce yeni satırlar reddedilir
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+                if not _is_partitioned(conn):
+                    conn.exec_driver_sql(f'ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {check}')
+        except Exception as e:
+            logger.error(f'{check} kısıtı kaldırılamadı, elle kaldırılmalı: {e}')
+        raise
+
+
+def _shard_stats_counters(engine):
+    """Özet tablolarında dönem başına tek satır yerine (dönem, shard) satırları"""
+    with engine.begin() as conn:
+        for model, old_index in ((GameStats, 'ix_game_stats_stat_date'),
+                                 (GameStatsHourly, 'ix_game_stats_hourly_stat_hour')):
+            table = model.__table__
+            columns = {column['name'] for column in inspect(conn).get_columns(table.name)}
+            if 'shard' not in columns:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN shard INTEGER NOT NULL DEFAULT 0')
+            # Dönem üzerindeki tekil index yerine (dönem, shard) tekil index'i
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS {old_index}')
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def _game_results_journal_id(engine):
+    """Journal tekrarında çift satırı önleyen journal_id kolonu ve tekil index'i"""
+    with engine.begin() as conn:
+        tables = [TABLE]
+        if conn.dialect.name == 'sqlite':
+            # SQLite arşiv tabloları da aynı kolonları taşır (bkz. partitions._archive)
+            tables += conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern"
+            ), {'pattern': f'{TABLE}_p%'}).scalars().all()
+        for table in tables:
+            columns = {column['name'] for column in inspect(conn).get_columns(table)}
+            if 'journal_id' not in columns:
+                conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN journal_id VARCHAR(64)')
+        for index in GameResult.__table__.indexes:
+            if index.name == 'ux_game_results_journal_id':
+                index.create(conn, checkfirst=True)
+
+
+def _drop_won_winnings_index(engine):
+    """
+    Toplam kazanç artık özet tablolarından okunduğu için kullanılmayan
+    kısmi (won, winnings) index'ini kaldır
+    """
+    with engine.begin() as conn:
+        # Bölümlü tablonun index'i CONCURRENTLY silinemez; bölüm index'leri de silinir
+        conn.exec_driver_sql('DROP INDEX IF EXISTS ix_game_results_won_winnings')
+
+
+MIGRATIONS: List[tuple] = [
+    (1, 'game_results_indexes', _game_results_indexes),
+    (2, 'game_stats_hourly_backfill', _game_stats_hourly_backfill),
+    # 3: partition_game_results - açılışta çalışmaz, bkz. partition_game_results()
+    (4, 'shard_stats_counters', _shard_stats_counters),
+    (5, 'game_results_journal_id', _game_results_journal_id),
+    (6, 'drop_game_results_won_winnings', _drop_won_winnings_index),
+]
+
+
+def applied_versions(engine) -> Set[int]:
+    """Uygulanmış migration sürümleri"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine) -> List[str]:
+    """
+    Bekleyen migration'ları sırayla uygula
+
+    Returns:
+        Bu çağrıda uygulanan migration adları
+    """
+    applied = applied_versions(engine)
+    ran = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f'Migration uygulanıyor: {version:03d}_{name}')
+        migrate(engine)
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(schema_migrations).values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Başka bir worker aynı anda uyguladı
+            pass
+        ran.append(name)
+    return ran
+
+
+PARTITION_MIGRATION = (3, 'partition_game_results')
+
+
+def partition_game_results(engine, lock_timeout: str = '5s') -> bool:
+    """
+    game_results'ı bölümlü tabloya dönüştüren tek seferlik migration
+
+    Açılışta çalışmaz (tablo kilidi alır); ``migrations.py
+    --partition-game-results`` ile elle çalıştırılır ve
+    ``schema_migrations``'a kaydedilir.
+
+    Returns:
+        Bu çağrıda uygulandıysa True (zaten uygulanmışsa veya PostgreSQL
+        değilse False)
+    """
+    if engine.dialect.name != 'postgresql':
+        return False
+    version, name = PARTITION_MIGRATION
+    if version in applied_versions(engine):
+        return False
+    logger.info(f'Migration uygulanıyor: {version:03d}_{name} (lock_timeout={lock_timeout})')
+    _partition_game_results(engine, lock_timeout)
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(schema_migrations).values(
+                version=version, name=name, applied_at=datetime.utcnow()
+            ))
+    except IntegrityError:
+        pass
+    return True
+
+
+# (ad, beklenen index, sorgu) - database_manager'ın kullandığı ifadelerin kendisi
+PLAN_CHECKS: List[tuple] = [
+    ('recent_games', 'ix_game_results_game_date', lambda: recent_games_statement(50)),
+    ('delete_user_results', 'ix_game_results_user_id_game_date', lambda: user_results_delete_statement(1)),
+]
+
+
+def explain(conn, statement) -> str:
+    """Sorgunun planını metin olarak getir"""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'sqlite':
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').all()
+        return '\n'.join(str(row[-1]) for row in rows)
+    rows = conn.exec_driver_sql(f'EXPLAIN {sql}').all()
+    return '\n'.join(str(row[0]) for row in rows)
+
+
+def check_query_plans(engine, checks: List[tuple] = None) -> List[Dict[str, Any]]:
+    """
+    Sorgu planlarında beklenen index'lerin kullanıldığını kontrol et
+
+    PostgreSQL'de küçük tablolarda planlayıcı sıralı taramayı seçebileceği
+    için kontrol ``enable_seqscan = off`` ile yapılır: index'in kullanılabilir
+    olduğu (koşul ve sıralama eşleştiği) doğrulanır.
+
+    Returns:
+        Kontrol başına ``name``, ``index``, ``used`` ve ``plan``
+    """
+    results = []
+    with engine.connect() as conn:
+        with conn.begin() as transaction:
+            if conn.dialect.name == 'postgresql':
+                conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+            for name, index, build in checks or PLAN_CHECKS:
+                plan = explain(conn, build())
+                results.append({'name': name, 'index': index, 'used': index in plan, 'plan': plan})
+            transaction.rollback()
+    return results
+
+
+def assert_query_plans(engine, checks: List[tuple] = None) -> List[Dict[str, Any]]:
+    """``check_query_plans``; beklenen index kullanılmıyorsa QueryPlanError"""
+    results = check_query_plans(engine, checks)
+    failures = [result for result in results if not result['used']]
+    if failures:
+        details = '; '.join(f"{r['name']}: {r['index']} kullanılmıyor ({r['plan']!r})" for r in failures)
+        raise QueryPlanError(f'Sorgu planı gerilemesi - {details}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Şema migration\'ları ve sorgu planı kontrolü')
+    parser.add_argument('--check', action='store_true', help='Migration sonrası sorgu planlarını doğrula')
+    parser.add_argument('--partition-game-results', action='store_true',
+                        help='PostgreSQL\'de game_results\'ı aylık bölümlü tabloya dönüştür (tek seferlik)')
+    parser.add_argument('--lock-timeout', default='5s',
+                        help='Dönüşümün kilit bekleme sınırı (PostgreSQL süresi, ör. 5s)')
+    args = parser.parse_args()
+
+    from app import app, db, startup
+
+    startup.wait()
+    with app.app_context():
+        ran = run_migrations(db.engine)
+        print(f"Uygulanan migration: {', '.join(ran) if ran else 'yok'}")
+        if args.partition_game_results:
+            converted = partition_game_results(db.engine, args.lock_timeout)
+            print(f"game_results bölümleme: {'dönüştürüldü' if converted else 'gerekmiyor'}")
+        if not args.check:
+            return 0
+        failed = False
+        for result in check_query_plans(db.engine):
+            status = 'OK ' if result['used'] else 'HATA'
+            failed = failed or not result['used']
+            print(f"[{status}] {result['name']}: {result['index']}")
+            if not result['used']:
+                print('       ' + result['plan'].replace('\n', '\n       '))
+        return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
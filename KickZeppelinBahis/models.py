@@ -57,20 +57,39 @@ class GameResult(db.Model):
     __tablename__ = 'game_results'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     bet_amount = db.Column(db.Float, nullable=False)
     target_multiplier = db.Column(db.Float, nullable=False)
     actual_multiplier = db.Column(db.Float, nullable=False)
     won = db.Column(db.Boolean, nullable=False)
     winnings = db.Column(db.Float, default=0.0, nullable=False)
     game_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Journal kaydının kimliği (<oturum>:<sıra>); tekrar oynatılan kayıt iki kez eklenmez
+    journal_id = db.Column(db.String(64), nullable=True)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Oyun sonucunu dict olarak döndür"""
+    # Erişim yolları (bkz. migrations.py - mevcut tablolara migration ile eklenir):
+    # son oyunlar ve kullanıcının satırları (delete_user / FK araması)
+    __table_args__ = (
+        db.Index('ix_game_results_game_date', game_date.desc()),
+        db.Index('ix_game_results_user_id_game_date', user_id, game_date),
+        # Bölümlü tabloda tekil index bölüm anahtarını (game_date) içermek zorunda
+        db.Index('ux_game_results_journal_id', journal_id, game_date, unique=True),
+    )
+    
+    def to_dict(self, username: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Oyun sonucunu dict olarak döndür
+        
+        Args:
+            username: Sorguda birlikte okunan kullanıcı adı (verilirse
+                ``player`` ilişkisi ayrı sorguyla yüklenmez)
+        """
+        if username is None and self.player:
+            username = self.player.username
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'username': self.player.username if self.player else None,
+            'username': username,
             'bet_amount': self.bet_amount,
             'target_multiplier': self.target_multiplier,
             'actual_multiplier': self.actual_multiplier,
@@ -84,17 +103,27 @@ class GameResult(db.Model):
 
 
 class GameStats(db.Model):
-    """Oyun istatistikleri modeli"""
+    """
+    Oyun istatistikleri modeli
+    
+    Gün başına ``shard`` sayısı kadar satır vardır; yazarlar rastgele bir
+    shard'ı atomik olarak artırır, okuyucular shard'ları toplar.
+    """
     __tablename__ = 'game_stats'
     
     id = db.Column(db.Integer, primary_key=True)
-    stat_date = db.Column(db.Date, default=datetime.utcnow().date, nullable=False, unique=True, index=True)
+    stat_date = db.Column(db.Date, default=datetime.utcnow().date, nullable=False)
+    shard = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     total_games = db.Column(db.Integer, default=0, nullable=False)
     total_bets = db.Column(db.Float, default=0.0, nullable=False)
     total_winnings = db.Column(db.Float, default=0.0, nullable=False)
     active_users = db.Column(db.Integer, default=0, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_game_stats_stat_date_shard', 'stat_date', 'shard', unique=True),
+    )
+    
     def to_dict(self) -> Dict[str, Any]:
         """İstatistikleri dict olarak döndür"""
         return {
@@ -110,14 +139,53 @@ class GameStats(db.Model):
         return f'<GameStats {self.stat_date}: {self.total_games} games>'
 
 
-def get_or_create_daily_stats() -> GameStats:
-    """Günlük istatistikleri getir veya oluştur"""
-    today = datetime.utcnow().date()
-    stats = GameStats.query.filter_by(stat_date=today).first()
+class GameStatsHourly(db.Model):
+    """Saatlik oyun istatistikleri (GameStats'ın saatlik karşılığı, aynı shard düzeni)"""
+    __tablename__ = 'game_stats_hourly'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    stat_hour = db.Column(db.DateTime, nullable=False)
+    shard = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    total_games = db.Column(db.Integer, default=0, nullable=False)
+    total_bets = db.Column(db.Float, default=0.0, nullable=False)
+    total_winnings = db.Column(db.Float, default=0.0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    if not stats:
-        stats = GameStats(stat_date=today)
-        db.session.add(stats)
-        db.session.commit()
+    __table_args__ = (
+        db.Index('ix_game_stats_hourly_stat_hour_shard', 'stat_hour', 'shard', unique=True),
+    )
     
-    return stats
\ No newline at end of file
+    def to_dict(self) -> Dict[str, Any]:
+        """İstatistikleri dict olarak döndür"""
+        return {
+            'stat_hour': self.stat_hour.isoformat(),
+            'total_games': self.total_games,
+            'total_bets': self.total_bets,
+            'total_winnings': self.total_winnings,
+            'updated_at': self.updated_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<GameStatsHourly {self.stat_hour}: {self.total_games} games>'
+
+
+
+class ProvablyFairChain(db.Model):
+    """
+    Provably-fair hash zinciri
+
+    Gizli seed ve dağıtılan tur konumu veritabanında tutulur; böylece yeniden
+    başlatmalar ve worker'lar aynı zinciri sürdürür ve yayınlanan taahhütler
+    sonradan doğrulanabilir kalır.
+    """
+    __tablename__ = 'provably_fair_chains'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    seed = db.Column(db.String(64), nullable=False)
+    terminating_hash = db.Column(db.String(64), nullable=False)
+    chain_length = db.Column(db.Integer, nullable=False)
+    next_index = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ProvablyFairChain #{self.id}: {self.next_index}/{self.chain_length}>'
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - game_results Zaman Bölümlemesi ve Saklama Süresi
+PostgreSQL'de ``game_results`` aylık RANGE bölümlü tablodur (dönüşüm
+``migrations.py --partition-game-results`` ile bir kez elle yapılır);
+bakım işi önümüzdeki ayların bölümlerini önceden oluşturur. SQLite'ta yerel bölümleme olmadığından ``game_results``
+sıcak tablo olarak kalır; saklama süresi verildiyse kapanan aylar
+``game_results_pYYYY_MM`` arşiv tablolarına taşınır (her ay ayrı
+transaction'da) ve tüm ham satırlar ``game_results_all`` görünümünden
+okunabilir. Saklama süresi yoksa arşivleme yapılmaz.
+
+Saklama süresi (``retention_days``) dolan ham bölümler / arşiv tabloları
+silinir; saatlik ve günlük özet tabloları (game_stats_hourly, game_stats)
+korunur, geçmiş grafikleri ve toplamlar bunlardan okunur.
+
+Örnek:
+    python partitions.py                     # bakım (bölüm oluştur / arşivle)
+    python partitions.py --retention-days 90 # ve 90 günden eski ham veriyi sil
+"""
+
+import re
+import sys
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import text
+
+from models import GameResult
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'game_results'
+ALL_ROWS_VIEW = f'{TABLE}_all'
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def period_start(moment: datetime) -> datetime:
+    """Anın içinde olduğu ayın başı"""
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_period(start: datetime) -> datetime:
+    """Sonraki ayın başı"""
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f'{TABLE}_p{start:%Y_%m}'
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if value.upper() in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def archive_tables(conn) -> List[str]:
+    """SQLite arşiv tablolarının adları (PostgreSQL'de boş)"""
+    if conn.dialect.name != 'sqlite':
+        return []
+    return conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern ORDER BY name"
+    ), {'pattern': f'{TABLE}_p%'}).scalars().all()
+
+
+def delete_archived_user_rows(conn, user_id: int) -> int:
+    """
+    Kullanıcının SQLite arşiv tablolarındaki satırlarını sil
+
+    PostgreSQL'de bölümler üst tablodan silinir, burada bir şey yapılmaz.
+
+    Returns:
+        Silinen satır sayısı
+    """
+    deleted = 0
+    for table in archive_tables(conn):
+        deleted += conn.execute(text(f'DELETE FROM {table} WHERE user_id = :user_id'),
+                                {'user_id': user_id}).rowcount
+    return deleted
+
+
+def name_partition_indexes(conn, partition: str, suffix: str):
+    """
+    Bölümün index'lerini ``<üst index adı>_<suffix>`` olarak adlandır
+
+    PostgreSQL bölüm index'lerine otomatik ad verir; üst tablonun index
+    adını içermeleri sorgu planı kontrolünün (migrations.PLAN_CHECKS)
+    bölümlü tabloda da çalışmasını sağlar.
+    """
+    rows = conn.execute(text("""
+        SELECT child.relname, parent.relname
+        FROM pg_index x
+        JOIN pg_class child ON child.oid = x.indexrelid
+        JOIN pg_inherits i ON i.inhrelid = child.oid
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        WHERE x.indrelid = CAST(:partition AS regclass)
+    """), {'partition': partition}).all()
+    for child, parent in rows:
+        target = f'{parent}_{suffix}'
+        if child != target:
+            conn.exec_driver_sql(f'ALTER INDEX "{child}" RENAME TO "{target}"')
+
+
+class GameResultPartitions:
+    """
+    game_results bölümlerinin bakımı ve saklama süresi
+
+    ``maintain`` idempotent'tir; açılışta ve ``start`` ile periyodik olarak
+    çalışır. Çok worker'lı çalışmada aynı anda çalışan bakım işleri
+    çakışırsa hata loglanır ve bir sonraki turda tamamlanır.
+    """
+
+    def __init__(self, retention_days: int = 0, months_ahead: int = 2, hot_months: int = 2):
+        """
+        Args:
+            retention_days: Ham oyun sonuçlarının saklanacağı gün (0 ise süresiz)
+            months_ahead: PostgreSQL'de önceden oluşturulacak ay bölümü
+            hot_months: SQLite'ta sıcak tabloda kalan ay sayısı (bu ay dahil)
+        """
+        self.retention_days = retention_days
+        self.months_ahead = months_ahead
+        self.hot_months = max(hot_months, 1)
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def list_partitions(self, engine) -> List[Dict[str, Any]]:
+        """Ham veri bölümleri (ad, başlangıç, bitiş); SQLite'ta arşiv tabloları"""
+        with engine.connect() as conn:
+            if conn.dialect.name == 'postgresql':
+                rows = conn.execute(text("""
+                    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = CAST(:table AS regclass)
+                """), {'table': TABLE}).all()
+                partitions = []
+                for name, bound in rows:
+                    match = _BOUND.search(bound or '')
+                    if match:
+                        partitions.append({'name': name, 'start': _parse_bound(match.group(1)),
+                                           'end': _parse_bound(match.group(2))})
+            else:
+                partitions = []
+                for name in archive_tables(conn):
+                    try:
+                        start = datetime.strptime(name[len(TABLE) + 2:], '%Y_%m')
+                    except ValueError:
+                        continue
+                    partitions.append({'name': name, 'start': start, 'end': next_period(start)})
+        return sorted(partitions, key=lambda p: p['end'] or datetime.max)
+
+    def maintain(self, engine, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """
+        Bölümleri hazırla ve saklama süresini uygula
+
+        Returns:
+            ``created`` (PostgreSQL), ``archived`` (SQLite) ve ``dropped`` tablo adları
+        """
+        now = now or datetime.utcnow()
+        result = {'created': [], 'archived': [], 'dropped': []}
+        if engine.dialect.name == 'postgresql':
+            if not self._is_partitioned(engine):
+                logger.warning('game_results bölümlü değil; bölüm bakımı atlandı '
+                               '(python migrations.py --partition-game-results)')
+                return result
+            result['created'] = self._create_ahead(engine, now)
+        elif self.retention_days > 0:
+            # Arşiv tabloları yalnızca süresi dolunca bütün olarak silinmek için var
+            result['archived'] = self._archive(engine, now)
+        if self.retention_days > 0:
+            result['dropped'] = self._drop_expired(engine, now - timedelta(days=self.retention_days))
+        if engine.dialect.name == 'sqlite' and (result['archived'] or result['dropped']
+                                                or not self._view_exists(engine)):
+            self._refresh_view(engine)
+
+        if any(result.values()):
+            logger.info(f'game_results bölüm bakımı: {result}')
+        return result
+
+    def _is_partitioned(self, engine) -> bool:
+        with engine.connect() as conn:
+            return conn.execute(text('SELECT relkind FROM pg_class WHERE oid = CAST(:table AS regclass)'),
+                                {'table': TABLE}).scalar() == 'p'
+
+    def _create_ahead(self, engine, now: datetime) -> List[str]:
+        """Bu ay ve sonraki ``months_ahead`` ay için eksik bölümleri oluştur"""
+        existing = self.list_partitions(engine)
+        covered_until = max((p['end'] for p in existing if p['end']), default=None)
+        created = []
+        start = period_start(now)
+        for _ in range(self.months_ahead + 1):
+            end = next_period(start)
+            if covered_until is None or start >= covered_until:
+                name = partition_name(start)
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+                        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+                    )
+                    name_partition_indexes(conn, name, name[len(TABLE) + 1:])
+                created.append(name)
+            start = end
+        return created
+
+    def _archive(self, engine, now: datetime) -> List[str]:
+        """Sıcak tablodaki eski ayları arşiv tablolarına taşı (SQLite, ay başına bir transaction)"""
+        boundary = period_start(now)
+        for _ in range(self.hot_months - 1):
+            boundary = period_start(boundary - timedelta(days=1))
+
+        with engine.connect() as conn:
+            oldest = conn.execute(text(f'SELECT MIN(game_date) FROM {TABLE}')).scalar()
+        archived = []
+        if oldest is None:
+            return archived
+        if isinstance(oldest, str):
+            oldest = datetime.fromisoformat(oldest)
+
+        columns = ', '.join(column.name for column in GameResult.__table__.columns)
+        start = period_start(oldest)
+        while start < boundary:
+            end = next_period(start)
+            name = partition_name(start)
+            bounds = {'start': str(start), 'end': str(end)}
+            # İlk çalışmada aylarca veri tek yazma kilidinde taşınmasın
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'CREATE TABLE IF NOT EXISTS {name} AS SELECT {columns} FROM {TABLE} WHERE 0')
+                conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS ix_{name}_game_date ON {name} (game_date)')
+                conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS ix_{name}_user_id ON {name} (user_id)')
+                moved = conn.execute(text(
+                    f'INSERT INTO {name} ({columns}) SELECT {columns} FROM {TABLE} '
+                    'WHERE game_date >= :start AND game_date < :end'
+                ), bounds).rowcount
+                conn.execute(text(f'DELETE FROM {TABLE} WHERE game_date >= :start AND game_date < :end'), bounds)
+            if moved:
+                archived.append(name)
+            start = end
+        return archived
+
+    def _view_exists(self, engine) -> bool:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = :name"),
+                                {'name': ALL_ROWS_VIEW}).scalar() is not None
+
+    def _refresh_view(self, engine):
+        """Sıcak tablo ve arşiv tablolarını birleştiren ``game_results_all`` görünümü (SQLite)"""
+        columns = ', '.join(column.name for column in GameResult.__table__.columns)
+        with engine.begin() as conn:
+            tables = archive_tables(conn)
+            for table in tables:
+                # delete_user'ın arşiv silmesi için (önceden oluşturulmuş arşivler dahil)
+                conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS ix_{table}_user_id ON {table} (user_id)')
+            selects = [f'SELECT {columns} FROM {table}' for table in [TABLE] + tables]
+            conn.exec_driver_sql(f'DROP VIEW IF EXISTS {ALL_ROWS_VIEW}')
+            conn.exec_driver_sql(f'CREATE VIEW {ALL_ROWS_VIEW} AS ' + ' UNION ALL '.join(selects))
+
+    def _drop_expired(self, engine, cutoff: datetime) -> List[str]:
+        """Tamamı ``cutoff``'tan eski olan bölümleri sil (özet tabloları kalır)"""
+        dropped = []
+        for partition in self.list_partitions(engine):
+            if partition['end'] is None or partition['end'] > cutoff:
+                continue
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'DROP TABLE IF EXISTS {partition["name"]}')
+            dropped.append(partition['name'])
+        return dropped
+
+    def start(self, app, engine, interval: float = 3600.0):
+        """
+        Periyodik bakım thread'ini başlat
+
+        Args:
+            app: Flask uygulaması (app context için)
+            engine: game_results'ın bulunduğu engine
+            interval: Bakım aralığı (saniye)
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    with app.app_context():
+                        self.maintain(engine)
+                except Exception as e:
+                    logger.error(f'game_results bölüm bakımı hatası: {e}')
+
+        self._thread = threading.Thread(target=run, name='partition-maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Bakım thread'ini durdur"""
+        self._stopped.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='game_results bölüm bakımı ve saklama süresi')
+    parser.add_argument('--retention-days', type=int, default=0,
+                        help='Bu günden eski ham bölümleri sil (0 = silme)')
+    parser.add_argument('--months-ahead', type=int, default=2,
+                        help='PostgreSQL\'de önceden oluşturulacak ay bölümü')
+    args = parser.parse_args()
+
+    from app import app, db, startup
+
+    startup.wait()
+    with app.app_context():
+        partitions = GameResultPartitions(retention_days=args.retention_days,
+                                          months_ahead=args.months_ahead)
+        result = partitions.maintain(db.engine)
+        for key in ('created', 'archived', 'dropped'):
+            print(f"{key}: {', '.join(result[key]) if result[key] else '-'}")
+        for partition in partitions.list_partitions(db.engine):
+            start = partition['start'].date() if partition['start'] else 'MINVALUE'
+            end = partition['end'].date() if partition['end'] else 'MAXVALUE'
+            print(f"  {partition['name']}: {start} .. {end}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import hmac
+import hashlib
+import logging
+import secrets
+import threading
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional
+from game_logic import CompiledSampler
+
+logger = logging.getLogger(__name__)
+
+
+def hash_to_uniform(round_hash: str, client_seed: str) -> float:
+    """Tur hash'ini HMAC-SHA256 ile [0, 1) aralığında bir sayıya çevir (52 bit)"""
+    digest = hmac.new(bytes.fromhex(round_hash), client_seed.encode('utf-8'), hashlib.sha256).hexdigest()
+    return int(digest[:13], 16) / float(1 << 52)
+
+
+def next_chain_hash(round_hash: str) -> str:
+    """Zincirde bir önceki turun hash'i: sha256(hash)"""
+    return hashlib.sha256(bytes.fromhex(round_hash)).hexdigest()
+
+
+def verify_round(round_hash: str, crash_point: float, client_seed: str,
+                 win_rate: float, min_multiplier: float, max_multiplier: float,
+                 previous_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Bir turun sonucunu bağımsız olarak doğrula
+
+    Args:
+        round_hash: Turun açıklanan hash'i
+        crash_point: Açıklanan crash noktası
+        client_seed: Zincirin client seed'i
+        win_rate: Tur sırasındaki kazanma oranı ayarı
+        min_multiplier: Tur sırasındaki min çarpan ayarı
+        max_multiplier: Tur sırasındaki max çarpan ayarı
+        previous_hash: Bir önceki turun hash'i (veya zincirin bitiş hash'i)
+
+    Returns:
+        Yeniden hesaplanan crash noktası ve doğrulama sonuçları
+    """
+    sampler = CompiledSampler.from_settings(win_rate, min_multiplier, max_multiplier)
+    expected = sampler.sample(hash_to_uniform(round_hash, client_seed))
+
+    result = {
+        'round_hash': round_hash,
+        'expected_crash_point': expected,
+        'crash_point_valid': abs(expected - crash_point) < 1e-9
+    }
+    if previous_hash is not None:
+        result['chain_valid'] = next_chain_hash(round_hash) == previous_hash
+    return result
+
+
+def chain_hashes(seed: str, chain_length: int) -> List[str]:
+    """Seed'den zinciri üret: ``[seed, sha256(seed), ...]``, son eleman bitiş hash'i"""
+    chain = [seed]
+    for _ in range(chain_length):
+        chain.append(next_chain_hash(chain[-1]))
+    return chain
+
+
+def new_chain_record(chain_id: int, chain_length: int) -> Dict[str, Any]:
+    """Yeni gizli seed ile zincir kaydı oluştur"""
+    seed = secrets.token_hex(32)
+    return {
+        'chain_id': chain_id,
+        'seed': seed,
+        'terminating_hash': chain_hashes(seed, chain_length)[-1],
+        'chain_length': chain_length,
+        'next_index': 0
+    }
+
+
+class MemoryChainStore:
+    """
+    Zincirleri süreç belleğinde tutan store
+
+    Yeniden başlatmada seed ve konum kaybolur; kalıcı zincir için
+    ``DatabaseManager`` aynı arayüzü sağlar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains: List[Dict[str, Any]] = []
+
+    def claim_chain_rounds(self, chain_length: int, count: int) -> Dict[str, Any]:
+        with self._lock:
+            chain = self._chains[-1] if self._chains else None
+            if chain is None or chain['next_index'] >= chain['chain_length']:
+                chain = new_chain_record(len(self._chains) + 1, chain_length)
+                self._chains.append(chain)
+            start = chain['next_index']
+            chain['next_index'] = min(start + count, chain['chain_length'])
+            return dict(chain, start=start, end=chain['next_index'])
+
+    def chain_commitments(self, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'chain_id': chain['chain_id'], 'terminating_hash': chain['terminating_hash'],
+                     'chain_length': chain['chain_length']}
+                    for chain in reversed(self._chains[-limit:])]
+
+
+class CrashPointChain:
+    """
+    Önceden üretilmiş, doğrulanabilir crash noktası zinciri
+
+    Gizli bir seed'den SHA-256 hash zinciri üretilir ve zincirin bitiş hash'i
+    önceden yayınlanır. Turlar zinciri sondan başa doğru tüketir; her turun
+    hash'i açıklandığında sha256(hash) bir önceki turun hash'ine eşit olmalıdır.
+    Crash noktası HMAC(hash, client_seed)'den türetilen uniform değerin
+    oyunun derlenmiş örnekleyicisinden geçirilmesiyle bulunur.
+
+    Seed ve zincirdeki konum ``store``'da tutulur (``DatabaseManager`` ile
+    veritabanında). Worker'lar zincirden ``buffer_size``'lık tur blokları
+    ayırır; böylece yeniden başlatmalar ve birden çok worker aynı zinciri
+    hiçbir turu iki kez kullanmadan sürdürür. Ayrılıp kullanılmadan kalan
+    turlar (kapanan worker'ın tamponu) atlanır; doğrulayıcı bu durumda
+    önceki açıklanan hash'e ulaşana kadar sha256'yı tekrar uygular.
+
+    Arka plan thread'i ilk tur çekiminde başlar ve sonraki turların crash
+    noktalarını bir halka tamponda hazır tutar; tur çekimi tampondan pop'tur.
+    """
+
+    def __init__(self, game, client_seed: str = 'zeppelin',
+                 chain_length: int = 10000, buffer_size: int = 256,
+                 history_size: int = 100, store=None, app=None):
+        """
+        Args:
+            game: ZeppelinGame örneği (derlenmiş örnekleyici için)
+            client_seed: Herkese açık client seed
+            chain_length: Yeni zincirlerdeki tur sayısı
+            buffer_size: Önceden hesaplanacak (ve bir seferde ayrılacak) tur sayısı
+            history_size: Açıklanan son turlardan saklanacak sayı
+            store: ``claim_chain_rounds``/``chain_commitments`` sağlayan zincir
+                deposu (varsayılan: süreç belleği)
+            app: Flask uygulaması (store veritabanı kullanıyorsa app context için)
+        """
+        self.game = game
+        self.client_seed = client_seed
+        self.chain_length = chain_length
+        self.buffer_size = buffer_size
+        self.store = store or MemoryChainStore()
+        self.app = app
+
+        self._lock = threading.Condition()
+        self._buffer = deque(maxlen=buffer_size)
+        self._history = deque(maxlen=history_size)
+        self._chain: List[str] = []
+        self._chain_id = None
+        self._round_index = 0
+        self._claimed_until = 0
+        self._thread = None
+        self._stopped = False
+
+    def _context(self):
+        return self.app.app_context() if self.app is not None else nullcontext()
+
+    def _claim(self, count: int):
+        """Store'dan zincir konumu ayır ve zinciri seed'den yükle (lock altında çağrılır)"""
+        with self._context():
+            claim = self.store.claim_chain_rounds(self.chain_length, count)
+
+        if claim['chain_id'] != self._chain_id:
+            self._chain = chain_hashes(claim['seed'], claim['chain_length'])
+            self._chain_id = claim['chain_id']
+            logger.info(f"Provably-fair zinciri #{self._chain_id}: {claim['terminating_hash']}")
+        self._round_index = claim['start']
+        self._claimed_until = claim['end']
+
+    def _compute_next(self) -> Dict[str, Any]:
+        """Zincirdeki sıradaki turu hesapla (lock altında çağrılır)"""
+        if self._round_index >= self._claimed_until:
+            self._claim(self.buffer_size)
+
+        self._round_index += 1
+        # Turlar sondan başa: k. turun hash'i sha256^(L-k)(seed)
+        round_hash = self._chain[len(self._chain) - 1 - self._round_index]
+        sampler = self.game._sampler
+        return {
+            'chain_id': self._chain_id,
+            'round_index': self._round_index,
+            'hash': round_hash,
+            'crash_point': sampler.sample(hash_to_uniform(round_hash, self.client_seed)),
+            '_sampler': sampler
+        }
+
+    def _fill(self):
+        """Tamponu dolduran arka plan döngüsü"""
+        with self._lock:
+            while not self._stopped:
+                try:
+                    while len(self._buffer) < self.buffer_size:
+                        self._buffer.append(self._compute_next())
+                except Exception as e:
+                    logger.error(f'Provably-fair tamponu doldurulamadı: {e}')
+                self._lock.wait()
+
+    def start(self):
+        """Güncel zinciri store'dan yükle (yoksa oluştur) ve taahhüdünü yayınla"""
+        with self._lock:
+            if self._chain_id is None:
+                self._claim(0)
+
+    def stop(self):
+        """Tampon thread'ini durdur"""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+
+    def next_round(self) -> Dict[str, Any]:
+        """
+        Sıradaki turun sonucunu çek
+
+        Returns:
+            ``hash``, ``crash_point``, ``chain_id``, ``round_index`` ve turun
+            ayarları
+        """
+        with self._lock:
+            # Tampon yalnızca tur çeken worker'da dolar (tur modunda lider)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._fill, name='crash-chain', daemon=True)
+                self._thread.start()
+
+            entry = self._buffer.popleft() if self._buffer else self._compute_next()
+            self._lock.notify()
+
+            # Tampon dolduktan sonra ayarlar değiştiyse aynı hash'ten yeniden hesapla
+            sampler = self.game._sampler
+            if entry['_sampler'] is not sampler:
+                entry['crash_point'] = sampler.sample(hash_to_uniform(entry['hash'], self.client_seed))
+
+            # Ayarlar çekimi yapan örnekleyicinin kendisinden okunur
+            round_info = {k: v for k, v in entry.items() if k != '_sampler'}
+            round_info.update(sampler.settings, client_seed=self.client_seed)
+            self._history.appendleft(round_info)
+            return round_info
+
+    def get_public_info(self) -> Dict[str, Any]:
+        """Yayınlanan taahhütler (store'daki son zincirler) ve bu worker'ın açıkladığı son turlar"""
+        with self._context():
+            commitments = self.store.chain_commitments(5)
+        with self._lock:
+            if not commitments:
+                self._claim(0)
+                with self._context():
+                    commitments = self.store.chain_commitments(5)
+            current = commitments[0]
+            return {
+                'chain_id': current['chain_id'],
+                'chain_length': current['chain_length'],
+                'terminating_hash': current['terminating_hash'],
+                'commitments': commitments,
+                'client_seed': self.client_seed,
+                'buffered_rounds': len(self._buffer),
+                'recent_rounds': list(self._history)
+            }
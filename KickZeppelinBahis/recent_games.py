@@ -0,0 +1,70 @@
+import threading
+from collections import deque
+from typing import Dict, Any, Iterable, List
+
+
+class RecentGames:
+    """
+    Son sonuçlanan oyunların bellekteki halka tamponu
+
+    Sonuçlandırma sırasında kullanıcı adıyla birlikte doldurulur; son
+    aktiviteler ve canlı akış veritabanına gitmeden okunur. Açılışta son
+    ``capacity`` oyun tek bir JOIN sorgusuyla yüklenir (``seed``).
+
+    Kayıtlarda satır ``id``'si yoktur: journal ile yazılan sonuçlar
+    sonuçlandırma anında henüz veritabanına eklenmemiştir. Tampon ve
+    veritabanı yedeği aynı alanları döndürür.
+    """
+
+    FIELDS = ('user_id', 'username', 'bet_amount', 'target_multiplier',
+              'actual_multiplier', 'won', 'winnings', 'game_date')
+
+    def __init__(self, capacity: int = 200):
+        """
+        Args:
+            capacity: Tutulan en fazla oyun (0 ise tampon kapalı)
+        """
+        self.capacity = capacity
+        self.seeded = False
+        self._lock = threading.Lock()
+        self._games = deque(maxlen=max(capacity, 1))
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _entry(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: game.get(field) for field in self.FIELDS}
+
+    def seed(self, games: Iterable[Dict[str, Any]]):
+        """Tamponu yeniden kur (oyunlar en yeniden eskiye)"""
+        entries = [self._entry(game) for game in games]
+        with self._lock:
+            self._games.clear()
+            self._games.extend(reversed(entries))
+            self.seeded = True
+
+    def extend(self, games: Iterable[Dict[str, Any]]):
+        """Sonuçlanan oyunları ekle (eskiden yeniye)"""
+        if not self.enabled:
+            return
+        entries = [self._entry(game) for game in games]
+        with self._lock:
+            self._games.extend(entries)
+
+    def forget(self, username: str):
+        """Silinen kullanıcının oyunlarını çıkar"""
+        with self._lock:
+            kept = [game for game in self._games if game['username'] != username]
+            self._games.clear()
+            self._games.extend(kept)
+
+    def covers(self, limit: int) -> bool:
+        """``limit`` oyun tampondan karşılanabilir mi"""
+        return self.enabled and self.seeded and limit <= self.capacity
+
+    def latest(self, limit: int) -> List[Dict[str, Any]]:
+        """Son ``limit`` oyun, en yeniden eskiye"""
+        with self._lock:
+            games = list(self._games)[-limit:] if limit > 0 else []
+        return [dict(game) for game in reversed(games)]
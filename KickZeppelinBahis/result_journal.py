@@ -0,0 +1,484 @@
+import os
+import json
+import uuid
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional
+from datetime import datetime
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+
+class GameResultJournal:
+    """
+    Oyun sonuçları için write-behind journal
+
+    Sonuçlandırılmış bahisler önce yerel bir journal dosyasına (JSON satırları)
+    eklenir ve bellekteki kuyruğa alınır. Arka plan thread'i kuyruğu her
+    ``flush_interval_ms`` milisaniyede bir veya ``batch_size`` satıra ulaşınca
+    tek bir toplu INSERT ile veritabanına yazar. Veritabanına yazılan son
+    sıra numarası checkpoint dosyasına kaydedilir; açılışta ``replay`` ile
+    checkpoint sonrası kayıtlar tekrar kuyruğa alınır, böylece yeniden
+    başlatmada kayıt kaybolmaz.
+
+    ``append`` kaydı döndürmeden önce fsync ile diske indirir (``fsync=False``
+    ile kapatılır). Aynı anda gelen eklemeler tek fsync'i paylaşır (group
+    commit); birden çok satır ekleyen çağıranlar ``sync=False`` ile ekleyip
+    son sıra numarası için bir kez ``sync`` çağırabilir.
+
+    Bakiye değişikliğiyle birlikte yazılan sonuçlar ``hold`` ile bakiye
+    commit'inden önce journal'a eklenir ve commit'e kadar flush edilmez;
+    commit başarısız olursa kayıtlar iptal satırıyla geri alınır. Arada bir
+    çökme olursa kayıt ``replay`` ile yazılır (sonuç kaybolmaz).
+
+    Her kayıt ``journal_id`` (``<oturum>:<sıra>``) taşır; veritabanına yazıp
+    checkpoint'i güncelleyemeden çöken bir flush tekrar oynatıldığında
+    ``writer`` zaten yazılmış satırları atlar.
+
+    Üst üste ``max_failures`` kez yazılamayan bir toplu iş satır satır
+    yazılır; veri hatası (IntegrityError/DataError - ör. silinmiş kullanıcı,
+    bölümü olmayan tarih) veren satırlar ``<path>.dead`` dosyasına hata
+    mesajıyla taşınır, böylece tek bir bozuk satır journal'ı kilitlemez.
+    Bağlantı hataları gibi diğer hatalarda kayıtlar kuyrukta bekler.
+    """
+
+    def __init__(self, app, writer: Callable[[List[Dict[str, Any]]], None],
+                 path: str = 'game_results.journal',
+                 flush_interval_ms: int = 200, batch_size: int = 500,
+                 max_failures: int = 3, fsync: bool = True):
+        """
+        Args:
+            app: Flask uygulaması (flush thread'i için app context)
+            writer: Satır listesini tek transaction'da veritabanına yazan fonksiyon
+            path: Journal dosyası yolu
+            flush_interval_ms: En uzun flush aralığı (ms)
+            batch_size: Bu kadar satır biriktiğinde hemen flush edilir
+            max_failures: Toplu iş bu kadar kez başarısız olunca satır satır yazılır
+            fsync: ``append`` dönmeden önce kayıt diske indirilsin mi
+        """
+        self.app = app
+        self.writer = writer
+        self.path = path
+        self.checkpoint_path = f'{path}.ckpt'
+        self.dead_letter_path = f'{path}.dead'
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.max_failures = max(max_failures, 1)
+        self.fsync = fsync
+        self._consecutive_failures = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._durable_seq = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pending: List[Dict[str, Any]] = []
+        self._seq = 0
+        # Checkpoint kaybolup sıra sıfırdan başlasa da kimlikler çakışmaz
+        self._session = uuid.uuid4().hex[:12]
+        self._file = None
+
+        self.metrics = {
+            'appended_rows': 0,
+            'fsyncs': 0,
+            'flushed_rows': 0,
+            'flush_count': 0,
+            'failed_flushes': 0,
+            'dead_lettered_rows': 0,
+            'replayed_rows': 0,
+            'last_flush_ms': 0.0,
+            'last_flush_lag_ms': 0.0,
+            'max_flush_lag_ms': 0.0
+        }
+
+    def _read_checkpoint(self) -> int:
+        """Veritabanına yazılmış son sıra numarasını oku"""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f'Journal checkpoint okunamadı: {e}')
+            return 0
+
+    def _write_checkpoint(self, seq: int):
+        """Checkpoint dosyasını atomik olarak güncelle"""
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def replay(self) -> int:
+        """
+        Journal'da olup veritabanına yazılmamış kayıtları kuyruğa al
+
+        Returns:
+            Tekrar kuyruğa alınan kayıt sayısı
+        """
+        checkpoint = self._read_checkpoint()
+        replayed = []
+        discarded = set()
+        last_seq = checkpoint
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Çökme sırasında yarım kalmış son satır
+                        logger.warning('Journal\'da bozuk satır atlandı')
+                        continue
+                    if 'discard' in record:
+                        discarded.update(record['discard'])
+                        continue
+                    last_seq = max(last_seq, record['seq'])
+                    if record['seq'] > checkpoint:
+                        replayed.append(record)
+
+        replayed = [record for record in replayed if record['seq'] not in discarded]
+
+        with self._lock:
+            self._seq = last_seq
+            self._durable_seq = last_seq
+            self._pending = replayed + self._pending
+            self.metrics['replayed_rows'] += len(replayed)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+        if replayed:
+            logger.info(f'Journal\'dan {len(replayed)} oyun sonucu tekrar kuyruğa alındı')
+        return len(replayed)
+
+    def start(self):
+        """Flush thread'ini başlat"""
+        if self._file is None:
+            self.replay()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='result-journal', daemon=True)
+            self._thread.start()
+            logger.info('Oyun sonucu journal\'ı başlatıldı')
+
+    def stop(self):
+        """Thread'i durdur ve kalan kayıtları yaz"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush_all()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def append(self, record: Dict[str, Any], sync: bool = True, hold: bool = False) -> int:
+        """
+        Sonuçlandırılmış bir oyun sonucunu journal'a ekle
+
+        Args:
+            record: GameResult kolonları (game_date datetime olabilir)
+            sync: Dönmeden önce fsync yapılsın mı (``fsync`` kapalıysa yapılmaz)
+            hold: ``release`` çağrılana kadar flush edilmesin
+
+        Returns:
+            Kaydın sıra numarası (``sync`` için)
+        """
+        record = dict(record)
+        if isinstance(record.get('game_date'), datetime):
+            record['game_date'] = record['game_date'].isoformat()
+
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._seq += 1
+            record['seq'] = self._seq
+            record['journal_id'] = f'{self._session}:{self._seq}'
+            record['_queued_at'] = time.time()
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            if hold:
+                record['_held'] = True
+            self._pending.append(record)
+            self.metrics['appended_rows'] += 1
+            pending_count = len(self._pending)
+            seq = self._seq
+
+        if pending_count >= self.batch_size:
+            self._wakeup.set()
+        if sync:
+            self.sync(seq)
+        return seq
+
+    def sync(self, seq: int):
+        """
+        ``seq`` dahil tüm kayıtları diske indir
+
+        fsync'i yapan çağıran o ana kadar eklenmiş her kaydı kapsar; bu
+        sırada bekleyenler kendi kayıtları zaten diskteyse fsync yapmaz.
+        """
+        if self.fsync:
+            self._sync(seq)
+
+    def _sync(self, seq: int):
+        """``fsync`` ayarından bağımsız group-commit fsync (flush öncesi de kullanılır)"""
+        with self._sync_lock:
+            if self._durable_seq >= seq:
+                return
+            with self._lock:
+                if self._file is None:
+                    return
+                target = self._seq
+                fileno = self._file.fileno()
+            os.fsync(fileno)
+            self._durable_seq = target
+            self.metrics['fsyncs'] += 1
+
+    def release(self, seqs: List[int]):
+        """Bekletilen kayıtları flush'a bırak (bakiye commit'i başarılı)"""
+        seqs = set(seqs)
+        with self._lock:
+            for record in self._pending:
+                if record['seq'] in seqs:
+                    record.pop('_held', None)
+
+    def discard(self, seqs: List[int]):
+        """Bekletilen kayıtları iptal et (bakiye commit'i başarısız)"""
+        if not seqs:
+            return
+        seqs = set(seqs)
+        with self._lock:
+            self._pending = [record for record in self._pending if record['seq'] not in seqs]
+            if self._file is None:
+                return
+            self._file.write(json.dumps({'discard': sorted(seqs)}) + '\n')
+            self._file.flush()
+            target = self._seq
+        self.sync(target)
+
+    def hold(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Kayıtları bakiye commit'inden önce journal'a ekle ve diske indir
+
+        Kayıtlar ``release`` (commit başarılı) veya ``discard`` (commit
+        başarısız) çağrılana kadar flush edilmez.
+
+        Returns:
+            Kayıtların sıra numaraları
+        """
+        seqs = [self.append(record, sync=False, hold=True) for record in records]
+        if seqs:
+            self.sync(seqs[-1])
+        return seqs
+
+    def _run(self):
+        """Flush döngüsü"""
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f'Journal flush döngüsü hatası: {e}')
+
+    def flush(self) -> int:
+        """
+        Bekleyen kayıtları toplu olarak veritabanına yaz
+
+        Toplu iş kuyruğun başından ilk bekletilen kayda kadar alınır. fsync
+        ``_lock`` dışında yapılır; flush sürerken eklemeler beklemez.
+
+        Returns:
+            Yazılan kayıt sayısı
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = []
+                for record in self._pending[:self.batch_size]:
+                    if record.get('_held'):
+                        break
+                    batch.append(record)
+            if not batch:
+                return 0
+            # Veritabanına yazılan kayıtlar journal'da da diskte olmalı
+            self._sync(batch[-1]['seq'])
+
+            rows = []
+            for record in batch:
+                row = {k: v for k, v in record.items() if k not in ('seq', '_queued_at', '_held')}
+                row['game_date'] = datetime.fromisoformat(row['game_date'])
+                # Kimliksiz eski journal kayıtları
+                row.setdefault('journal_id', f'{self._session}:{record["seq"]}')
+                rows.append(row)
+
+            started = time.time()
+            try:
+                with self.app.app_context():
+                    self.writer(rows)
+            except Exception as e:
+                self.metrics['failed_flushes'] += 1
+                self._consecutive_failures += 1
+                logger.error(f'Journal flush hatası ({len(rows)} kayıt bekliyor): {e}')
+                if self._consecutive_failures < self.max_failures:
+                    return 0
+                done = self._write_one_by_one(rows)
+                if done == 0:
+                    return 0
+                batch = batch[:done]
+            self._consecutive_failures = 0
+
+            finished = time.time()
+            last_seq = batch[-1]['seq']
+            lag_ms = (finished - batch[0]['_queued_at']) * 1000
+
+            self._write_checkpoint(last_seq)
+            with self._lock:
+                del self._pending[:len(batch)]
+                if not self._pending and self._file is not None:
+                    # Her şey yazıldı - journal'ı sıfırla
+                    self._file.truncate(0)
+
+            self.metrics['flushed_rows'] += len(batch)
+            self.metrics['flush_count'] += 1
+            self.metrics['last_flush_ms'] = (finished - started) * 1000
+            self.metrics['last_flush_lag_ms'] = lag_ms
+            self.metrics['max_flush_lag_ms'] = max(self.metrics['max_flush_lag_ms'], lag_ms)
+
+            logger.debug(f'Journal flush: {len(batch)} kayıt, gecikme {lag_ms:.0f} ms')
+            return len(batch)
+
+    def flush_all(self) -> int:
+        """
+        Kuyruk boşalana (veya yazma ilerlemeyene) kadar flush et
+
+        Returns:
+            Yazılan toplam kayıt sayısı
+        """
+        total = 0
+        while True:
+            written = self.flush()
+            if written == 0:
+                return total
+            total += written
+
+    def _write_one_by_one(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Başarısız toplu işi satır satır yaz, veri hatası verenleri ayır
+
+        Returns:
+            İşlenen (yazılan veya dead-letter'a taşınan) baştaki satır sayısı
+        """
+        done = 0
+        for row in rows:
+            try:
+                with self.app.app_context():
+                    self.writer([row])
+            except (IntegrityError, DataError) as e:
+                self._dead_letter(row, e)
+            except Exception as e:
+                # Veritabanı erişilemiyor - kalanlar kuyrukta beklesin
+                logger.error(f'Journal satırı yazılamadı, tekrar denenecek: {e}')
+                break
+            done += 1
+        return done
+
+    def _dead_letter(self, row: Dict[str, Any], error: Exception):
+        """Yazılamayan satırı hata mesajıyla dead-letter dosyasına ekle"""
+        record = dict(row, game_date=row['game_date'].isoformat(),
+                      error=str(error).splitlines()[0], failed_at=datetime.utcnow().isoformat())
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.metrics['dead_lettered_rows'] += 1
+        logger.error(f"Journal satırı dead-letter dosyasına taşındı ({record['journal_id']}): {record['error']}")
+
+    @contextmanager
+    def flush_paused(self):
+        """
+        Blok süresince flush yapılmasın
+
+        İçeride okunan veritabanı toplamları ile ``pending_totals`` aynı
+        anı gösterir: bir kayıt ya yalnızca veritabanında ya da yalnızca
+        kuyrukta sayılır.
+        """
+        with self._flush_lock:
+            yield
+
+    def pending_totals(self, day) -> Dict[str, Any]:
+        """
+        Kuyrukta bekleyen (henüz özet tablolarına yazılmamış) sonuçların toplamı
+
+        Args:
+            day: ``today_*`` alanları için gün (date)
+
+        Returns:
+            ``total_games``/``total_bets``/``total_winnings`` ve ``today_*`` karşılıkları
+        """
+        day_prefix = day.isoformat()
+        totals = dict.fromkeys(('total_games', 'total_bets', 'total_winnings',
+                                'today_games', 'today_bets', 'today_winnings'), 0)
+        with self._lock:
+            for record in self._pending:
+                if record.get('_held'):
+                    # Bakiye commit'i henüz yapılmadı
+                    continue
+                totals['total_games'] += 1
+                totals['total_bets'] += record['bet_amount']
+                totals['total_winnings'] += record['winnings']
+                if record['game_date'].startswith(day_prefix):
+                    totals['today_games'] += 1
+                    totals['today_bets'] += record['bet_amount']
+                    totals['today_winnings'] += record['winnings']
+        return totals
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Flush gecikmesi ve kuyruk metriklerini getir"""
+        with self._lock:
+            pending = len(self._pending)
+            oldest = self._pending[0]['_queued_at'] if self._pending else None
+
+        metrics = dict(self.metrics)
+        metrics['pending_rows'] = pending
+        metrics['oldest_pending_age_ms'] = (time.time() - oldest) * 1000 if oldest else 0.0
+        return metrics
+
+
+_claimed_slot_files = []
+
+
+def claim_journal_path(path: str, max_slots: int = 64) -> str:
+    """
+    Bu süreç için boşta bir journal yuvası al
+
+    Çok worker'lı çalışmada her worker kendi journal dosyasını kullanmalıdır.
+    Yuvalar ``<path>``, ``<path>.1``, ``<path>.2`` ... şeklindedir ve
+    ``.lock`` dosyası üzerindeki flock ile süreç ömrü boyunca tutulur.
+    Yeniden başlatmada aynı yuvalar tekrar alınır, böylece önceki
+    worker'ların yazılmamış kayıtları da ``replay`` ile işlenir.
+    """
+    import fcntl
+
+    for slot in range(max_slots):
+        slot_path = path if slot == 0 else f'{path}.{slot}'
+        lock_file = open(f'{slot_path}.lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        _claimed_slot_files.append(lock_file)
+        return slot_path
+
+    raise RuntimeError(f'Boşta journal yuvası yok ({max_slots} yuva dolu): {path}')
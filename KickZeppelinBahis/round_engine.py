@@ -0,0 +1,247 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RoundEngine:
+    """
+    Tur bazlı crash oyun motoru
+
+    Bahis penceresi açılır, gelen bahisler bellekte toplanır, pencere
+    kapanınca tek bir crash noktası çekilir ve turdaki tüm bahisler tek
+    geçişte sonuçlandırılır. Veritabanı yazımı ve yayın tur başına bir kez
+    yapılır.
+
+    Paylaşılan bir ``store`` verilirse çok worker'lı çalışır: tur döngüsünü
+    yalnızca liderlik kilidini tutan worker yürütür, tur durumu store'a
+    yazılır ve diğer worker'lardaki bahisler store'daki kuyruğa eklenir.
+    Lider tur kapanışında kuyruğu boşaltıp hepsini birlikte sonuçlandırır.
+    """
+
+    STATE_KEY = 'round_state'
+    BETS_KEY = 'round_bets'
+    LEADER_LOCK = 'round_leader'
+
+    def __init__(self, app, game, db_manager, emit: Callable[..., Any],
+                 betting_seconds: float = 10.0, cooldown_seconds: float = 3.0,
+                 sleep: Callable[[float], Any] = time.sleep,
+                 store=None, instance_id: Optional[str] = None, settle_grace: float = 0.2):
+        """
+        Args:
+            app: Flask uygulaması (sonuçlandırma için app context)
+            game: ZeppelinGame örneği (crash noktası üretimi)
+            db_manager: DatabaseManager örneği (toplu sonuçlandırma)
+            emit: Socket.IO emit fonksiyonu
+            betting_seconds: Bahis penceresi süresi
+            cooldown_seconds: Turlar arası bekleme
+            sleep: Uyku fonksiyonu (eventlet altında socketio.sleep)
+            store: Paylaşılan durum store'u (çok worker'lı mod için)
+            instance_id: Liderlik kilidi için bu worker'ın kimliği
+            settle_grace: Kapanışta geç gelen kuyruk yazıları için bekleme (sn)
+        """
+        self.app = app
+        self.game = game
+        self.db_manager = db_manager
+        self.emit = emit
+        self.betting_seconds = betting_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.sleep = sleep
+        self.store = store if store is not None and store.shared else None
+        self.instance_id = instance_id or f'{id(self):x}'
+        self.settle_grace = settle_grace
+
+        self._lock = threading.Lock()
+        self._round_id = 0
+        self._status = 'waiting'
+        self._closes_at = None
+        self._bets: List[Dict[str, Any]] = []
+        self._last_crash_point = None
+        self._running = False
+
+    def get_state(self) -> Dict[str, Any]:
+        """Mevcut tur durumunu getir"""
+        if self.store:
+            return self.store.get(self.STATE_KEY) or self._local_state()
+        return self._local_state()
+
+    def _local_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'round_id': self._round_id,
+                'status': self._status,
+                'closes_at': self._closes_at,
+                'bet_count': len(self._bets),
+                'last_crash_point': self._last_crash_point
+            }
+
+    def _publish_state(self):
+        """Lider worker'da tur durumunu store'a yaz"""
+        if self.store:
+            self.store.set(self.STATE_KEY, self._local_state())
+
+    def open_round(self) -> int:
+        """Yeni tur aç ve bahis kabul etmeye başla"""
+        with self._lock:
+            if self.store:
+                # Lider değişse de tur numaraları artmaya devam etsin
+                shared = self.store.get(self.STATE_KEY) or {}
+                self._round_id = max(self._round_id, shared.get('round_id', 0))
+            self._round_id += 1
+            self._status = 'betting'
+            self._closes_at = time.time() + self.betting_seconds
+            self._bets = []
+            round_id = self._round_id
+
+        self._publish_state()
+        logger.info(f'Tur #{round_id} açıldı')
+        self.emit('round_started', self.get_state(), room='game_room')
+        return round_id
+
+    def place_bet(self, username: str, bet_amount: float, target_multiplier: float,
+                  sid: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Açık tura bahis ekle
+
+        Bakiye kontrolü tur kapanışında toplu yapılır; burada yalnızca
+        bahis penceresinin açık olduğu kontrol edilir.
+        """
+        bet = {
+            'username': username.lower().strip(),
+            'bet_amount': bet_amount,
+            'target_multiplier': target_multiplier,
+            'sid': sid
+        }
+
+        if self.store:
+            state = self.get_state()
+            if state['status'] != 'betting':
+                return {'success': False, 'reason': 'betting_closed', 'round_id': state['round_id']}
+            bet['round_id'] = state['round_id']
+            self.store.push(self.BETS_KEY, bet)
+            return {'success': True, 'round_id': state['round_id'], 'closes_at': state['closes_at']}
+
+        with self._lock:
+            if self._status != 'betting':
+                return {'success': False, 'reason': 'betting_closed', 'round_id': self._round_id}
+
+            self._bets.append(bet)
+            return {'success': True, 'round_id': self._round_id, 'closes_at': self._closes_at}
+
+    def close_round(self) -> Dict[str, Any]:
+        """
+        Turu kapat, crash noktasını çek ve tüm bahisleri sonuçlandır
+
+        Returns:
+            Tur sonucu (yayınlanan payload)
+        """
+        with self._lock:
+            self._status = 'settling'
+            round_id = self._round_id
+            bets = self._bets
+            self._bets = []
+
+        if self.store:
+            self._publish_state()
+            # Durumu 'betting' olarak okuyup henüz kuyruğa yazmamış worker'ları bekle
+            self.sleep(self.settle_grace)
+            for bet in self.store.drain(self.BETS_KEY):
+                if bet.pop('round_id', None) == round_id:
+                    bets.append(bet)
+                elif bet.get('sid'):
+                    self.emit('bet_error', {
+                        'message': f'❌ {bet["username"]}, bahisler kapandı! Sonraki turu bekle.',
+                        'timestamp': time.strftime('%H:%M:%S')
+                    }, to=bet['sid'])
+
+        round_info = self.game.draw_round()
+        crash_point = round_info['crash_point']
+
+        # Tüm bahisleri tek geçişte değerlendir
+        targets = [bet['target_multiplier'] for bet in bets]
+        won = [target <= crash_point for target in targets]
+        winnings = [bet['bet_amount'] * target if hit else 0
+                    for bet, target, hit in zip(bets, targets, won)]
+        for bet, hit, payout in zip(bets, won, winnings):
+            bet['actual_multiplier'] = crash_point
+            bet['won'] = hit
+            bet['winnings'] = payout
+
+        settled = []
+        if bets:
+            with self.app.app_context():
+                settled = self.db_manager.settle_round(bets)
+
+        results = []
+        for bet in settled:
+            if bet['accepted']:
+                results.append({
+                    'username': bet['username'],
+                    'bet_amount': bet['bet_amount'],
+                    'target_multiplier': bet['target_multiplier'],
+                    'won': bet['won'],
+                    'winnings': bet['winnings'],
+                    'new_balance': bet['new_balance']
+                })
+            elif bet.get('sid'):
+                self.emit('bet_error', {
+                    'message': self._rejection_message(bet),
+                    'timestamp': time.strftime('%H:%M:%S')
+                }, to=bet['sid'])
+
+        with self._lock:
+            self._status = 'crashed'
+            self._closes_at = None
+            self._last_crash_point = crash_point
+        self._publish_state()
+
+        payload = {
+            'round_id': round_id,
+            'crash_point': crash_point,
+            'round_hash': round_info.get('hash'),
+            'bet_count': len(results),
+            'winner_count': sum(1 for r in results if r['won']),
+            'total_bets': sum(r['bet_amount'] for r in results),
+            'total_winnings': sum(r['winnings'] for r in results),
+            'results': results,
+            'timestamp': time.strftime('%H:%M:%S')
+        }
+        self.emit('round_result', payload, room='game_room')
+
+        logger.info(f'Tur #{round_id} kapandı: {crash_point:.2f}x, {len(results)} bahis')
+        return payload
+
+    def _rejection_message(self, bet: Dict[str, Any]) -> str:
+        """Reddedilen bahis için kullanıcı mesajı"""
+        username = bet['username']
+        if bet['reason'] == 'user_not_found':
+            return f'❌ {username}, önce takip etmelisin!'
+        if bet['reason'] == 'insufficient_balance':
+            return f'❌ {username}, yeterli bakiyen yok! Mevcut: {bet["balance"]:.0f}'
+        return f'❌ {username}, bahis işlenirken hata oluştu!'
+
+    def run(self):
+        """Tur döngüsü (arka plan görevi olarak çalışır)"""
+        self._running = True
+        logger.info(f'Tur motoru başlatıldı - bahis penceresi {self.betting_seconds} sn')
+
+        while self._running:
+            if self.store and not self.store.acquire_lock(
+                    self.LEADER_LOCK, self.instance_id,
+                    ttl=self.betting_seconds + self.cooldown_seconds + 10):
+                # Başka bir worker lider; kilidin boşalmasını bekle
+                self.sleep(1.0)
+                continue
+            try:
+                self.open_round()
+                self.sleep(self.betting_seconds)
+                self.close_round()
+            except Exception as e:
+                logger.error(f'Tur motoru hatası: {e}')
+            self.sleep(self.cooldown_seconds)
+
+    def stop(self):
+        """Tur döngüsünü durdur"""
+        self._running = False
@@ -19,6 +19,13 @@ setup(
         "python-socketio>=5.10.0",
         "eventlet>=0.33.3"
     ],
+    extras_require={
+        "simulation": ["numpy>=1.26.0"],
+        "multiworker": ["redis>=5.0.0"],
+        "chat": ["websockets>=12.0"],
+        "async": ["aiohttp>=3.9.0"],
+        "test": ["pytest>=8.0"]
+    },
     python_requires=">=3.11",
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, List, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """
+    Worker'lar arasında paylaşılan oyun durumu
+
+    Değerler JSON olarak saklanır. Çok süreçli modda tur durumu, açık
+    turun bahis kuyruğu, tur liderliği kilidi ve admin ayarları burada
+    tutulur. ``MemoryStateStore`` tek süreç içindir; ``SQLiteStateStore``
+    aynı makinedeki süreçler (CI/geliştirme) için, ``RedisStateStore``
+    üretim içindir.
+    """
+
+    shared = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def push(self, key: str, value: Any):
+        """Listenin sonuna ekle"""
+        raise NotImplementedError
+
+    def drain(self, key: str) -> List[Any]:
+        """Listeyi atomik olarak boşalt ve içeriğini döndür"""
+        raise NotImplementedError
+
+    def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        """Kilidi al veya sahibiyse süresini uzat"""
+        raise NotImplementedError
+
+    def watch(self, key: str, callback: Callable[[Any], Any], interval: float = 1.0):
+        """
+        Anahtar değiştikçe callback'i çağıran arka plan thread'i başlat
+
+        Başka bir worker'da yapılan ayar değişikliklerini bu worker'a taşır.
+        """
+        def run():
+            last = self.get(key)
+            while True:
+                time.sleep(interval)
+                try:
+                    value = self.get(key)
+                    if value is not None and value != last:
+                        last = value
+                        callback(value)
+                except Exception as e:
+                    logger.error(f'Paylaşılan durum izleme hatası ({key}): {e}')
+
+        threading.Thread(target=run, name=f'watch-{key}', daemon=True).start()
+
+
+class MemoryStateStore(StateStore):
+    """Tek süreçlik bellek içi store (varsayılan)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._locks: Dict[str, tuple] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._values.get(key)
+            return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._values[key] = json.dumps(value)
+
+    def push(self, key: str, value: Any):
+        with self._lock:
+            self._values.setdefault(f'list:{key}', []).append(value)
+
+    def drain(self, key: str) -> List[Any]:
+        with self._lock:
+            return self._values.pop(f'list:{key}', [])
+
+    def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._locks.get(name)
+            if holder is None or holder[0] == owner or holder[1] < now:
+                self._locks[name] = (owner, now + ttl)
+                return True
+            return False
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite dosyası üzerinden süreçler arası store
+
+    Aynı makinedeki worker'lar için Redis'siz çalışan bir alternatiftir
+    (CI ve yerel çok-worker denemeleri).
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS list_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_list_items_key ON list_items (key, id);
+            CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+        ''')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute('SELECT value FROM kv WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any):
+        self._conn().execute(
+            'INSERT INTO kv (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            (key, json.dumps(value))
+        )
+
+    def push(self, key: str, value: Any):
+        self._conn().execute('INSERT INTO list_items (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    def drain(self, key: str) -> List[Any]:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT value FROM list_items WHERE key = ? ORDER BY id', (key,)).fetchall()
+            conn.execute('DELETE FROM list_items WHERE key = ?', (key,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [json.loads(row[0]) for row in rows]
+
+    def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            'INSERT INTO locks (name, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE locks.owner = excluded.owner OR locks.expires_at < ?',
+            (name, owner, now + ttl, now)
+        )
+        row = conn.execute('SELECT owner FROM locks WHERE name = ?', (name,)).fetchone()
+        return row is not None and row[0] == owner
+
+
+class RedisStateStore(StateStore):
+    """Redis üzerinden store (üretim çok-worker modu)"""
+
+    shared = True
+
+    _RENEW_SCRIPT = '''
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('pexpire', KEYS[1], ARGV[2])
+        end
+        return 0
+    '''
+
+    def __init__(self, url: str, prefix: str = 'zeppelin:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError('Redis store için redis paketi gerekli: pip install redis') from e
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._renew = self.client.register_script(self._RENEW_SCRIPT)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any):
+        self.client.set(self.prefix + key, json.dumps(value))
+
+    def push(self, key: str, value: Any):
+        self.client.rpush(self.prefix + 'list:' + key, json.dumps(value))
+
+    def drain(self, key: str) -> List[Any]:
+        list_key = self.prefix + 'list:' + key
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(list_key, 0, -1)
+        pipe.delete(list_key)
+        values, _ = pipe.execute()
+        return [json.loads(value) for value in values]
+
+    def acquire_lock(self, name: str, owner: str, ttl: float) -> bool:
+        lock_key = self.prefix + 'lock:' + name
+        ttl_ms = int(ttl * 1000)
+        if self.client.set(lock_key, owner, nx=True, px=ttl_ms):
+            return True
+        return bool(self._renew(keys=[lock_key], args=[owner, ttl_ms]))
+
+
+def create_state_store(url: Optional[str]) -> StateStore:
+    """
+    URL'ye göre store oluştur
+
+    Args:
+        url: ``redis://...``, ``sqlite:///yol/state.db`` veya boş (bellek içi)
+    """
+    if not url:
+        return MemoryStateStore()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisStateStore(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteStateStore(url[len('sqlite:///'):])
+    raise ValueError(f'Desteklenmeyen paylaşılan durum adresi: {url}')
+
+
+def instance_id() -> str:
+    """Bu worker sürecinin kimliği"""
+    return f'{os.uname().nodename}:{os.getpid()}'
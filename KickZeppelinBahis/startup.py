@@ -0,0 +1,100 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTasks:
+    """
+    Açılış görevlerini import yolunun dışında çalıştıran ısınma yöneticisi
+
+    Görevler eklendikleri sırayla arka planda çalışır. Zorunlu görevler
+    (tablolar, journal replay, istatistik yükleme) başarılı olana kadar
+    üstel beklemeyle tekrar denenir; hepsi bitince uygulama hazır sayılır.
+    Zorunlu olmayan görevler (Kick girişi, tur motoru) hazır olduktan
+    sonra çalışır ve hataları hazır olma durumunu etkilemez.
+    """
+
+    def __init__(self, retry_delay: float = 1.0, max_retry_delay: float = 30.0):
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._created_at = time.perf_counter()
+        self._ready = threading.Event()
+        self._ready_after_ms: Optional[float] = None
+        self._tasks: List[tuple] = []
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._started = False
+
+    def add(self, name: str, fn: Callable[[], Any], required: bool = True):
+        """Görev ekle (``start``'tan önce)"""
+        self._tasks.append((name, fn, required))
+        self._status[name] = {'state': 'pending', 'required': required}
+
+    def start(self, spawn: Callable[[Callable], Any] = None):
+        """
+        Görevleri arka planda başlat
+
+        Args:
+            spawn: Arka plan görevi başlatıcı (ör. socketio.start_background_task)
+        """
+        if self._started:
+            return
+        self._started = True
+        if spawn:
+            spawn(self.run)
+        else:
+            threading.Thread(target=self.run, name='startup', daemon=True).start()
+
+    def run(self):
+        """Zorunlu görevleri, ardından diğerlerini çalıştır"""
+        for name, fn, required in self._tasks:
+            if required:
+                self._run_task(name, fn, retry=True)
+
+        self._ready_after_ms = (time.perf_counter() - self._created_at) * 1000
+        self._ready.set()
+        logger.info(f'Uygulama hazır - {self._ready_after_ms:.0f} ms')
+
+        for name, fn, required in self._tasks:
+            if not required:
+                self._run_task(name, fn, retry=False)
+
+    def _run_task(self, name: str, fn: Callable[[], Any], retry: bool):
+        status = self._status[name]
+        delay = self.retry_delay
+        attempts = 0
+        while True:
+            attempts += 1
+            status.update(state='running', attempts=attempts)
+            started = time.perf_counter()
+            try:
+                fn()
+                status.update(state='done', duration_ms=round((time.perf_counter() - started) * 1000, 2))
+                status.pop('error', None)
+                return
+            except Exception as e:
+                status.update(state='failed', error=str(e))
+                logger.error(f'Açılış görevi başarısız ({name}, deneme {attempts}): {e}')
+                if not retry:
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+    def is_ready(self) -> bool:
+        """Zorunlu görevler tamamlandı mı"""
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Hazır olana kadar bekle"""
+        return self._ready.wait(timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Hazır olma durumu ve görev süreleri"""
+        return {
+            'ready': self.is_ready(),
+            'ready_after_ms': round(self._ready_after_ms, 2) if self._ready_after_ms is not None else None,
+            'uptime_ms': round((time.perf_counter() - self._created_at) * 1000, 2),
+            'tasks': {name: dict(status) for name, status in self._status.items()}
+        }
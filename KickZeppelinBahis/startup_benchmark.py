@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Zeppelin Betting Game - Açılış Süresi Ölçümü
+Uygulamayı ayrı süreçte başlatıp üç süreyi ölçer:
+    import   - ``import app`` süresi (modül yükleme)
+    serving  - süreç başlangıcından ilk HTTP yanıtına kadar (/ready, 503 olsa bile)
+    ready    - /ready'nin 200 döndüğü ana kadar (tablolar, journal, istatistikler)
+
+Örnek:
+    python startup_benchmark.py --runs 5
+    python startup_benchmark.py --database-url postgresql://... --json
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+CHILD = '''
+import time, sys
+started = time.perf_counter()
+from app import app, socketio
+print("IMPORT_MS", (time.perf_counter() - started) * 1000, flush=True)
+socketio.run(app, host="127.0.0.1", port=int(sys.argv[1]), debug=False,
+             use_reloader=False, log_output=False, allow_unsafe_werkzeug=True)
+'''
+
+
+def free_port() -> int:
+    """Boş bir TCP portu bul"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def probe(url: str) -> int:
+    """/ready durum kodu; bağlantı yoksa 0"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return 0
+
+
+def measure(database_url: str, timeout: float) -> dict:
+    """Tek bir soğuk açılışı ölç"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url,
+               RESULT_JOURNAL_PATH=os.path.join(tempfile.mkdtemp(), 'bench.journal'))
+    started = time.perf_counter()
+    child = subprocess.Popen([sys.executable, '-c', CHILD, str(port)], env=env,
+                             cwd=os.path.dirname(os.path.abspath(__file__)),
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    url = f'http://127.0.0.1:{port}/ready'
+    result = {'import_ms': None, 'serving_ms': None, 'ready_ms': None}
+    try:
+        result['import_ms'] = round(float(child.stdout.readline().split()[1]), 2)
+        while time.perf_counter() - started < timeout:
+            status = probe(url)
+            elapsed = round((time.perf_counter() - started) * 1000, 2)
+            if status and result['serving_ms'] is None:
+                result['serving_ms'] = elapsed
+            if status == 200:
+                result['ready_ms'] = elapsed
+                break
+            time.sleep(0.01)
+    finally:
+        child.terminate()
+        child.wait(5)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zeppelin açılış süresi ölçümü')
+    parser.add_argument('--runs', type=int, default=3, help='Ölçülecek soğuk açılış sayısı')
+    parser.add_argument('--database-url', help='Veritabanı (varsayılan: her çalıştırmada yeni SQLite)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Açılış başına en uzun bekleme')
+    parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yazdır')
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        database_url = args.database_url or f'sqlite:///{tempfile.mkdtemp()}/startup_bench.db'
+        runs.append(measure(database_url, args.timeout))
+
+    def median(key):
+        values = [run[key] for run in runs if run[key] is not None]
+        return round(statistics.median(values), 2) if values else None
+
+    report = {
+        'runs': runs,
+        'median_import_ms': median('import_ms'),
+        'median_serving_ms': median('serving_ms'),
+        'median_ready_ms': median('ready_ms')
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print('⏱️ Zeppelin açılış süresi')
+        print('=' * 50)
+        for index, run in enumerate(runs, 1):
+            print(f"#{index}  import: {run['import_ms']} ms  serving: {run['serving_ms']} ms  ready: {run['ready_ms']} ms")
+        print(f"Medyan  import: {report['median_import_ms']} ms  serving: {report['median_serving_ms']} ms  "
+              f"ready: {report['median_ready_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
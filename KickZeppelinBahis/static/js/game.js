@@ -1,7 +1,7 @@
 // Zeppelin Yayın Oyunu JavaScript
 
-// Socket.IO bağlantısı
-const socket = io();
+// Socket.IO bağlantısı - yalnızca WebSocket: çok worker'lı sunucuda bağlantı tek worker'da kalır
+const socket = io({ transports: ['websocket'] });
 
 // Game state
 let gameState = {
@@ -230,6 +230,7 @@ socket.on('game_result', function(data) {
         <div class="small">
             ${data.message}
         </div>
+        ${fairLink(data.round_hash, data.actual_multiplier)}
     `;
     
     addMessage(resultHtml, resultClass, true);
@@ -246,6 +247,142 @@ socket.on('game_result', function(data) {
     }
 });
 
+// Provably-fair doğrulama bağlantısı (hash'in ilk karakterleri gösterilir)
+function fairLink(roundHash, crashPoint) {
+    if (!roundHash) return '';
+    const url = `/api/provably-fair/verify?hash=${encodeURIComponent(roundHash)}&crash_point=${crashPoint}`;
+    return `<div class="small text-muted"><i class="bi bi-shield-check me-1"></i>` +
+        `<a href="${url}" target="_blank" class="text-muted" title="${roundHash}">${roundHash.slice(0, 12)}…</a></div>`;
+}
+
+// Toplu sonuç frame'leri
+// Satır: [username, bet_amount, target_multiplier, actual_multiplier, won, winnings, new_balance, round_hash]
+const MAX_PENDING_BATCHES = 10;
+let pendingBatches = [];
+let pendingSkipped = 0;
+
+// Sekme gizliyken requestAnimationFrame çalışmaz; kuyruk büyümesin diye
+// eski frame'ler yalnızca sayı olarak tutulur
+socket.on('game_results_batch', function(batch) {
+    pendingBatches.push(batch);
+    if (pendingBatches.length > MAX_PENDING_BATCHES) {
+        const oldest = pendingBatches.shift();
+        pendingSkipped += oldest.summary.count;
+    }
+    if (pendingBatches.length === 1) {
+        requestAnimationFrame(renderPendingBatches);
+    }
+});
+
+// İstemci geride kaldıysa yalnızca en son frame çizilir, öncekiler özetlenir
+function renderPendingBatches() {
+    const batches = pendingBatches;
+    const skippedEarlier = pendingSkipped;
+    pendingBatches = [];
+    pendingSkipped = 0;
+    if (!batches.length) return;
+
+    const latest = batches[batches.length - 1];
+    const skipped = skippedEarlier + batches.slice(0, -1).reduce((sum, batch) => sum + batch.summary.count, 0) + latest.dropped;
+
+    if (skipped > 0) {
+        addMessage(`
+            <div class="d-flex align-items-center">
+                <i class="bi bi-lightning-charge me-2"></i>
+                <span>${skipped} sonuç daha işlendi</span>
+            </div>
+        `, 'info', true);
+    }
+
+    latest.results.forEach(renderResultRow);
+
+    const last = latest.results[latest.results.length - 1];
+    if (last) {
+        animateZeppelin(last[3], last[4] === 1);
+    }
+}
+
+function renderResultRow(row) {
+    const [username, betAmount, targetMultiplier, actualMultiplier, won, winnings, newBalance, roundHash] = row;
+    const isWin = won === 1;
+    const resultClass = isWin ? 'success' : 'danger';
+    const icon = isWin ? 'bi-trophy' : 'bi-x-circle';
+    const message = isWin
+        ? `🎉 ${username}, ${actualMultiplier.toFixed(2)}x ile kazandın! +${winnings.toFixed(0)} puan. Yeni bakiye: ${newBalance.toFixed(0)}`
+        : `💥 ${username}, ${actualMultiplier.toFixed(2)}x'de patladı! Kaybettin. Yeni bakiye: ${newBalance.toFixed(0)}`;
+
+    addMessage(`
+        <div class="d-flex align-items-center mb-2">
+            <i class="bi ${icon} me-2 text-${resultClass}"></i>
+            <strong>${username}</strong>
+            <span class="badge bg-secondary ms-2">${betAmount} puan</span>
+            <span class="badge bg-info ms-1">${targetMultiplier}x hedef</span>
+            <span class="badge bg-${resultClass} ms-auto">${actualMultiplier.toFixed(2)}x</span>
+        </div>
+        <div class="small">
+            ${message}
+        </div>
+        ${fairLink(roundHash, actualMultiplier)}
+    `, resultClass, true);
+
+    updateRecentResults(actualMultiplier, isWin);
+
+    if (isWin && winnings > 1000) {
+        showBigWinAnimation(username, winnings);
+    }
+}
+
+// Tur modu: yeni tur açıldı
+socket.on('round_started', function(data) {
+    const seconds = data.closes_at ? Math.max(0, Math.round(data.closes_at - Date.now() / 1000)) : 0;
+    addMessage(`
+        <div class="d-flex align-items-center">
+            <i class="bi bi-hourglass-split me-2"></i>
+            <strong>Tur #${data.round_id}</strong>&nbsp;bahisleri açıldı
+            <span class="badge bg-info ms-auto">${seconds} sn</span>
+        </div>
+    `, 'info', true);
+});
+
+// Tur modu: bahis tura alındı
+socket.on('bet_accepted', function(data) {
+    addMessage(data.message, 'info');
+});
+
+// Tur modu: turdaki tüm bahislerin sonucu tek mesajda gelir
+socket.on('round_result', function(data) {
+    const crashText = data.crash_point.toFixed(2) + 'x';
+    const rows = data.results.slice(0, 20).map(r => `
+        <div class="d-flex align-items-center small">
+            <i class="bi ${r.won ? 'bi-trophy text-success' : 'bi-x-circle text-danger'} me-2"></i>
+            <strong>${r.username}</strong>
+            <span class="badge bg-secondary ms-2">${r.bet_amount} puan</span>
+            <span class="badge bg-info ms-1">${r.target_multiplier}x hedef</span>
+            <span class="ms-auto">${r.won ? '+' + r.winnings.toFixed(0) : '-' + r.bet_amount.toFixed(0)}</span>
+        </div>
+    `).join('');
+    const more = data.results.length > 20 ? `<div class="small text-muted">+${data.results.length - 20} bahis daha</div>` : '';
+
+    addMessage(`
+        <div class="d-flex align-items-center mb-2">
+            <i class="bi bi-rocket-takeoff me-2"></i>
+            <strong>Tur #${data.round_id}</strong>
+            <span class="badge bg-secondary ms-2">${data.bet_count} bahis</span>
+            <span class="badge bg-success ms-1">${data.winner_count} kazanan</span>
+            <span class="badge bg-warning ms-auto">${crashText}</span>
+        </div>
+        ${rows}${more}
+        ${fairLink(data.round_hash, data.crash_point)}
+    `, data.winner_count > 0 ? 'success' : 'danger', true);
+
+    animateZeppelin(data.crash_point, data.winner_count > 0);
+    updateRecentResults(data.crash_point, data.winner_count > 0);
+
+    data.results.filter(r => r.won && r.winnings > 1000).slice(0, 1).forEach(r => {
+        showBigWinAnimation(r.username, r.winnings);
+    });
+});
+
 // Büyük kazanç animasyonu
 function showBigWinAnimation(username, winnings) {
     const overlay = document.createElement('div');
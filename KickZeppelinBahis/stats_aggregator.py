@@ -0,0 +1,193 @@
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StatsAggregator:
+    """
+    Bellekte tutulan oyun istatistikleri
+
+    Açılışta veritabanından bir kez yüklenir, sonra her bahis, kayıt ve
+    bakiye değişikliğinde artımlı olarak güncellenir. /api/stats ve /admin
+    toplamları O(1) okur. ``reconcile`` gerçek agregasyonlarla karşılaştırıp
+    olası sapmayı düzeltir; sorgu lock dışında çalışır ve sorgu sürerken
+    sayaçlar değiştiyse (nesil numarası) sonuç uygulanmadan tekrar denenir,
+    böylece bahisler ne bekler ne de iki kez sayılır. ``loader`` henüz
+    veritabanına yazılmamış (journal'da bekleyen) sonuçları da saymalıdır;
+    aksi halde uzlaştırma toplamları düşürür ve sahte sapma raporlar.
+
+    Çok worker'lı çalışmada diğer worker'ların bahisleri bu sürecin
+    sayaçlarına yansımaz; ``max_age`` verilirse bu süreden eski özet
+    okunurken veritabanından yenilenir.
+    """
+
+    FIELDS = (
+        'total_users', 'active_users', 'total_balance',
+        'total_games', 'total_bets', 'total_winnings',
+        'today_games', 'today_bets', 'today_winnings'
+    )
+
+    def __init__(self, loader: Callable[[], Dict[str, Any]], max_age: float = 0.0):
+        """
+        Args:
+            loader: Gerçek toplamları veritabanından hesaplayan fonksiyon
+            max_age: Özetin en fazla yaşı (saniye, 0 = yalnızca uzlaştırmada yenilenir)
+        """
+        self.loader = loader
+        self.max_age = max_age
+        self.seeded = False
+        self._lock = threading.Lock()
+        self._values = {field: 0 for field in self.FIELDS}
+        self._generation = 0
+        self._today = datetime.utcnow().date()
+        self._loaded_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def seed(self):
+        """Toplamları veritabanından yükle"""
+        fresh = self.loader()
+        with self._lock:
+            self._replace(fresh)
+            self.seeded = True
+        logger.info('İstatistik özeti veritabanından yüklendi')
+
+    def reconcile(self, log_drift: bool = True, attempts: int = 3) -> Dict[str, float]:
+        """
+        Toplamları gerçek agregasyonlarla karşılaştır ve düzelt
+
+        Args:
+            log_drift: Sapma uyarı olarak loglansın mı
+            attempts: Sorgu sırasında sayaçlar değişirse en fazla deneme sayısı
+
+        Returns:
+            Alan başına düzeltilen sapma (sapma yoksa veya uygulanamadıysa boş)
+        """
+        for _ in range(attempts):
+            with self._lock:
+                generation = self._generation
+            fresh = self.loader()
+            with self._lock:
+                if self._generation != generation:
+                    # Sorgu sırasında gelen olay sonuçta olabilir de olmayabilir de
+                    continue
+                drift = {
+                    field: fresh[field] - self._values[field]
+                    for field in self.FIELDS
+                    if abs(fresh[field] - self._values[field]) > 1e-6
+                }
+                self._replace(fresh)
+                self.seeded = True
+            break
+        else:
+            logger.debug('İstatistik uzlaştırması atlandı: sorgu sırasında sayaçlar değişti')
+            return {}
+
+        if drift and log_drift:
+            logger.warning(f'İstatistik sapması düzeltildi: {drift}')
+        return drift
+
+    def _replace(self, values: Dict[str, Any]):
+        for field in self.FIELDS:
+            self._values[field] = values.get(field, 0)
+        self._today = datetime.utcnow().date()
+        self._loaded_at = time.monotonic()
+
+    def _roll_day(self):
+        """Gün değiştiyse günlük sayaçları sıfırla (lock altında çağrılır)"""
+        today = datetime.utcnow().date()
+        if today != self._today:
+            self._today = today
+            self._values['today_games'] = 0
+            self._values['today_bets'] = 0
+            self._values['today_winnings'] = 0
+
+    def _apply_balance(self, old_balance: float, new_balance: float):
+        """Bakiye değişikliğini uygula (lock altında çağrılır)"""
+        # Her olay buradan geçer; reconcile sorgu sırasındaki değişikliği bununla görür
+        self._generation += 1
+        self._values['total_balance'] += new_balance - old_balance
+        if old_balance <= 0 < new_balance:
+            self._values['active_users'] += 1
+        elif new_balance <= 0 < old_balance:
+            self._values['active_users'] -= 1
+
+    def on_user_registered(self, balance: float):
+        """Yeni kullanıcı kaydı"""
+        with self._lock:
+            self._values['total_users'] += 1
+            self._apply_balance(0, balance)
+
+    def on_user_deleted(self, balance: float):
+        """Kullanıcı silindi"""
+        with self._lock:
+            self._values['total_users'] -= 1
+            self._apply_balance(balance, 0)
+
+    def on_balance_changed(self, old_balance: float, new_balance: float):
+        """Admin veya manuel bakiye değişikliği"""
+        with self._lock:
+            self._apply_balance(old_balance, new_balance)
+
+    def on_bet_settled(self, bet_amount: float, winnings: float,
+                       old_balance: float, new_balance: float, games: int = 1):
+        """Sonuçlanmış bahis"""
+        with self._lock:
+            self._roll_day()
+            self._values['total_games'] += games
+            self._values['total_bets'] += bet_amount
+            self._values['total_winnings'] += winnings
+            self._values['today_games'] += games
+            self._values['today_bets'] += bet_amount
+            self._values['today_winnings'] += winnings
+            self._apply_balance(old_balance, new_balance)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Güncel toplamların kopyasını getir"""
+        if (self.max_age and time.monotonic() - self._loaded_at > self.max_age
+                and self._refresh_lock.acquire(blocking=False)):
+            # Aynı anda yalnızca bir istek yeniler, diğerleri mevcut özeti okur
+            try:
+                self.reconcile(log_drift=False)
+            except Exception as e:
+                logger.error(f'İstatistik özeti yenilenemedi: {e}')
+            finally:
+                self._refresh_lock.release()
+        with self._lock:
+            self._roll_day()
+            return dict(self._values)
+
+    def start_reconciler(self, app, interval: float = 300.0,
+                         before: Optional[Callable[[], Any]] = None):
+        """
+        Periyodik uzlaştırma thread'ini başlat
+
+        Args:
+            app: Flask uygulaması (app context için)
+            interval: Uzlaştırma aralığı (saniye)
+            before: Uzlaştırmadan önce çağrılacak fonksiyon (ör. journal flush)
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stopped.wait(interval):
+                try:
+                    if before:
+                        before()
+                    with app.app_context():
+                        self.reconcile()
+                except Exception as e:
+                    logger.error(f'İstatistik uzlaştırma hatası: {e}')
+
+        self._thread = threading.Thread(target=run, name='stats-reconciler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Uzlaştırma thread'ini durdur"""
+        self._stopped.set()
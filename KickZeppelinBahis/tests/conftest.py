@@ -0,0 +1,33 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from models import db
+from migrations import run_migrations
+
+
+def _migrated_engine(url: str):
+    engine = create_engine(url)
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """Migration'ları uygulanmış geçici SQLite veritabanı"""
+    engine = _migrated_engine(f'sqlite:///{tmp_path / "test.db"}')
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_engine():
+    """``TEST_POSTGRES_URL`` ile verilen (boş, test için ayrılmış) PostgreSQL veritabanı"""
+    url = os.environ.get('TEST_POSTGRES_URL')
+    if not url:
+        pytest.skip('TEST_POSTGRES_URL tanımlı değil')
+    engine = _migrated_engine(url)
+    yield engine
+    engine.dispose()
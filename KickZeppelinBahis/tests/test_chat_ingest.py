@@ -0,0 +1,190 @@
+import time
+import socket
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip('websockets')
+
+from chat_ingest import ChatIngestPipeline
+from fake_chat_server import FakeChatServer
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def command_trace(size: int = 5000):
+    """Her mesajı sırasını taşıyan komut olan iz"""
+    return [{'username': f'chat_{i % 7}', 'content': f'!bet 1 {i}'} for i in range(size)]
+
+
+def parse(content, username):
+    return {'username': username, 'index': int(content.split()[-1])}
+
+
+class ServerThread:
+    """FakeChatServer'ı kendi event loop'unda çalıştırır"""
+
+    def __init__(self, trace, rate: float, port: int):
+        self.server = FakeChatServer(trace, rate, port=port)
+        self.loop = asyncio.new_event_loop()
+        self._task = None
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self.thread.start()
+        assert ready.wait(5), 'sahte sunucu başlamadı'
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self._task = self.loop.create_task(self.server.serve(ready))
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self._task.cancel)
+        self.thread.join(5)
+
+
+@pytest.fixture
+def port():
+    return free_port()
+
+
+@pytest.fixture
+def serve(port):
+    servers = []
+
+    def start(rate: float, trace=None):
+        server = ServerThread(trace or command_trace(), rate, port)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        if server.thread.is_alive():
+            server.stop()
+
+
+def make_pipeline(port, handler, **kwargs):
+    kwargs.setdefault('reconnect_delay', 0.05)
+    return ChatIngestPipeline(f'ws://127.0.0.1:{port}', parse, handler, **kwargs)
+
+
+def test_connects_and_processes_commands(serve, port):
+    serve(rate=200, trace=[{'username': 'ali', 'content': 'selam'}, {'username': 'ali', 'content': '!bet 1 1'}])
+    handled = []
+    pipeline = make_pipeline(port, handled.append)
+    pipeline.start()
+    try:
+        assert wait_for(lambda: len(handled) >= 10)
+    finally:
+        pipeline.stop()
+
+    metrics = pipeline.get_metrics()
+    assert handled[0] == {'username': 'ali', 'index': 1}
+    # Sohbet mesajları ve bağlantı frame'i kuyruğa girmez
+    assert metrics['ignored'] >= metrics['processed']
+    assert metrics['dropped'] == 0
+    assert metrics['failed'] == 0
+
+
+def test_delivery_is_paced_at_server_rate(serve, port):
+    server = serve(rate=100)
+    handled = []
+    pipeline = make_pipeline(port, handled.append)
+    pipeline.start()
+    try:
+        assert wait_for(lambda: handled)
+        started, count = time.monotonic(), len(handled)
+        time.sleep(1.0)
+        elapsed, delivered = time.monotonic() - started, len(handled) - count
+    finally:
+        pipeline.stop()
+
+    assert 0.6 * 100 * elapsed <= delivered <= 1.4 * 100 * elapsed
+    # Sıra korunur ve hiçbir mesaj atlanmaz
+    indexes = [command['index'] for command in handled]
+    assert indexes == list(range(len(indexes)))
+    assert server.server.sent >= len(handled)
+
+
+def slow_pipeline(port, policy):
+    handled = []
+
+    def handler(command):
+        time.sleep(0.02)
+        handled.append(command['index'])
+
+    return make_pipeline(port, handler, queue_size=5, workers=1, drop_policy=policy), handled
+
+
+def test_drop_newest_keeps_oldest_commands_under_backpressure(serve, port):
+    serve(rate=1000)
+    pipeline, handled = slow_pipeline(port, 'drop_newest')
+    pipeline.start()
+    try:
+        assert wait_for(lambda: pipeline.get_metrics()['dropped'] > 100)
+    finally:
+        pipeline.stop()
+
+    metrics = pipeline.get_metrics()
+    assert metrics['max_queue_depth'] <= 5
+    assert handled[:3] == [0, 1, 2]
+    assert handled == sorted(handled)
+    # Kuyruktakiler durdurulurken işlenir
+    assert metrics['processed'] == metrics['enqueued'] == len(handled)
+
+
+def test_drop_oldest_keeps_newest_commands_under_backpressure(serve, port):
+    serve(rate=1000)
+    pipeline, handled = slow_pipeline(port, 'drop_oldest')
+    pipeline.start()
+    try:
+        assert wait_for(lambda: pipeline.get_metrics()['dropped'] > 100)
+    finally:
+        pipeline.stop()
+
+    metrics = pipeline.get_metrics()
+    assert metrics['max_queue_depth'] <= 5
+    assert handled == sorted(handled)
+    # Son gelen komut atılmaz; her komut bir kez kuyruğa girer
+    assert handled[-1] == metrics['enqueued'] - 1
+    assert metrics['processed'] + metrics['dropped'] == metrics['enqueued']
+
+
+def test_reconnects_after_server_restart(serve, port):
+    first = serve(rate=200)
+    handled = []
+    pipeline = make_pipeline(port, handled.append)
+    pipeline.start()
+    try:
+        assert wait_for(lambda: len(handled) >= 5)
+        first.stop()
+        assert wait_for(lambda: pipeline.get_metrics()['reconnects'] >= 1)
+
+        serve(rate=200)
+        before = len(handled)
+        assert wait_for(lambda: len(handled) >= before + 5)
+    finally:
+        pipeline.stop()
+
+    # Yeni bağlantıda iz baştan oynatılır
+    assert 0 in [command['index'] for command in handled[before:]]
+    assert pipeline.is_running() is False
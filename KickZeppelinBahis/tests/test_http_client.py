@@ -0,0 +1,149 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import CircuitBreaker, CircuitOpenError, PooledHTTPClient, RetryPolicy
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests += 1
+        status, delay = self.server.script.pop(0) if self.server.script else (200, 0)
+        if delay:
+            time.sleep(delay)
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    """Yanıtları ``script`` listesinden ``(durum, gecikme)`` olarak veren HTTP sunucusu"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.script, server.requests, server.connections = [], 0, 0
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/api'
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(**kwargs):
+    kwargs.setdefault('retry', RetryPolicy(max_retries=3, backoff_base=0.01, backoff_max=0.02))
+    return PooledHTTPClient(**kwargs)
+
+
+def test_retries_server_errors_until_success(stub):
+    stub.script = [(503, 0), (500, 0)]
+    client = make_client()
+
+    response = client.get(stub.url)
+
+    assert response.status_code == 200
+    assert stub.requests == 3
+    assert client.get_metrics()['retries'] == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_returns_last_server_error_when_retries_run_out(stub):
+    stub.script = [(502, 0)] * 4
+    client = make_client()
+
+    assert client.get(stub.url).status_code == 502
+    assert stub.requests == 4
+    assert client.get_metrics()['failures'] == 1
+
+
+def test_retries_read_timeout(stub):
+    stub.script = [(200, 0.5)]
+    client = make_client(read_timeout=0.1)
+
+    response = client.get(stub.url)
+
+    assert response.status_code == 200
+    assert client.get_metrics()['retries'] == 1
+
+
+def test_budget_stops_timeouts(stub):
+    stub.script = [(200, 0.5)] * 5
+    client = make_client(read_timeout=0.2, budget=0.3)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get(stub.url)
+    assert client.get_metrics()['attempts'] <= 2
+
+
+@pytest.mark.parametrize('status', [400, 401, 404])
+def test_client_errors_are_not_retried(stub, status):
+    stub.script = [(status, 0)]
+    client = make_client()
+
+    assert client.get(stub.url).status_code == status
+    assert stub.requests == 1
+    assert client.get_metrics()['retries'] == 0
+    # 4xx uç noktanın sağlıklı olduğunu gösterir; devreyi açmaz
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_half_opens_and_closes(stub):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    client = make_client(retry=RetryPolicy(max_retries=0), breaker=breaker)
+
+    stub.script = [(503, 0), (503, 0)]
+    client.get(stub.url)
+    assert breaker.state == CircuitBreaker.CLOSED
+    client.get(stub.url)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Açıkken istek sunucuya gitmez
+    with pytest.raises(CircuitOpenError):
+        client.get(stub.url)
+    assert stub.requests == 2
+    assert client.get_metrics()['short_circuited'] == 1
+
+    time.sleep(0.25)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.get(stub.url).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens_breaker(stub):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    client = make_client(retry=RetryPolicy(max_retries=0), breaker=breaker)
+
+    stub.script = [(503, 0), (503, 0)]
+    client.get(stub.url)
+    time.sleep(0.25)
+    client.get(stub.url)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        client.get(stub.url)
+
+
+def test_connections_are_reused(stub):
+    client = make_client()
+
+    for _ in range(20):
+        assert client.get(stub.url).status_code == 200
+
+    assert stub.requests == 20
+    assert stub.connections == 1
+    assert client.connections_opened() == 1
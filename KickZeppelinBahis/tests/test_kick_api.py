@@ -0,0 +1,33 @@
+import time
+import threading
+
+from kick_api import KickAPI
+
+
+def test_channel_info_does_not_wait_for_login(monkeypatch):
+    api = KickAPI()
+    release = threading.Event()
+
+    def slow_login():
+        release.wait(5)
+        api.mock_mode = True
+
+    monkeypatch.setattr(api, '_get_access_token', slow_login)
+
+    started = time.perf_counter()
+    info = api.get_channel_info()
+    assert time.perf_counter() - started < 0.5
+    assert info['channel_id'] == api.channel_id
+    assert api._auth_thread.is_alive()
+
+    release.set()
+    api._auth_thread.join(5)
+    assert api._authenticated
+
+
+def test_channel_info_serves_cached_entry_before_login(monkeypatch):
+    api = KickAPI()
+    monkeypatch.setattr(api, 'authenticate_in_background', lambda: None)
+    api.channel_cache._entries['zeppelin'] = (time.monotonic(), {'channel_id': 'zeppelin', 'name': 'önbellek'})
+
+    assert api.get_channel_info('zeppelin')['name'] == 'önbellek'
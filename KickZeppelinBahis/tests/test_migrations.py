@@ -0,0 +1,105 @@
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from models import db, User, GameResult
+from migrations import PARTITION_MIGRATION, applied_versions, partition_game_results, run_migrations
+from partitions import GameResultPartitions
+
+
+def test_partition_migration_does_not_run_on_boot(sqlite_engine):
+    assert PARTITION_MIGRATION[0] not in applied_versions(sqlite_engine)
+    assert partition_game_results(sqlite_engine) is False
+
+
+@pytest.fixture
+def pg_schema_engine():
+    """``TEST_POSTGRES_URL`` veritabanında geçici şemaya bağlı, migration'ları uygulanmış engine"""
+    url = os.environ.get('TEST_POSTGRES_URL')
+    if not url:
+        pytest.skip('TEST_POSTGRES_URL tanımlı değil')
+    schema = f'migration_test_{uuid.uuid4().hex[:8]}'
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.exec_driver_sql(f'CREATE SCHEMA {schema}')
+
+    engine = create_engine(url)
+
+    @event.listens_for(engine, 'connect')
+    def set_search_path(dbapi_connection, record):
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f'SET search_path TO {schema}')
+
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.exec_driver_sql(f'DROP SCHEMA {schema} CASCADE')
+    admin.dispose()
+
+
+def _insert_results(engine, count):
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(username=f'u{uuid.uuid4().hex[:6]}', balance=100)
+                               .returning(User.id)).scalar()
+        conn.execute(insert(GameResult), [{
+            'user_id': user_id, 'bet_amount': 1, 'target_multiplier': 2, 'actual_multiplier': 1,
+            'won': False, 'winnings': 0, 'game_date': datetime.utcnow()
+        } for _ in range(count)])
+
+
+def _bound_constraints(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT count(*) FROM pg_constraint WHERE conname = 'game_results_legacy_bound'"
+            " AND connamespace = current_schema()::text::regnamespace"
+        )).scalar()
+
+
+def _relkind(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = CAST('game_results' AS regclass)")).scalar()
+
+
+def test_postgres_partition_conversion(pg_schema_engine):
+    engine = pg_schema_engine
+    _insert_results(engine, 50)
+    assert _relkind(engine) == 'r'
+
+    assert partition_game_results(engine, lock_timeout='2s') is True
+
+    assert _relkind(engine) == 'p'
+    assert PARTITION_MIGRATION[0] in applied_versions(engine)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(GameResult.__table__)).scalar() == 50
+    # Geçici bölüm sınırı kısıtı kalmaz
+    assert _bound_constraints(engine) == 0
+
+    # Yeni satırlar ve bölüm bakımı dönüşümden sonra çalışır
+    _insert_results(engine, 5)
+    assert GameResultPartitions(months_ahead=2).maintain(engine)['created']
+    assert partition_game_results(engine) is False
+
+
+def test_postgres_partition_conversion_gives_up_on_lock_timeout(pg_schema_engine):
+    engine = pg_schema_engine
+    _insert_results(engine, 5)
+
+    holder = engine.connect()
+    transaction = holder.begin()
+    holder.exec_driver_sql('LOCK TABLE game_results IN ACCESS SHARE MODE')
+    try:
+        with pytest.raises(OperationalError, match='lock timeout'):
+            partition_game_results(engine, lock_timeout='200ms')
+    finally:
+        transaction.rollback()
+        holder.close()
+
+    assert _relkind(engine) == 'r'
+    assert PARTITION_MIGRATION[0] not in applied_versions(engine)
+    assert _bound_constraints(engine) == 0
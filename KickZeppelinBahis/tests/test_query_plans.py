@@ -0,0 +1,21 @@
+import pytest
+
+from migrations import PLAN_CHECKS, assert_query_plans, check_query_plans
+
+
+def test_postgres_query_plans_use_indexes(postgres_engine):
+    assert_query_plans(postgres_engine)
+
+
+@pytest.mark.parametrize('name, index, build', PLAN_CHECKS, ids=[check[0] for check in PLAN_CHECKS])
+def test_sqlite_plan_names_expected_index(sqlite_engine, name, index, build):
+    [result] = check_query_plans(sqlite_engine, [(name, index, build)])
+    assert result['used'], result['plan']
+
+
+def test_missing_index_is_reported(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX ix_game_results_game_date')
+    results = {result['name']: result for result in check_query_plans(sqlite_engine)}
+    assert not results['recent_games']['used']
+    assert results['delete_user_results']['used']
@@ -0,0 +1,111 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class UserCache:
+    """
+    Kullanıcı durumu için sınırlı LRU + TTL önbellek
+
+    Anahtar normalize edilmiş kullanıcı adıdır. Kayıtlı olmayan kullanıcılar
+    da (negatif kayıt) önbelleğe alınır, böylece takip etmeyen izleyicilerin
+    chat komutları veritabanına gitmez. Dönen değerler kopyadır.
+
+    ``max_size`` 0 ise önbellek kapalıdır: ``get`` her zaman ``MISS`` döner,
+    yazmalar yok sayılır (çok worker'lı çalışmada diğer worker'ların
+    yazdığı bakiyeler eski görünmesin diye).
+    """
+
+    MISS = object()
+    _MISSING = object()
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        """
+        Args:
+            max_size: En fazla tutulacak kullanıcı sayısı (0 = kapalı)
+            ttl: Kayıt ömrü (saniye)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = max_size > 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str):
+        """
+        Önbellekten kullanıcı getir
+
+        Returns:
+            Kullanıcı dict'i, kayıtlı olmadığı biliniyorsa None, önbellekte
+            yoksa ``UserCache.MISS``
+        """
+        if not self.enabled:
+            return self.MISS
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return self.MISS
+            self._entries.move_to_end(username)
+            self.hits += 1
+            value = entry[1]
+        return None if value is self._MISSING else dict(value)
+
+    def put(self, username: str, user: Optional[Dict[str, Any]]):
+        """Kullanıcıyı (veya yokluğunu) önbelleğe yaz"""
+        if not self.enabled:
+            return
+        value = self._MISSING if user is None else dict(user)
+        with self._lock:
+            self._entries[username] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def update(self, username: str, **changes):
+        """
+        Önbellekteki kullanıcıya yazma-geçişli değişiklik uygula
+
+        Değerler mutlak atanır; ``*_delta`` ile biten anahtarlar mevcut
+        değere eklenir. Kullanıcı önbellekte yoksa bir şey yapılmaz.
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[1] is self._MISSING:
+                return
+            user = entry[1]
+            for key, value in changes.items():
+                if key.endswith('_delta'):
+                    field = key[:-len('_delta')]
+                    user[field] = user.get(field, 0) + value
+                else:
+                    user[key] = value
+
+    def invalidate(self, username: str):
+        """Kullanıcıyı önbellekten çıkar"""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        """Tüm önbelleği temizle"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Önbellek isabet metrikleri"""
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
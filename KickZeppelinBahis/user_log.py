@@ -0,0 +1,274 @@
+import os
+import json
+import mmap
+import time
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UserLogStore:
+    """
+    Kullanıcı verileri için log-structured depo
+
+    Her değişiklik ``<path>.log`` dosyasına tek bir JSON satırı olarak
+    eklenir (yalnızca değişen alanlar); dosya baştan yazılmaz. fsync
+    gruplar halinde yapılır: eşzamanlı yazanlardan ilk gelen diskten
+    sorumlu olur, diğerleri aynı fsync'i paylaşır. ``synchronous=False``
+    ise yazma hemen döner ve arka plan thread'i her ``fsync_interval_ms``
+    milisaniyede bir fsync yapar.
+
+    Log ``snapshot_every`` kayda ulaşınca sıkıştırılır: mevcut durum
+    ``<path>.snap`` dosyasına (başlık + kullanıcı başına bir satır) yazılır
+    ve eski log silinir. Açılışta snapshot mmap ile okunur, ardından
+    snapshot'tan sonraki log kayıtları sırayla uygulanır.
+    """
+
+    def __init__(self, path: str, synchronous: bool = True, fsync_interval_ms: int = 50,
+                 snapshot_every: int = 10000):
+        """
+        Args:
+            path: Taban dosya yolu (``.log`` ve ``.snap`` eklenir)
+            synchronous: Yazma, kaydı fsync edilene kadar beklesin mi
+            fsync_interval_ms: Arka plan fsync ve sıkıştırma kontrol aralığı (ms)
+            snapshot_every: Bu kadar log kaydından sonra snapshot alınır
+        """
+        self.log_path = f'{path}.log'
+        self.snapshot_path = f'{path}.snap'
+        self.synchronous = synchronous
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self.snapshot_every = snapshot_every
+
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._file = None
+        self._seq = 0
+        self._durable_seq = 0
+        self._log_records = 0
+        self._capture = None
+
+        self.metrics = {
+            'appended': 0,
+            'fsyncs': 0,
+            'snapshots': 0,
+            'replayed': 0,
+            'last_snapshot_ms': 0.0,
+            'last_load_ms': 0.0
+        }
+
+    def exists(self) -> bool:
+        """Diskte snapshot veya log var mı"""
+        return any(os.path.exists(p) for p in (self.snapshot_path, self.log_path, f'{self.log_path}.1'))
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Durumu snapshot + log'dan kur ve log'u yazmaya aç
+
+        Returns:
+            Kullanıcı adı → kullanıcı verisi
+        """
+        started = time.perf_counter()
+        users: Dict[str, Dict[str, Any]] = {}
+        snapshot_seq = self._load_snapshot(users)
+        last_seq = snapshot_seq
+        replayed = 0
+
+        # .log.1: sıkıştırma sırasında çöken sürecin döndürülmüş log'u
+        for path in (f'{self.log_path}.1', self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Çökme sırasında yarım kalmış son satır
+                        logger.warning('Kullanıcı log\'unda bozuk satır atlandı')
+                        continue
+                    if record['s'] <= snapshot_seq:
+                        continue
+                    self._apply(users, record)
+                    last_seq = max(last_seq, record['s'])
+                    replayed += 1
+
+        with self._lock:
+            self._seq = self._durable_seq = last_seq
+            self._log_records = replayed
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+
+        self.metrics['replayed'] = replayed
+        self.metrics['last_load_ms'] = (time.perf_counter() - started) * 1000
+        logger.info(f'{len(users)} kullanıcı log\'dan yüklendi ({replayed} kayıt tekrar oynatıldı, '
+                    f'{self.metrics["last_load_ms"]:.0f} ms)')
+        return users
+
+    def _load_snapshot(self, users: Dict[str, Dict[str, Any]]) -> int:
+        """Snapshot'ı mmap ile satır satır oku; snapshot sıra numarasını döndür"""
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header = json.loads(mm.readline())
+                for line in iter(mm.readline, b''):
+                    username, data = json.loads(line)
+                    users[username] = data
+        return header['seq']
+
+    @staticmethod
+    def _apply(users: Dict[str, Dict[str, Any]], record: Dict[str, Any]):
+        username, fields = record['u'], record['d']
+        if fields is None:
+            users.pop(username, None)
+        else:
+            users.setdefault(username, {}).update(fields)
+
+    def start(self):
+        """Arka plan fsync / sıkıştırma thread'ini başlat"""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='user-log', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Thread'i durdur, bekleyen kayıtları diske yaz ve log'u kapat"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _run(self):
+        while not self._stopped.wait(self.fsync_interval):
+            try:
+                self.sync()
+                if self._capture is not None and self.needs_compaction():
+                    self.compact(self._capture)
+            except Exception as e:
+                logger.error(f'Kullanıcı log\'u arka plan hatası: {e}')
+
+    def attach(self, capture: Callable[[], Tuple[Dict[str, Dict[str, Any]], int]]):
+        """Arka plan sıkıştırması için durum yakalayıcıyı bağla (bkz. ``compact``)"""
+        self._capture = capture
+
+    def needs_compaction(self) -> bool:
+        return self._log_records >= self.snapshot_every
+
+    def put(self, username: str, fields: Dict[str, Any]) -> int:
+        """
+        Kullanıcının değişen alanlarını log'a ekle
+
+        Returns:
+            Kaydın sıra numarası (``commit`` için)
+        """
+        return self._append({'u': username, 'd': fields})
+
+    def delete(self, username: str) -> int:
+        """Kullanıcı silme kaydı ekle"""
+        return self._append({'u': username, 'd': None})
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.log_path, 'a', encoding='utf-8')
+            self._seq += 1
+            record['s'] = seq = self._seq
+            # Süreç çökse bile satır işletim sistemine ulaşsın; fsync gruplanır
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._file.flush()
+            self._log_records += 1
+            self.metrics['appended'] += 1
+        return seq
+
+    def commit(self, seq: int):
+        """Senkron modda ``seq`` diske yazılana kadar bekle (çağıranın kilidi dışında çağrılmalı)"""
+        if self.synchronous:
+            self.sync(seq)
+
+    def sync(self, seq: Optional[int] = None):
+        """
+        ``seq``'e kadar olan kayıtların diske yazıldığından emin ol
+
+        Beklerken başka bir yazan fsync yaptıysa tekrar fsync yapılmaz.
+        """
+        with self._sync_lock:
+            with self._lock:
+                target = self._seq
+                file = self._file
+            if (seq if seq is not None else target) <= self._durable_seq:
+                return
+            if file is not None:
+                os.fsync(file.fileno())
+            self._durable_seq = target
+            self.metrics['fsyncs'] += 1
+
+    def rotate(self) -> int:
+        """
+        Log'u döndür: yeni kayıtlar boş bir log'a gider
+
+        Returns:
+            Döndürülen log'daki son sıra numarası
+        """
+        with self._sync_lock, self._lock:
+            seq = self._seq
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+            self._durable_seq = seq
+            if os.path.exists(self.log_path):
+                os.replace(self.log_path, f'{self.log_path}.1')
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+            self._log_records = 0
+            return seq
+
+    def compact(self, capture: Callable[[], Tuple[Dict[str, Dict[str, Any]], int]]):
+        """
+        Mevcut durumu snapshot'a yaz ve eski log'u sil
+
+        Args:
+            capture: Yazanları durdurup durumun kopyasını ve ``rotate()``
+                sonucunu birlikte döndüren fonksiyon; snapshot bu ikisi
+                tutarlı olduğu için kilitsiz yazılabilir
+        """
+        with self._snapshot_lock:
+            started = time.perf_counter()
+            users, snapshot_seq = capture()
+
+            tmp_path = f'{self.snapshot_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'seq': snapshot_seq, 'users': len(users)}) + '\n')
+                for username, data in users.items():
+                    f.write(json.dumps([username, data], ensure_ascii=False, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            if os.path.exists(f'{self.log_path}.1'):
+                os.remove(f'{self.log_path}.1')
+
+            self.metrics['snapshots'] += 1
+            self.metrics['last_snapshot_ms'] = (time.perf_counter() - started) * 1000
+            logger.debug(f'Kullanıcı snapshot\'ı yazıldı: {len(users)} kullanıcı, '
+                         f'{self.metrics["last_snapshot_ms"]:.0f} ms')
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Log ve fsync metrikleri"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['seq'] = self._seq
+            metrics['log_records'] = self._log_records
+        metrics['durable_seq'] = self._durable_seq
+        return metrics
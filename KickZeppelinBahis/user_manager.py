@@ -1,17 +1,81 @@
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
 from datetime import datetime
 
+from user_log import UserLogStore
+from leaderboard import Leaderboard
+
 logger = logging.getLogger(__name__)
 
 class UserManager:
     """Kullanıcı yönetimi ve bakiye sistemi"""
     
-    def __init__(self, data_file: str = 'kullanicilar.json'):
+    def __init__(self, data_file: str = 'kullanicilar.json', store: Optional[UserLogStore] = None):
+        """
+        Args:
+            data_file: JSON kullanıcı dosyası
+            store: Log-structured depo; verilirse her değişiklik dosyanın
+                tamamı yerine tek log kaydı olarak yazılır. İlk açılışta
+                ``data_file`` varsa içeriği ilk snapshot olarak alınır.
+        """
         self.data_file = data_file
-        self.users = self._load_users()
+        self.store = store
+        self._lock = threading.RLock()
+        if store is None:
+            self.users = self._load_users()
+        else:
+            self.users = self._load_from_store()
+        self.leaderboard = Leaderboard()
+        self.leaderboard.seed(
+            (username, data['balance']) for username, data in self.users.items()
+            if isinstance(data, dict) and 'balance' in data
+        )
+    
+    def _load_from_store(self) -> Dict[str, Any]:
+        """Kullanıcıları log'dan yükle (gerekirse JSON dosyasından içe aktar)"""
+        if not self.store.exists() and os.path.exists(self.data_file):
+            self.users = self._load_users()
+            self.store.load()
+            self.store.compact(self._capture)
+            logger.info(f'{self.data_file} log-structured depoya aktarıldı')
+        else:
+            self.users = self.store.load()
+        self.store.attach(self._capture)
+        self.store.start()
+        return self.users
+    
+    def _capture(self) -> Tuple[Dict[str, Any], int]:
+        """Snapshot için durumun kopyası ve log'un döndürüldüğü sıra numarası"""
+        with self._lock:
+            users = {username: dict(data) for username, data in self.users.items()}
+            return users, self.store.rotate()
+    
+    def _persist(self, username: str, fields: Optional[Dict[str, Any]] = None, deleted: bool = False):
+        """
+        Değişikliği kaydet (kilit altında çağrılır)
+        
+        Log modunda yalnızca değişen alanlar eklenir ve dönen sıra numarası
+        ``_commit`` ile diske yazılır; JSON modunda dosya yeniden yazılır.
+        """
+        if self.store is None:
+            self._save_users()
+            return None
+        if deleted:
+            return self.store.delete(username)
+        return self.store.put(username, fields)
+    
+    def _commit(self, seq: Optional[int]):
+        """Log kaydının fsync'ini kilidin dışında bekle (eşzamanlı yazanlar tek fsync'i paylaşır)"""
+        if seq is not None:
+            self.store.commit(seq)
+    
+    def close(self):
+        """Log'u diske yazıp kapat"""
+        if self.store is not None:
+            self.store.stop()
     
     def _load_users(self) -> Dict[str, Any]:
         """Kullanıcı verilerini dosyadan yükle"""
@@ -53,11 +117,13 @@ class UserManager:
         try:
             username = username.lower().strip()
             
-            if username in self.users:
+            with self._lock:
+                existing = self.users.get(username)
+            if existing is not None:
                 return {
                     'success': True,
-                    'message': f'🔄 {username} zaten kayıtlı! Mevcut bakiye: {self.users[username]["balance"]:.0f}',
-                    'balance': self.users[username]['balance'],
+                    'message': f'🔄 {username} zaten kayıtlı! Mevcut bakiye: {existing["balance"]:.0f}',
+                    'balance': existing['balance'],
                     'existing': True
                 }
             
@@ -75,8 +141,11 @@ class UserManager:
                 'subscriber_count_at_registration': subscriber_count
             }
             
-            self.users[username] = user_data
-            self._save_users()
+            with self._lock:
+                self.users[username] = user_data
+                seq = self._persist(username, user_data)
+                self.leaderboard.update(username, initial_balance)
+            self._commit(seq)
             
             if initial_balance > 0:
                 message = f'🎉 {username} 100+ abone ile katıldı! {initial_balance} puan verildi.'
@@ -108,59 +177,88 @@ class UserManager:
     def update_user_activity(self, username: str):
         """Kullanıcı aktivitesini güncelle"""
         username = username.lower().strip()
-        if username in self.users:
-            self.users[username]['last_activity'] = datetime.now().isoformat()
-            self._save_users()
+        with self._lock:
+            if username not in self.users:
+                return
+            seq = self._persist(username, self._touch(username))
+        self._commit(seq)
+    
+    def _touch(self, username: str) -> Dict[str, Any]:
+        """Son aktiviteyi güncelle (kaydetmeden); değişen alanı döndür"""
+        self.users[username]['last_activity'] = datetime.now().isoformat()
+        return {'last_activity': self.users[username]['last_activity']}
+    
+    def _change(self, username: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """
+        Alanları güncelle, aktiviteyi işaretle ve tek kayıt olarak kaydet
+        
+        Args:
+            update: Mevcut kullanıcıdan değişecek alanları hesaplayan fonksiyon
+        
+        Returns:
+            (önceki, güncel) kullanıcı verisi; kullanıcı yoksa (None, None)
+        """
+        with self._lock:
+            user = self.users.get(username)
+            if user is None:
+                return None, None
+            previous = dict(user)
+            fields = update(user)
+            user.update(fields)
+            seq = self._persist(username, dict(fields, **self._touch(username)))
+            self.leaderboard.update(username, user['balance'])
+            current = dict(user)
+        self._commit(seq)
+        return previous, current
     
     def add_balance(self, username: str, amount: float) -> float:
         """Kullanıcı bakiyesine puan ekle"""
         username = username.lower().strip()
-        if username in self.users:
-            self.users[username]['balance'] += amount
-            self.users[username]['total_winnings'] += amount
-            self.update_user_activity(username)
-            self._save_users()
-            logger.debug(f'{username} bakiyesine {amount} eklendi')
-            return self.users[username]['balance']
-        return 0
+        _, user = self._change(username, lambda u: {
+            'balance': u['balance'] + amount,
+            'total_winnings': u['total_winnings'] + amount
+        })
+        if user is None:
+            return 0
+        logger.debug(f'{username} bakiyesine {amount} eklendi')
+        return user['balance']
     
     def subtract_balance(self, username: str, amount: float) -> float:
         """Kullanıcı bakiyesinden puan düş"""
         username = username.lower().strip()
-        if username in self.users:
-            self.users[username]['balance'] -= amount
-            self.users[username]['total_bets'] += amount
-            self.users[username]['games_played'] += 1
-            self.update_user_activity(username)
-            self._save_users()
-            logger.debug(f'{username} bakiyesinden {amount} düşüldü')
-            return self.users[username]['balance']
-        return 0
+        _, user = self._change(username, lambda u: {
+            'balance': u['balance'] - amount,
+            'total_bets': u['total_bets'] + amount,
+            'games_played': u['games_played'] + 1
+        })
+        if user is None:
+            return 0
+        logger.debug(f'{username} bakiyesinden {amount} düşüldü')
+        return user['balance']
     
     def set_balance(self, username: str, amount: float) -> float:
         """Kullanıcı bakiyesini belirle (admin fonksiyonu)"""
         username = username.lower().strip()
-        if username in self.users:
-            old_balance = self.users[username]['balance']
-            self.users[username]['balance'] = amount
-            self.update_user_activity(username)
-            self._save_users()
-            logger.info(f'{username} bakiyesi {old_balance} -> {amount} olarak değiştirildi')
-            return amount
-        return 0
+        previous, user = self._change(username, lambda u: {'balance': amount})
+        if user is None:
+            return 0
+        logger.info(f'{username} bakiyesi {previous["balance"]} -> {amount} olarak değiştirildi')
+        return amount
     
     def get_all_users(self) -> Dict[str, Any]:
         """Tüm kullanıcıları getir"""
-        return self.users.copy()
+        with self._lock:
+            return self.users.copy()
     
     def get_top_users(self, limit: int = 10) -> list:
         """En yüksek bakiyeli kullanıcıları getir"""
-        sorted_users = sorted(
-            self.users.items(),
-            key=lambda x: x[1]['balance'],
-            reverse=True
-        )
-        return sorted_users[:limit]
+        with self._lock:
+            return [(entry['username'], self.users[entry['username']])
+                    for entry in self.leaderboard.top(limit)]
+    
+    def get_user_rank(self, username: str) -> Optional[Dict[str, Any]]:
+        """Kullanıcının sıralamadaki yeri (yoksa None)"""
+        return self.leaderboard.rank(username.lower().strip())
     
     def get_user_count(self) -> int:
         """Toplam kullanıcı sayısını getir"""
@@ -169,9 +267,12 @@ class UserManager:
     def delete_user(self, username: str) -> bool:
         """Kullanıcıyı sil (admin fonksiyonu)"""
         username = username.lower().strip()
-        if username in self.users:
+        with self._lock:
+            if username not in self.users:
+                return False
             del self.users[username]
-            self._save_users()
-            logger.info(f'Kullanıcı silindi: {username}')
-            return True
-        return False
+            seq = self._persist(username, deleted=True)
+            self.leaderboard.remove(username)
+        self._commit(seq)
+        logger.info(f'Kullanıcı silindi: {username}')
+        return True